@@ -0,0 +1,117 @@
+"""
+Benchmark del arranque de la línea de comandos: tiempo hasta tener `main.py` listo
+para procesar argumentos y tiempo de importación de cada módulo, con
+`python -X importtime` en procesos nuevos (sin caches de importación en memoria).
+
+Además verifica que el arranque no importe las dependencias pesadas que solo usan
+algunas etapas (matplotlib y networkx al visualizar, SciPy al analizar la red,
+pyarrow al guardar en Parquet/Feather): si alguna aparece, o si el tiempo supera
+--limite-ms, termina con código 1, de modo que sirve como control de regresiones.
+
+Uso:
+    python -m benchmarks.arranque [--repeticiones 5] [--mostrar 15] [--limite-ms 400]
+                                  [--json arranque.json] [--comparar anterior.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que se mide: importar main como lo hace `python main.py` antes de leer los argumentos
+CODIGO = "import main"
+
+# Paquetes que no se deben importar al arrancar
+PROHIBIDOS = ("matplotlib", "networkx", "scipy", "pyarrow", "Bio")
+
+REPETICIONES = 5
+
+
+def medir_una_vez(codigo=CODIGO):
+    """
+    Ejecuta `codigo` en un intérprete nuevo con -X importtime.
+
+    :return: Tupla (segundos totales del proceso, {módulo: microsegundos acumulados}).
+    """
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ,
+                             capture_output=True, text=True, check=True)
+    segundos = time.perf_counter() - inicio
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        # "import time: propio | acumulado | módulo", con sangría según la profundidad
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, modulo = linea[len("import time:"):].split("|")
+        if acumulado.strip().isdigit():
+            modulos[modulo.strip()] = int(acumulado)
+    return segundos, modulos
+
+
+def medir(repeticiones=REPETICIONES, codigo=CODIGO):
+    """
+    Mide el arranque `repeticiones` veces.
+
+    :return: Diccionario con "mediana" y "minimo" (segundos del proceso), "importacion"
+             (mediana del tiempo de importar `main`, en segundos), "modulos" ({módulo:
+             mediana en segundos}) y "prohibidos" (paquetes pesados importados).
+    """
+    tiempos, importaciones, por_modulo = [], [], {}
+    for _ in range(repeticiones):
+        segundos, modulos = medir_una_vez(codigo)
+        tiempos.append(segundos)
+        importaciones.append(modulos.get("main", 0) / 1e6)
+        for modulo, microsegundos in modulos.items():
+            por_modulo.setdefault(modulo, []).append(microsegundos / 1e6)
+    prohibidos = sorted({modulo.split(".")[0] for modulo in por_modulo} & set(PROHIBIDOS))
+    return {"mediana": statistics.median(tiempos), "minimo": min(tiempos),
+            "importacion": statistics.median(importaciones),
+            "modulos": {modulo: statistics.median(valores) for modulo, valores in por_modulo.items()},
+            "prohibidos": prohibidos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--mostrar", type=int, default=15, help="Cantidad de módulos más lentos a listar.")
+    parser.add_argument("--limite-ms", type=float, help="Fallar si la importación de main supera estos milisegundos.")
+    parser.add_argument("--json", type=str, help="Guardar los resultados en este archivo JSON.")
+    parser.add_argument("--comparar", type=str, help="Archivo JSON de una ejecución anterior para comparar.")
+    args = parser.parse_args()
+
+    resultado = medir(args.repeticiones)
+    print(f"Proceso completo: mediana {resultado['mediana'] * 1000:.1f} ms, mínimo {resultado['minimo'] * 1000:.1f} ms")
+    linea = f"Importación de main: {resultado['importacion'] * 1000:.1f} ms"
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)["importacion"]
+        # Mayor que 1 significa que ahora arranca más rápido
+        linea += f" ({anterior / resultado['importacion']:.2f}x vs anterior)" if resultado["importacion"] else ""
+    print(linea)
+
+    print(f"\n{'Módulo':<40} {'Acumulado (ms)':>15}")
+    modulos = sorted(resultado["modulos"].items(), key=lambda item: item[1], reverse=True)
+    for modulo, segundos in modulos[:args.mostrar]:
+        print(f"{modulo:<40} {segundos * 1000:>15.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2)
+        print(f"\nResultados guardados en: {args.json}")
+
+    fallas = []
+    if resultado["prohibidos"]:
+        fallas.append(f"el arranque importa {', '.join(resultado['prohibidos'])}")
+    if args.limite_ms is not None and resultado["importacion"] * 1000 > args.limite_ms:
+        fallas.append(f"la importación de main supera {args.limite_ms:.0f} ms")
+    if fallas:
+        print(f"\nRegresión: {'; '.join(fallas)}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
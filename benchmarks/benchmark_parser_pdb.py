@@ -0,0 +1,92 @@
+"""
+Mide el tiempo y la memoria pico de la lectura de la cabecera de un archivo PDB
+grande generado sintéticamente (cabecera + millones de registros ATOM), comparando
+el lector en streaming con la lectura completa del archivo (readlines + dos pasadas).
+
+Uso: python -m benchmarks.benchmark_parser_pdb [--atomos 2000000]
+"""
+import argparse
+import gzip
+import os
+import tempfile
+import time
+import tracemalloc
+
+import src.cache_http as cache_http
+import src.cargar_secuencia as cargar_secuencia
+import src.estructura as estructura
+from benchmarks.servidor_simulado import ServidorSimulado
+
+RESIDUOS = ["ALA", "GLY", "SER", "LEU", "LYS", "GLU", "ASP", "VAL", "THR", "PRO"]
+
+
+def generar_pdb(ruta, num_atomos, num_cadenas=4, residuos_por_cadena=400):
+    """Escribe un PDB sintético con cabecera realista y `num_atomos` registros ATOM."""
+    abrir = gzip.open if ruta.endswith(".gz") else open
+    with abrir(ruta, "wt") as f:
+        f.write("HEADER    SINTETICO                               01-JAN-00   9ZZZ              \n")
+        f.write("SOURCE   2 ORGANISM_SCIENTIFIC: HOMO SAPIENS;                                   \n")
+        for c in range(num_cadenas):
+            cadena = chr(ord("A") + c)
+            f.write(f"DBREF  9ZZZ {cadena}    1   {residuos_por_cadena} UNP    P04637   P53_HUMAN        1    {residuos_por_cadena}\n")
+        for c in range(num_cadenas):
+            cadena = chr(ord("A") + c)
+            for serie, inicio in enumerate(range(0, residuos_por_cadena, 13), start=1):
+                residuos = " ".join(RESIDUOS[(inicio + i) % len(RESIDUOS)] for i in range(min(13, residuos_por_cadena - inicio)))
+                f.write(f"SEQRES {serie:3d} {cadena} {residuos_por_cadena:4d}  {residuos}\n")
+        linea = "ATOM  {:5d}  CA  ALA A   1      11.104  13.207  10.000  1.00 20.00           C  \n"
+        for i in range(num_atomos):
+            f.write(linea.format(i % 100000))
+        f.write("END\n")
+
+
+def leer_completo(ruta):
+    """Lectura anterior: todo el archivo en memoria y dos recorridos."""
+    with open(ruta) as f:
+        lines = f.readlines()
+    residuos = [r for l in lines if l.startswith("SEQRES") for r in l[19:].split()]
+    pdb_id = next((l.split()[1] for l in lines if l.startswith("DBREF")), None)
+    return estructura.tres_a_uno(residuos), pdb_id
+
+
+def medir(nombre, funcion, *args):
+    # El tiempo se mide sin tracemalloc, que encarece cada asignación
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {nombre:<34} {segundos * 1000:9.1f} ms   memoria pico {pico / 2**20:8.1f} MB")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del lector de cabeceras PDB.")
+    parser.add_argument("--atomos", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    cache_http.configurar(activa=False)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "grande.pdb")
+        ruta_gz = ruta + ".gz"
+        generar_pdb(ruta, args.atomos)
+        generar_pdb(ruta_gz, args.atomos)
+        print(f"PDB sintético: {os.path.getsize(ruta) / 2**20:.0f} MB ({os.path.getsize(ruta_gz) / 2**20:.1f} MB comprimido)")
+
+        anterior = medir("readlines + dos pasadas", leer_completo, ruta)
+        nuevo = medir("streaming (archivo local)", cargar_secuencia.load_sequence_from_file, ruta)
+        medir("streaming (archivo .gz local)", cargar_secuencia.load_sequence_from_file, ruta_gz)
+        assert anterior == nuevo[:2]
+
+        with open(ruta_gz, "rb") as f:
+            contenido_gz = f.read()
+        with ServidorSimulado(lambda ruta_http: (200, contenido_gz, {"Content-Type": "application/gzip"})) as servidor:
+            url = f"{servidor.url}/download/9ZZZ.pdb.gz"
+            medir("streaming (descarga .gz)", lambda: estructura.parsear_pdb(
+                cache_http.iterar_lineas(url, es_fin=estructura.es_fin_cabecera)))
+
+
+if __name__ == "__main__":
+    main()
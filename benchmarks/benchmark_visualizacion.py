@@ -0,0 +1,73 @@
+"""
+Mide el tiempo de la visualización sin ventana de redes sintéticas de distinto
+tamaño, separando el cálculo de la disposición del dibujo y guardado del PNG.
+
+Uso: python -m benchmarks.benchmark_visualizacion [--aristas 1000 10000 50000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import networkx as nx
+import numpy as np
+
+import src.cache_disposicion as cache_disposicion
+import src.tabla_interacciones as tabla_interacciones
+import src.visualizar_interacciones as visualizar_interacciones
+
+
+def generar_tabla(num_aristas, semilla=0):
+    """Red aleatoria conexa con ~4 aristas por nodo y scores uniformes entre 0.15 y 1."""
+    rng = np.random.default_rng(semilla)
+    num_nodos = max(num_aristas // 4, 2)
+    # Un árbol aleatorio asegura que la red sea conexa; el resto de las aristas son al azar
+    destino = np.arange(1, num_nodos)
+    origen = rng.integers(0, destino)
+    extra = num_aristas - len(origen)
+    origen = np.concatenate([origen, rng.integers(0, num_nodos, extra)])
+    destino = np.concatenate([destino, rng.integers(0, num_nodos, extra)])
+    scores = {"combined_score": rng.uniform(0.15, 1.0, num_aristas)}
+    return tabla_interacciones.TablaInteracciones([f"P{i:05d}" for i in range(num_nodos)], origen, destino, scores)
+
+
+def medir(tabla, disposicion):
+    grafo = nx.Graph()
+    grafo.add_weighted_edges_from(zip(tabla.origen.tolist(), tabla.destino.tolist(), tabla.columna().tolist()))
+    inicio = time.perf_counter()
+    visualizar_interacciones.calcular_disposicion(grafo, disposicion)
+    segundos_disposicion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with patch("builtins.print"):
+        visualizar_interacciones.visualizar_interacciones(tabla, "P00000", ruta_archivo="benchmark",
+                                                          disposicion=disposicion, mostrar=False)
+    return segundos_disposicion, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aristas", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--disposicion", choices=visualizar_interacciones.DISPOSICIONES, default="auto")
+    args = parser.parse_args()
+
+    # Se mide el cálculo de la disposición, no la lectura desde la cache
+    cache_disposicion.configurar(activa=False)
+
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # Los PNG se guardan en <directorio>/resultados
+        os.chdir(directorio)
+        try:
+            print(f"{'aristas':>8} {'nodos':>7} {'disposición (s)':>16} {'total sin ventana (s)':>22}")
+            for num_aristas in args.aristas:
+                tabla = generar_tabla(num_aristas)
+                segundos_disposicion, segundos_total = medir(tabla, args.disposicion)
+                print(f"{num_aristas:>8} {len(tabla.nodos):>7} {segundos_disposicion:>16.2f} {segundos_total:>22.2f}")
+        finally:
+            os.chdir(directorio_original)
+
+
+if __name__ == "__main__":
+    main()
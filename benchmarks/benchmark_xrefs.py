@@ -0,0 +1,53 @@
+"""
+Compara el tiempo de mapeo de IDs con Ensembl en serie y en paralelo
+contra un servidor simulado con latencia fija.
+
+Uso: python -m benchmarks.benchmark_xrefs [--nodos 20] [--latencia 0.3]
+"""
+import argparse
+import time
+
+import src.cache_http as cache_http
+import src.obtener_interacciones as obtener_interacciones
+from benchmarks.servidor_simulado import ServidorSimulado, respuesta_json
+
+
+def xrefs_simulados(ruta):
+    id_ = ruta.rstrip("/").split("/")[-1]
+    return respuesta_json([
+        {"dbname": "PDB", "primary_id": f"PDB_{id_[-4:]}"},
+        {"dbname": "Uniprot/SWISSPROT", "primary_id": f"UP_{id_[-4:]}"},
+    ])
+
+
+def medir(ids, max_concurrencia):
+    inicio = time.perf_counter()
+    mapeo = obtener_interacciones.convertir_a_uniprot(ids, max_concurrencia=max_concurrencia)
+    return time.perf_counter() - inicio, mapeo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de resolución de xrefs de Ensembl.")
+    parser.add_argument("--nodos", type=int, default=20)
+    parser.add_argument("--latencia", type=float, default=0.3)
+    parser.add_argument("--concurrencia", type=int, default=obtener_interacciones.MAX_CONCURRENCIA)
+    args = parser.parse_args()
+
+    # Sin cache: queremos medir la red simulada en ambas pasadas
+    cache_http.configurar(activa=False)
+    ids = [f"9606.ENSP{i:011d}" for i in range(args.nodos)]
+
+    with ServidorSimulado(xrefs_simulados, latencia=args.latencia) as servidor:
+        obtener_interacciones.ENSEMBL_SERVER = servidor.url
+        t_serie, mapeo_serie = medir(ids, 1)
+        t_paralelo, mapeo_paralelo = medir(ids, args.concurrencia)
+
+    assert mapeo_serie == mapeo_paralelo
+    print(f"{args.nodos} IDs, latencia simulada {args.latencia:.2f} s")
+    print(f"  en serie:               {t_serie:6.2f} s")
+    print(f"  concurrencia={args.concurrencia:<3d}        {t_paralelo:6.2f} s")
+    print(f"  aceleración:            {t_serie / t_paralelo:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
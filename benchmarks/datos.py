@@ -0,0 +1,152 @@
+"""
+Respuestas de ejemplo de STRING, Ensembl, RCSB y UniProt (en benchmarks/fixtures,
+con el mismo formato que devuelven las APIs) y su escalado a redes sintéticas de
+cualquier tamaño, para servirlas desde `servidor_simulado.ServidorSimulado`.
+"""
+import functools
+import gzip
+import json
+import math
+import os
+from urllib.parse import urlsplit
+
+import numpy as np
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Proteína central de la red de ejemplo (TP53)
+PROTEINA = "P04637"
+STRING_ID = "9606.ENSP00000269305"
+PDB_ID = "1TUP"
+
+CANALES = ("nscore", "fscore", "pscore", "ascore", "escore", "dscore", "tscore")
+
+
+@functools.lru_cache(maxsize=None)
+def leer(nombre):
+    """Contenido (str) de un archivo de benchmarks/fixtures."""
+    with open(os.path.join(DIRECTORIO, nombre), encoding="utf-8") as f:
+        return f.read()
+
+
+def leer_json(nombre):
+    return json.loads(leer(nombre))
+
+
+def red_string(num_aristas, semilla=0):
+    """
+    Red de STRING sintética con `num_aristas` interacciones (sin lazos ni pares repetidos)
+    y ~4 aristas por nodo. Los registros copian los campos de la respuesta de ejemplo
+    y la proteína central conserva su ID real.
+    """
+    plantilla = leer_json("string_network_TP53.json")[0]
+    rng = np.random.default_rng(semilla)
+    # En redes chicas hacen falta más nodos para que entren todas las aristas sin repetir
+    num_nodos = max(num_aristas // 4, math.ceil((1 + math.sqrt(1 + 8 * num_aristas)) / 2))
+    # Un árbol aleatorio asegura que la red sea conexa; luego se completan pares al azar
+    pares = {(int(padre), hijo) for hijo, padre in zip(range(1, num_nodos), rng.integers(0, np.arange(1, num_nodos)))}
+    maximo = num_nodos * (num_nodos - 1) // 2
+    while len(pares) < min(num_aristas, maximo):
+        faltan = min(num_aristas, maximo) - len(pares)
+        a = rng.integers(0, num_nodos, faltan * 2)
+        b = rng.integers(0, num_nodos, faltan * 2)
+        for x, y in zip(a.tolist(), b.tolist()):
+            if x != y and len(pares) < num_aristas:
+                pares.add((min(x, y), max(x, y)))
+    pares = sorted(pares)[:num_aristas]
+
+    ids = [STRING_ID] + [f"9606.ENSP{i:011d}" for i in range(1, num_nodos)]
+    scores = rng.uniform(0.15, 1.0, (len(pares), len(CANALES) + 1)).round(3)
+    red = []
+    for (a, b), fila in zip(pares, scores.tolist()):
+        registro = dict(plantilla, stringId_A=ids[a], stringId_B=ids[b],
+                        preferredName_A=f"GEN{a}", preferredName_B=f"GEN{b}", score=fila[0])
+        registro.update(zip(CANALES, fila[1:]))
+        red.append(registro)
+    return red
+
+
+def xrefs(string_id):
+    """
+    Xrefs de Ensembl para un ID de STRING: las de ejemplo para la proteína central
+    y, para el resto, las mismas con accesiones derivadas del número del ENSP.
+    Uno de cada tres nodos no tiene estructura en PDB.
+    """
+    ejemplo = leer_json("ensembl_xrefs_ENSP00000269305.json")
+    id_ = string_id.split(".")[-1]
+    if id_ == STRING_ID.split(".")[-1]:
+        return ejemplo
+    numero = int(id_[4:])
+    resultado = []
+    for xref in ejemplo:
+        if xref["dbname"] == "PDB":
+            if numero % 3 == 0:
+                continue
+            xref = dict(xref, primary_id=f"{numero % 9 + 1}{numero % 4096:03X}")
+        elif xref["dbname"].startswith("Uniprot"):
+            xref = dict(xref, primary_id=f"Q{numero:05d}")
+        resultado.append(xref)
+    return resultado
+
+
+def cabecera_pdb(num_residuos, num_atomos=1000):
+    """
+    Archivo PDB con la cabecera de ejemplo (1TUP) ampliada a `num_residuos` residuos
+    en SEQRES, repartidos en hasta 62 cadenas, seguida de `num_atomos` registros ATOM.
+    """
+    lineas = leer("rcsb_1TUP.pdb").splitlines()
+    cabecera = [linea for linea in lineas if linea[:6] not in ("DBREF ", "SEQRES", "ATOM  ", "END   ", "END")]
+    residuos_ejemplo = [r for linea in lineas if linea.startswith("SEQRES") and linea[11] == "A" for r in linea[19:].split()]
+
+    nombres = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    num_cadenas = min(len(nombres), max(1, math.ceil(num_residuos / len(residuos_ejemplo))))
+    por_cadena = math.ceil(num_residuos / num_cadenas)
+    for cadena in nombres[:num_cadenas]:
+        cabecera.append(f"DBREF  {PDB_ID} {cadena}    1  {por_cadena:4d}  UNP    {PROTEINA}   P53_HUMAN        1   {por_cadena:4d}")
+    for cadena in nombres[:num_cadenas]:
+        residuos = [residuos_ejemplo[i % len(residuos_ejemplo)] for i in range(por_cadena)]
+        for serie, inicio in enumerate(range(0, por_cadena, 13), start=1):
+            cabecera.append(f"SEQRES {serie:3d} {cadena} {por_cadena:4d}  {' '.join(residuos[inicio:inicio + 13])}")
+    atomo = "ATOM  {:5d}  CA  SER A  94      35.404  51.471  68.453  1.00 59.27           C  "
+    cabecera.extend(atomo.format(i % 100000) for i in range(num_atomos))
+    cabecera.append("END")
+    return "\n".join(cabecera) + "\n"
+
+
+class DatosSimulados:
+    """
+    Respuestas que devuelve el servidor simulado; los atributos se pueden cambiar
+    entre mediciones (por ejemplo, para servir una red de otro tamaño).
+    """
+
+    def __init__(self, num_aristas=10, num_residuos=219):
+        self.fasta = leer("uniprot_P04637.fasta").encode("utf-8")
+        self.cambiar_red(num_aristas)
+        self.cambiar_pdb(num_residuos)
+        self._xrefs = {}
+
+    def cambiar_red(self, num_aristas):
+        self.red = json.dumps(red_string(num_aristas)).encode("utf-8")
+
+    def cambiar_pdb(self, num_residuos):
+        self.pdb_gz = gzip.compress(cabecera_pdb(num_residuos).encode("utf-8"))
+
+    def responder(self, ruta):
+        """Función de rutas para ServidorSimulado: (codigo, cuerpo, cabeceras)."""
+        partes = urlsplit(ruta)
+        if partes.path == "/api/json/version":
+            return 200, b'[{"string_version": "12.0", "stable_address": "https://version-12-0.string-db.org"}]', {}
+        if partes.path.startswith("/info/data"):
+            return 200, b'{"releases": [113]}', {"Content-Type": "application/json"}
+        if partes.path.startswith("/api/json/network"):
+            return 200, self.red, {"Content-Type": "application/json"}
+        if partes.path.startswith("/xrefs/id/"):
+            id_ = partes.path.rsplit("/", 1)[-1]
+            if id_ not in self._xrefs:
+                self._xrefs[id_] = json.dumps(xrefs(id_)).encode("utf-8")
+            return 200, self._xrefs[id_], {"Content-Type": "application/json"}
+        if partes.path == f"/download/{PDB_ID}.pdb.gz":
+            return 200, self.pdb_gz, {"Content-Type": "application/gzip"}
+        if partes.path == f"/uniprot/{PROTEINA}.fasta":
+            return 200, self.fasta, {"Content-Type": "text/plain"}
+        return 404, b"", {}
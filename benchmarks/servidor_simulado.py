@@ -0,0 +1,62 @@
+"""
+Servidor HTTP local que simula las APIs remotas (Ensembl, STRING, RCSB, UniProt)
+para poder medir el rendimiento sin acceso a la red.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServidorSimulado:
+    """
+    Levanta un ThreadingHTTPServer en 127.0.0.1 con un puerto libre.
+
+    :param rutas: Función (ruta) -> (codigo, cuerpo_bytes, cabeceras) que genera la respuesta.
+    :param latencia: Segundos de espera artificial por solicitud (simula la red).
+    """
+
+    def __init__(self, rutas, latencia=0.0):
+        self.rutas = rutas
+        self.latencia = latencia
+        self.solicitudes = 0
+        self._lock = threading.Lock()
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with servidor._lock:
+                    servidor.solicitudes += 1
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                codigo, cuerpo, cabeceras = servidor.rutas(self.path)
+                self.send_response(codigo)
+                for clave, valor in (cabeceras or {}).items():
+                    self.send_header(clave, valor)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self._hilo = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, puerto = self._httpd.server_address
+        return f"http://{host}:{puerto}"
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def respuesta_json(datos, codigo=200):
+    """Arma la tupla de respuesta para un cuerpo JSON."""
+    return codigo, json.dumps(datos).encode("utf-8"), {"Content-Type": "application/json"}
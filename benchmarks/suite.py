@@ -0,0 +1,276 @@
+"""
+Suite de benchmarks sin acceso a la red: cada etapa del flujo se mide contra el
+servidor simulado, que responde con las respuestas de ejemplo de benchmarks/fixtures
+escaladas a redes de distinto tamaño (de 10 a 100 000 aristas).
+
+Para cada caso y tamaño se informa la mediana y el mínimo de varias repeticiones,
+el rendimiento (unidades por segundo), la memoria pico (tracemalloc, en una pasada
+aparte para no encarecer la medición de tiempo) y las solicitudes HTTP por pasada.
+Las caches en disco y los índices locales se desactivan para medir siempre lo mismo.
+
+Uso:
+    python -m benchmarks.suite [--casos mapeo_ids grafo] [--tamanos 10 1000] [--repeticiones 3]
+                               [--json resultados.json] [--comparar anteriores.json]
+
+Con --json los resultados se guardan para compararlos luego con --comparar (por
+ejemplo, antes y después de un cambio).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import src.analisis as analisis
+import src.cache_disposicion as cache_disposicion
+import src.cache_http as cache_http
+import src.cargar_secuencia as cargar_secuencia
+import src.guardar_interacciones as guardar_interacciones
+import src.indice_ids as indice_ids
+import src.memo as memo
+import src.obtener_interacciones as obtener_interacciones
+import src.red_local as red_local
+import src.visualizar_interacciones as visualizar_interacciones
+from benchmarks import datos
+from benchmarks.servidor_simulado import ServidorSimulado
+
+TAMANOS = (10, 100, 1000, 10000, 100000)
+REPETICIONES = 3
+
+
+class Entorno:
+    """
+    Servidor simulado con las APIs redirigidas a él, caches desactivadas y una carpeta
+    de trabajo temporal (los resultados se escriben en <temporal>/resultados).
+    """
+
+    def __init__(self):
+        self.datos = datos.DatosSimulados()
+        self._redes = {}
+        self._pila = contextlib.ExitStack()
+
+    def __enter__(self):
+        pila = self._pila
+        self.servidor = pila.enter_context(ServidorSimulado(self.datos.responder))
+        for modulo, atributo in ((obtener_interacciones, "ENSEMBL_SERVER"), (obtener_interacciones, "STRING_SERVER"),
+                                 (cargar_secuencia, "RCSB_SERVER"), (cargar_secuencia, "UNIPROT_SERVER")):
+            pila.callback(setattr, modulo, atributo, getattr(modulo, atributo))
+            setattr(modulo, atributo, self.servidor.url)
+
+        cache_http.configurar(activa=False)
+        pila.callback(cache_http.configurar, activa=True)
+        cache_disposicion.configurar(activa=False)
+        pila.callback(cache_disposicion.configurar, activa=True)
+        memo.configurar(activa=False)
+        pila.callback(memo.configurar, activa=True)
+        directorio = pila.enter_context(tempfile.TemporaryDirectory())
+        indice_ids.configurar(ruta=os.path.join(directorio, "sin_indice.sqlite"))
+        pila.callback(indice_ids.configurar, ruta=indice_ids.RUTA_INDICE)
+        red_local.configurar(None)
+        pila.callback(red_local.configurar, red_local.RUTA_RED_LOCAL)
+
+        pila.callback(os.chdir, os.getcwd())
+        os.chdir(directorio)
+        return self
+
+    def __exit__(self, *exc):
+        self._pila.close()
+
+    def red(self, num_aristas):
+        """Red descargada (ver `obtener_interacciones.obtener_red`) de `num_aristas` aristas."""
+        if num_aristas not in self._redes:
+            self.datos.cambiar_red(num_aristas)
+            self._redes[num_aristas] = obtener_interacciones.obtener_red(datos.PROTEINA, ["uniprot", "pdb"])
+        return self._redes[num_aristas]
+
+
+class Caso:
+    """Un benchmark: `preparar` no se mide; `ejecutar` se mide en cada repetición."""
+    nombre = ""
+    unidad = "aristas"
+
+    def __init__(self, entorno):
+        self.entorno = entorno
+
+    def preparar(self, tamano):
+        pass
+
+    def ejecutar(self):
+        raise NotImplementedError
+
+
+class ParseoPDB(Caso):
+    """Descarga (simulada) y lectura en streaming de la cabecera de un PDB con `tamano` residuos."""
+    nombre = "parseo_pdb"
+    unidad = "residuos"
+
+    def preparar(self, tamano):
+        self.tamano = tamano
+        self.entorno.datos.cambiar_pdb(tamano)
+
+    def ejecutar(self):
+        secuencia, _ = cargar_secuencia.load_sequence_from_pdb(datos.PDB_ID)
+        assert len(secuencia) >= self.tamano
+
+
+class MapeoIds(Caso):
+    """Red de STRING y xrefs de Ensembl de todos sus nodos (uniprot y pdb)."""
+    nombre = "mapeo_ids"
+
+    def preparar(self, tamano):
+        self.tamano = tamano
+        self.entorno.datos.cambiar_red(tamano)
+
+    def ejecutar(self):
+        red = obtener_interacciones.obtener_red(datos.PROTEINA, ["uniprot", "pdb"])
+        assert len(red["interacciones"]) == self.tamano
+
+
+class Tabla(Caso):
+    """Construcción de las tablas de interacciones de los tres formatos desde la red descargada."""
+    nombre = "tabla"
+
+    def preparar(self, tamano):
+        self.red = self.entorno.red(tamano)
+
+    def ejecutar(self):
+        for formato in obtener_interacciones.FORMATOS:
+            obtener_interacciones.derivar_tabla(self.red, formato)
+
+
+class EscrituraJSON(Caso):
+    """Escritura de la tabla uniprot como JSON con sangría (el formato por defecto)."""
+    nombre = "escritura_json"
+
+    def preparar(self, tamano):
+        self.tabla = obtener_interacciones.derivar_tabla(self.entorno.red(tamano), "uniprot")
+
+    def ejecutar(self):
+        os.unlink(guardar_interacciones.guardar_interacciones(self.tabla, "benchmark.json"))
+
+
+class Grafo(Caso):
+    """Disposición y PNG del grafo uniprot, sin ventana."""
+    nombre = "grafo"
+
+    def preparar(self, tamano):
+        self.tabla = obtener_interacciones.derivar_tabla(self.entorno.red(tamano), "uniprot")
+
+    def ejecutar(self):
+        os.unlink(visualizar_interacciones.visualizar_interacciones(self.tabla, datos.PROTEINA, ruta_archivo="benchmark",
+                                                                    mostrar=False))
+
+
+class Analisis(Caso):
+    """Métricas por nodo (grado, PageRank, intermediación muestreada, comunidades) de la red uniprot."""
+    nombre = "analisis"
+
+    def preparar(self, tamano):
+        self.tabla = obtener_interacciones.derivar_tabla(self.entorno.red(tamano), "uniprot")
+
+    def ejecutar(self):
+        analisis.analizar(self.tabla)
+
+
+CASOS = {caso.nombre: caso for caso in (ParseoPDB, MapeoIds, Tabla, EscrituraJSON, Grafo, Analisis)}
+
+
+def medir(caso, tamano, repeticiones=REPETICIONES):
+    """
+    Mide un caso para un tamaño.
+
+    :return: Diccionario con "caso", "tamano", "unidad", "mediana" y "minimo" (segundos),
+             "por_segundo", "memoria_pico" (bytes) y "solicitudes" (HTTP por pasada).
+    """
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        caso.preparar(tamano)
+        tiempos = []
+        for _ in range(repeticiones):
+            solicitudes = caso.entorno.servidor.solicitudes
+            inicio = time.perf_counter()
+            caso.ejecutar()
+            tiempos.append(time.perf_counter() - inicio)
+            solicitudes = caso.entorno.servidor.solicitudes - solicitudes
+
+        # La memoria se mide en otra pasada: tracemalloc encarece cada asignación
+        tracemalloc.start()
+        try:
+            caso.ejecutar()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    mediana = statistics.median(tiempos)
+    return {"caso": caso.nombre, "tamano": tamano, "unidad": caso.unidad, "mediana": mediana, "minimo": min(tiempos),
+            "por_segundo": tamano / mediana if mediana else float("inf"), "memoria_pico": pico, "solicitudes": solicitudes}
+
+
+def ejecutar(casos=tuple(CASOS), tamanos=TAMANOS, repeticiones=REPETICIONES, al_medir=None):
+    """
+    Ejecuta los casos indicados para cada tamaño.
+
+    :param al_medir: Función opcional que recibe cada resultado apenas se mide.
+    :return: Lista de resultados de `medir`.
+    """
+    resultados = []
+    with Entorno() as entorno:
+        for nombre in casos:
+            caso = CASOS[nombre](entorno)
+            for tamano in tamanos:
+                resultado = medir(caso, tamano, repeticiones)
+                resultados.append(resultado)
+                if al_medir:
+                    al_medir(resultado)
+    return resultados
+
+
+def imprimir_encabezado(comparar=False):
+    print(f"{'Caso':<16} {'Tamaño':>8} {'Mediana (ms)':>13} {'Mín (ms)':>10} {'Unidades/s':>12} "
+          f"{'Memoria (MB)':>13} {'HTTP':>6}" + (f" {'vs anterior':>12}" if comparar else ""))
+
+
+def imprimir_resultado(resultado, anteriores=None):
+    linea = (f"{resultado['caso']:<16} {resultado['tamano']:>8} {resultado['mediana'] * 1000:>13.1f} "
+             f"{resultado['minimo'] * 1000:>10.1f} {resultado['por_segundo']:>12.0f} "
+             f"{resultado['memoria_pico'] / 2**20:>13.1f} {resultado['solicitudes']:>6}")
+    if anteriores is not None:
+        anterior = anteriores.get((resultado["caso"], resultado["tamano"]))
+        # Mayor que 1 significa que ahora es más rápido
+        linea += f" {anterior / resultado['mediana']:>11.2f}x" if anterior else f" {'-':>12}"
+    print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--json", type=str, help="Guardar los resultados en este archivo JSON.")
+    parser.add_argument("--comparar", type=str, help="Archivo JSON de una ejecución anterior para comparar.")
+    args = parser.parse_args()
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anteriores = {(r["caso"], r["tamano"]): r["mediana"] for r in json.load(f)["resultados"]}
+
+    imprimir_encabezado(anteriores is not None)
+    resultados = ejecutar(args.casos, args.tamanos, args.repeticiones,
+                          al_medir=lambda resultado: imprimir_resultado(resultado, anteriores))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "plataforma": platform.platform(),
+                       "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "resultados": resultados}, f, indent=2)
+        print(f"Resultados guardados en: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
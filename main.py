@@ -1,10 +1,20 @@
 import argparse
-import os
-import re
-import src.cargar_secuencia as cargar_secuencia
-import src.obtener_interacciones as obtener_interacciones
-import src.visualizar_interacciones as visualizar_interacciones
+import src.cache_disposicion as cache_disposicion
+import src.cache_http as cache_http
+import src.expansion as expansion
 import src.guardar_interacciones as guardar_interacciones
+import src.indice_ids as indice_ids
+import src.lote as lote
+import src.manifiesto as manifiesto
+import src.memo as memo
+import src.perfil as perfil
+import src.pipeline as pipeline
+import src.red_local as red_local
+import src.servicio as servicio
+import src.sesion_http as sesion_http
+import src.tabla_interacciones as tabla_interacciones
+import src.taxonomia as taxonomia
+import src.visualizar_interacciones as visualizar_interacciones
 
 def main():
     # Configuración de argparse para manejar los argumentos de línea de comandos
@@ -12,81 +22,129 @@ def main():
     
     # Argumentos de entrada
     parser.add_argument("--pdb", type=str, help="ID de PDB para cargar la secuencia de proteína (ej. 1A2B).")
-    parser.add_argument("--archivo", type=str, help="Ruta a un archivo .pdb local para cargar la secuencia de proteína.")
+    parser.add_argument("--archivo", type=str, help="Ruta a un archivo local .pdb, .cif, .pdb.gz o .cif.gz para cargar la secuencia de proteína.")
     parser.add_argument("--uniprot", type=str, help="ID de UniProt para cargar la secuencia de proteína.")
+    parser.add_argument("--lote", type=str, help="Archivo de texto/CSV con un ID de PDB, UniProt o ruta a un archivo de estructura por línea.")
+    parser.add_argument("--paralelo", type=int, default=lote.PARALELISMO, help="Número de proteínas procesadas en paralelo en modo lote o servicio.")
     parser.add_argument("--visualizar", action="store_true", help="Visualizar las interacciones de la proteína.")
+    parser.add_argument("--sin-ventana", action="store_true", help="Guardar el grafo como PNG sin abrir la ventana interactiva.")
+    parser.add_argument("--disposicion", choices=visualizar_interacciones.DISPOSICIONES, default="auto",
+                        help="Disposición de los nodos del grafo (auto usa espectral en grafos grandes).")
 
     # Argumento para la salida, ahora acepta hasta 3 formatos
     parser.add_argument("--salida", type=str, choices=["uniprot", "ensembl", "pdb"], help="Formatos de salida: uniprot, ensembl, pdb.", nargs='+')
     parser.add_argument("--guardar", type=str, help="Ruta base del archivo para guardar las interacciones.")
+    parser.add_argument("--formato-guardado", choices=guardar_interacciones.FORMATOS, default="json",
+                        help="Formato de los archivos de interacciones (parquet y feather requieren pyarrow).")
+
+    # Especie de las consultas a STRING (ver src/taxonomia.py)
+    parser.add_argument("--especie", type=str,
+                        help="Especie de las proteínas (nombre científico o taxón de NCBI, ej. 10090); por defecto se usa la detectada en la entrada.")
+
+    # Expansión de la red a varios saltos (ver src/expansion.py)
+    parser.add_argument("--agregacion", choices=tabla_interacciones.AGREGACIONES, default="max",
+                        help="Cómo combinar los scores de las interacciones que quedan repetidas al traducir los IDs (por defecto max).")
+    parser.add_argument("--saltos", type=int, default=1, help="Distancia máxima a la proteína en la red (1 = red de STRING por defecto).")
+    parser.add_argument("--score-minimo", type=int, default=expansion.SCORE_MINIMO, help="Score combinado mínimo (0-1000) de las aristas al expandir la red.")
+
+    # Análisis de la red (ver src/analisis.py)
+    parser.add_argument("--analizar", action="store_true",
+                        help="Calcular grado, PageRank, intermediación, comunidades y hubs de cada red y guardarlos junto a las interacciones.")
+    parser.add_argument("--canal", choices=tabla_interacciones.CAMPOS_SCORE, default="combined_score",
+                        help="Score de STRING usado como peso de las aristas en el análisis (por defecto combined_score).")
+
+    # Cache local de respuestas HTTP
+    parser.add_argument("--sin-cache", action="store_true", help="No usar las caches locales (respuestas HTTP en disco y en memoria, y disposiciones de grafos).")
+    parser.add_argument("--sin-conexion", action="store_true", help="Responder solo desde la cache local, sin acceder a la red.")
+
+    # Actualización de una carpeta de resultados existente (ver src/manifiesto.py)
+    parser.add_argument("--actualizar", action="store_true",
+                        help="Volver a consultar solo las proteínas vencidas o cuyas fuentes cambiaron de versión, y reescribir solo los archivos que cambiaron.")
+    parser.add_argument("--ttl-dias", type=float, default=manifiesto.TTL / cache_http.DIA,
+                        help="Días tras los cuales un resultado se vuelve a descargar con --actualizar.")
+
+    # Índice local de mapeo de IDs (ver src/indice_ids.py)
+    parser.add_argument("--indice", type=str, help="Ruta del índice local de mapeo de IDs construido con 'python -m src.indice_ids'.")
+
+    # Almacén local de la red de STRING (ver src/red_local.py)
+    parser.add_argument("--red-local", type=str, help="Carpeta del almacén local de STRING creado con 'python -m src.red_local'.")
+
+    # Modo servicio (ver src/servicio.py)
+    parser.add_argument("--servicio", action="store_true",
+                        help="Atender trabajos por HTTP local con las caches y conexiones abiertas entre trabajos.")
+    parser.add_argument("--puerto", type=int, default=servicio.PUERTO, help="Puerto TCP del servicio (en 127.0.0.1).")
+    parser.add_argument("--socket", type=str, help="Atender el servicio en este socket Unix en lugar de TCP.")
+
+    # Conexiones HTTP
+    parser.add_argument("--timeout", type=float, help="Segundos máximos de espera por cada solicitud HTTP.")
+    parser.add_argument("--metricas-http", action="store_true", help="Mostrar al final la latencia y el volumen de datos por host.")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Mostrar al final el tiempo de cada etapa y el histograma de latencias HTTP por host.")
+    parser.add_argument("--traza", type=str,
+                        help="Guardar los tiempos de cada etapa y solicitud en un JSON de Chrome trace (abrir en chrome://tracing o Perfetto).")
     
     # Parsear los argumentos
     args = parser.parse_args()
-    
-    secuencia = None
-    id_iter = None
-    especie = None  # Nueva variable para almacenar la especie detectada
 
-    # Validar que si se pasa un archivo, este tenga la extensión .pdb
-    if args.archivo and not args.archivo.endswith(".pdb"):
-        print("Error: El archivo debe tener la extensión .pdb.")
+    if args.sin_cache and args.sin_conexion:
+        print("Error: --sin-cache y --sin-conexion no se pueden usar juntos.")
         return
+    cache_http.configurar(activa=not args.sin_cache, solo_cache=args.sin_conexion)
+    cache_disposicion.configurar(activa=not args.sin_cache)
+    memo.configurar(activa=not args.sin_cache)
+    if args.indice:
+        indice_ids.configurar(ruta=args.indice)
+    if args.red_local:
+        red_local.configurar(args.red_local)
+    if args.timeout:
+        sesion_http.configurar(timeout=args.timeout)
     
-    # Verificación del formato de ID de UniProt
-    if args.uniprot and not re.match(r"^[A-Za-z0-9]{6,10}$", args.uniprot):
-        print("Error: El ID de UniProt no tiene un formato válido.")
+    if args.saltos < 1:
+        print("Error: --saltos debe ser al menos 1.")
         return
-    
-    # Cargar la secuencia de la proteína desde PDB ID o archivo PDB o UniProt
-    if args.pdb:
-        secuencia, especie = cargar_secuencia.load_sequence_from_pdb(args.pdb)
-        if secuencia:
-            print(f"Secuencia cargada desde PDB {args.pdb}: {secuencia[:50]}...")
-            id_iter = args.pdb
-    elif args.archivo:
-        secuencia, _, especie = cargar_secuencia.load_sequence_from_file(args.archivo)  # Ajuste para incluir especie
-        if secuencia:
-            print(f"Secuencia cargada desde archivo PDB {args.archivo}: {secuencia[:50]}...")
-            id_iter = args.archivo
-    elif args.uniprot:
-        secuencia = cargar_secuencia.load_sequence_from_uniprot(args.uniprot)
-        if secuencia:
-            print(f"Secuencia cargada desde UniProt {args.uniprot}: {secuencia[:50]}...")
-            id_iter = args.uniprot
-    else:
-        print("Debe proporcionar un ID de PDB, un archivo PDB o un ID de UniProt.")
+    if args.actualizar and not (args.lote or args.guardar):
+        print("Error: --actualizar requiere --guardar o --lote (actualiza los archivos guardados).")
         return
-    
-    # Mostrar especie si se detectó
-    if especie:
-        print(f"Especie detectada: {especie}")
-    
-    # Verificar que la secuencia se haya cargado correctamente
-    if not secuencia:
-        print("Error: No se pudo cargar la secuencia de proteína.")
+    if args.especie and taxonomia.taxon(args.especie) is None:
+        print(f"Error: especie desconocida: {args.especie}. Use el nombre científico o el taxón de NCBI.")
         return
-    
-    # Obtener las interacciones de la proteína si es posible
-    if id_iter:
-        print(f"ID utilizado para interacciones: {id_iter}")
-        
-        # Se requiere obtener las interacciones para cada formato de salida
-        for salida in args.salida:
-            print(f"Procesando interacciones para formato: {salida}")
-            interacciones = obtener_interacciones.obtener_interacciones(id_iter, salida)
-
-            if interacciones:
-                print(f"Interacciones obtenidas para {salida}: {interacciones}")
-                
-                # Guardar las interacciones en un archivo JSON y generar gráfico
-                if args.guardar:
-                    guardar_interacciones.guardar_interacciones_json(interacciones, f"{args.guardar}_{salida}.json")
-                
-                # Si se solicita, visualizar las interacciones para cada formato
-                if args.visualizar:
-                    visualizar_interacciones.visualizar_interacciones(interacciones, id_iter, salida=salida, ruta_archivo=f"{args.guardar}_{salida}")
-            else:
-                print(f"No se pudieron obtener interacciones para {salida}.")
+
+    if args.perfil or args.traza:
+        perfil.activar()
+    canal = args.canal if args.analizar else None
+
+    if args.servicio:
+        servicio.servir(args.paralelo, puerto=args.puerto, socket_unix=args.socket)
+    elif args.lote:
+        lote.procesar_lote(args.lote, args.salida, prefijo_guardar=args.guardar, paralelismo=args.paralelo,
+                           saltos=args.saltos, score_minimo=args.score_minimo, visualizar=args.visualizar,
+                           disposicion=args.disposicion, formato_guardado=args.formato_guardado,
+                           agregacion=args.agregacion, especie=args.especie, actualizar=args.actualizar,
+                           ttl=args.ttl_dias * cache_http.DIA, canal=canal)
+    else:
+        # Cargar la secuencia de la proteína desde PDB ID o archivo PDB o UniProt
+        if args.pdb:
+            tipo, valor = "pdb", args.pdb
+        elif args.archivo:
+            tipo, valor = "archivo", args.archivo
+        elif args.uniprot:
+            tipo, valor = "uniprot", args.uniprot
+        else:
+            print("Debe proporcionar un ID de PDB, un archivo PDB, un ID de UniProt o un archivo de lote.")
+            return
+
+        pipeline.procesar_proteina(tipo, valor, args.salida, ruta_guardar=args.guardar, visualizar=args.visualizar,
+                                   saltos=args.saltos, score_minimo=args.score_minimo, disposicion=args.disposicion,
+                                   mostrar_ventana=not args.sin_ventana, formato_guardado=args.formato_guardado,
+                                   agregacion=args.agregacion, especie=args.especie, actualizar=args.actualizar,
+                                   ttl=args.ttl_dias * cache_http.DIA, canal=canal)
+
+    if args.metricas_http:
+        sesion_http.imprimir_metricas()
+    if args.perfil:
+        perfil.imprimir_resumen()
+    if args.traza:
+        print(f"Traza guardada en: {perfil.escribir_traza(args.traza)}")
         
 if __name__ == "__main__":
     main()
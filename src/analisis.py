@@ -0,0 +1,280 @@
+"""
+Análisis de la red de interacciones con matrices dispersas de SciPy: grado,
+PageRank, intermediación aproximada, comunidades y hubs por nodo.
+
+La red se representa como una matriz de adyacencia simétrica CSR ponderada por un
+canal de score de STRING (ver `tabla_interacciones.CAMPOS_SCORE`). Todos los
+cálculos son productos matriz-vector o matriz-matriz dispersos, sin recorrer los
+nodos en Python, de modo que escalan a redes combinadas de decenas de miles de nodos.
+
+- PageRank y las comunidades usan los pesos; la intermediación usa caminos mínimos
+  en cantidad de saltos (la métrica habitual en redes de interacción).
+- La intermediación se estima desde una muestra de nodos de origen (algoritmo de
+  Brandes por niveles, con varios orígenes a la vez), escalada a todos los nodos.
+- Las comunidades se detectan por propagación de etiquetas ponderada.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+import src.perfil as perfil
+import src.tabla_interacciones as tabla_interacciones
+
+# PageRank
+AMORTIGUACION = 0.85
+TOLERANCIA_PAGERANK = 1e-10
+MAX_ITERACIONES_PAGERANK = 100
+
+# Orígenes muestreados para la intermediación y cuántos se procesan juntos
+MUESTRAS_INTERMEDIACION = 256
+ORIGENES_POR_BLOQUE = 64
+
+# Propagación de etiquetas
+MAX_ITERACIONES_COMUNIDADES = 50
+
+# Un nodo es hub si su grado está a esta cantidad de desvíos estándar por encima de la media
+DESVIOS_HUB = 2.0
+
+# Métricas por nodo, en el orden en que se exportan
+METRICAS = ("grado", "fuerza", "pagerank", "intermediacion", "comunidad", "hub")
+
+
+def matriz_adyacencia(tabla, campo="combined_score"):
+    """
+    Matriz de adyacencia simétrica de una tabla de interacciones.
+
+    Solo entran los nodos que participan en alguna interacción; las interacciones
+    repetidas se unifican con `TablaInteracciones.canonica` y los lazos se descartan.
+
+    :param tabla: TablaInteracciones.
+    :param campo: Canal de score usado como peso.
+    :return: Tupla (matriz CSR float64 n x n, lista de los n nodos).
+    """
+    if campo not in tabla_interacciones.CAMPOS_SCORE:
+        raise ValueError(f"Canal {campo} no soportado. Use uno de: {', '.join(tabla_interacciones.CAMPOS_SCORE)}.")
+    tabla = tabla.canonica()
+    sin_lazos = tabla.origen != tabla.destino
+    usados, codigos = np.unique(np.concatenate([tabla.origen[sin_lazos], tabla.destino[sin_lazos]]), return_inverse=True)
+    origen, destino = np.split(codigos.ravel(), 2)
+    pesos = tabla.scores[campo][sin_lazos].astype(np.float64)
+    n = len(usados)
+    matriz = sp.coo_matrix((np.concatenate([pesos, pesos]), (np.concatenate([origen, destino]), np.concatenate([destino, origen]))),
+                           shape=(n, n)).tocsr()
+    return matriz, [tabla.nodos[codigo] for codigo in usados.tolist()]
+
+
+def pagerank(matriz, amortiguacion=AMORTIGUACION, tolerancia=TOLERANCIA_PAGERANK, max_iteraciones=MAX_ITERACIONES_PAGERANK):
+    """
+    PageRank ponderado por iteración de potencias. Los nodos sin peso saliente
+    reparten su valor entre todos los nodos.
+
+    :return: Array float64 que suma 1.
+    """
+    n = matriz.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    salida = np.asarray(matriz.sum(axis=1)).ravel()
+    colgantes = salida == 0
+    inversa = np.divide(1.0, salida, out=np.zeros(n), where=~colgantes)
+    transicion = (sp.diags(inversa) @ matriz).T.tocsr()
+    valores = np.full(n, 1.0 / n)
+    for _ in range(max_iteraciones):
+        nuevos = amortiguacion * (transicion @ valores + valores[colgantes].sum() / n) + (1 - amortiguacion) / n
+        error = np.abs(nuevos - valores).sum()
+        valores = nuevos
+        if error < n * tolerancia:
+            break
+    return valores / valores.sum()
+
+
+def intermediacion(matriz, muestras=MUESTRAS_INTERMEDIACION, semilla=0, origenes_por_bloque=ORIGENES_POR_BLOQUE):
+    """
+    Intermediación (betweenness) por caminos mínimos en saltos, normalizada como
+    networkx.betweenness_centrality(normalized=True).
+
+    Se recorre la red por niveles desde `muestras` nodos de origen elegidos al azar
+    (todos si la red tiene menos), de a `origenes_por_bloque` orígenes por vez: cada
+    nivel es un producto de la matriz dispersa por un bloque denso de n x orígenes.
+    El resultado se escala por n / muestras.
+
+    :return: Array float64 con la intermediación de cada nodo.
+    """
+    n = matriz.shape[0]
+    resultado = np.zeros(n)
+    if n <= 2:
+        return resultado
+    adyacencia = matriz.copy()
+    adyacencia.data = np.ones_like(adyacencia.data)
+    rng = np.random.default_rng(semilla)
+    origenes = np.arange(n) if muestras is None or muestras >= n else rng.choice(n, muestras, replace=False)
+
+    for inicio in range(0, len(origenes), origenes_por_bloque):
+        bloque = origenes[inicio:inicio + origenes_por_bloque]
+        columnas = np.arange(len(bloque))
+        distancia = np.full((n, len(bloque)), -1, dtype=np.int32)
+        caminos = np.zeros((n, len(bloque)))
+        distancia[bloque, columnas] = 0
+        caminos[bloque, columnas] = 1.0
+
+        # Hacia adelante: cantidad de caminos mínimos desde cada origen, nivel por nivel
+        frontera = caminos.copy()
+        nivel = 0
+        while True:
+            siguiente = adyacencia @ frontera
+            nuevos = (siguiente > 0) & (distancia < 0)
+            if not nuevos.any():
+                break
+            nivel += 1
+            siguiente[~nuevos] = 0
+            distancia[nuevos] = nivel
+            caminos += siguiente
+            frontera = siguiente
+
+        # Hacia atrás: dependencia de cada nodo, desde el nivel más lejano
+        dependencia = np.zeros_like(caminos)
+        for d in range(nivel - 1, 0, -1):
+            sucesores = distancia == d + 1
+            coeficientes = np.divide(1.0 + dependencia, caminos, out=np.zeros_like(caminos), where=sucesores)
+            en_nivel = distancia == d
+            dependencia[en_nivel] = (caminos * (adyacencia @ coeficientes))[en_nivel]
+        resultado += dependencia.sum(axis=1)
+
+    return resultado * (n / len(origenes)) / ((n - 1) * (n - 2))
+
+
+def comunidades(matriz, max_iteraciones=MAX_ITERACIONES_COMUNIDADES, semilla=0):
+    """
+    Comunidades por propagación de etiquetas ponderada: cada nodo adopta la etiqueta
+    con mayor peso entre sus vecinos. En cada ronda se actualiza una mitad de los nodos
+    elegida al azar, lo que evita que la propagación oscile entre dos estados.
+
+    :return: Array int64 con la comunidad de cada nodo, numeradas de mayor a menor tamaño.
+    """
+    n = matriz.shape[0]
+    etiquetas = np.arange(n)
+    if n == 0:
+        return etiquetas
+    rng = np.random.default_rng(semilla)
+    for _ in range(max_iteraciones):
+        pertenencia = sp.csr_matrix((np.ones(n), (np.arange(n), etiquetas)), shape=(n, n))
+        # El peso propio mínimo desempata a favor de la etiqueta actual
+        pesos = matriz @ pertenencia + pertenencia * 1e-9
+        nuevas = np.asarray(pesos.argmax(axis=1)).ravel()
+        # Estable: ningún nodo cambiaría de etiqueta
+        if (nuevas == etiquetas).all():
+            break
+        etiquetas = np.where(rng.random(n) < 0.5, nuevas, etiquetas)
+
+    # Numerar las comunidades por tamaño descendente
+    _, inversas, tamanos = np.unique(etiquetas, return_inverse=True, return_counts=True)
+    orden = np.argsort(-tamanos, kind="stable")
+    rango = np.empty_like(orden)
+    rango[orden] = np.arange(len(orden))
+    return rango[inversas.ravel()]
+
+
+def modularidad(matriz, comunidad):
+    """Modularidad ponderada (Newman) de una partición."""
+    total = matriz.sum()
+    if total == 0:
+        return 0.0
+    fuerza = np.asarray(matriz.sum(axis=1)).ravel()
+    coo = matriz.tocoo()
+    internas = coo.data[comunidad[coo.row] == comunidad[coo.col]].sum()
+    fuerza_por_comunidad = np.bincount(comunidad, weights=fuerza)
+    return float(internas / total - ((fuerza_por_comunidad / total) ** 2).sum())
+
+
+class MetricasRed:
+    """
+    Métricas por nodo de una red, en columnas.
+
+    :ivar nodos: Identificadores de los nodos (los que participan en alguna interacción).
+    :ivar columnas: Diccionario {metrica: array} con una entrada por nodo para cada una de METRICAS.
+    :ivar campo: Canal de score usado como peso.
+    :ivar aristas: Cantidad de interacciones (sin repetidas ni lazos).
+    :ivar modularidad: Modularidad de la partición en comunidades.
+    :ivar muestras: Orígenes usados para estimar la intermediación.
+    """
+    __slots__ = ("nodos", "columnas", "campo", "aristas", "modularidad", "muestras")
+
+    def __init__(self, nodos, columnas, campo, aristas, modularidad, muestras):
+        self.nodos = nodos
+        self.columnas = columnas
+        self.campo = campo
+        self.aristas = aristas
+        self.modularidad = modularidad
+        self.muestras = muestras
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def __repr__(self):
+        return f"MetricasRed({len(self)} nodos, {self.aristas} aristas, {self.num_comunidades()} comunidades)"
+
+    def num_comunidades(self):
+        comunidad = self.columnas["comunidad"]
+        return int(comunidad.max()) + 1 if len(comunidad) else 0
+
+    def hubs(self):
+        """Hubs ordenados por grado descendente."""
+        indices = np.flatnonzero(self.columnas["hub"])
+        return [self.nodos[i] for i in indices[np.argsort(-self.columnas["grado"][indices], kind="stable")].tolist()]
+
+    def mejores(self, k=10, metrica="pagerank"):
+        """Los `k` nodos con mayor `metrica`, de mayor a menor."""
+        orden = np.argsort(-self.columnas[metrica], kind="stable")[:k]
+        return [(self.nodos[i], float(self.columnas[metrica][i])) for i in orden.tolist()]
+
+    def resumen(self):
+        """Diccionario con los totales de la red, los hubs y los nodos más centrales."""
+        return {"nodos": len(self), "aristas": self.aristas, "canal": self.campo,
+                "comunidades": self.num_comunidades(), "modularidad": round(self.modularidad, tabla_interacciones.DECIMALES),
+                "muestras_intermediacion": self.muestras, "hubs": self.hubs(),
+                "pagerank": [nodo for nodo, _ in self.mejores(10, "pagerank")],
+                "intermediacion": [nodo for nodo, _ in self.mejores(10, "intermediacion")]}
+
+    def iterar(self):
+        """Genera las métricas de cada nodo como diccionarios {"proteina", metrica: valor, ...}."""
+        columnas = {}
+        for metrica in METRICAS:
+            columna = self.columnas[metrica]
+            if columna.dtype.kind == "f":
+                columna = np.round(columna, tabla_interacciones.DECIMALES)
+            columnas[metrica] = columna.tolist()
+        for i, nodo in enumerate(self.nodos):
+            registro = {"proteina": nodo}
+            registro.update((metrica, columnas[metrica][i]) for metrica in METRICAS)
+            yield registro
+
+    def a_lista(self):
+        return list(self.iterar())
+
+
+@perfil.etapa("analisis")
+def analizar(tabla, campo="combined_score", muestras=MUESTRAS_INTERMEDIACION, semilla=0):
+    """
+    Calcula las métricas de todos los nodos de una tabla de interacciones.
+
+    :param tabla: TablaInteracciones (por ejemplo, el resultado de `obtener_interacciones.derivar_tabla`).
+    :param campo: Canal de score usado como peso (ver `tabla_interacciones.CAMPOS_SCORE`).
+    :param muestras: Orígenes muestreados para la intermediación (None para calcularla exacta).
+    :param semilla: Semilla del muestreo y de la propagación de etiquetas.
+    :return: MetricasRed.
+    """
+    matriz, nodos = matriz_adyacencia(tabla, campo)
+    n = len(nodos)
+    grado = np.diff(matriz.indptr).astype(np.int64)
+    fuerza = np.asarray(matriz.sum(axis=1)).ravel()
+    comunidad = comunidades(matriz, semilla=semilla)
+    desvio = grado.std() if n else 0.0
+    hub = (grado - grado.mean()) >= DESVIOS_HUB * desvio if desvio > 0 else np.zeros(n, dtype=bool)
+    columnas = {
+        "grado": grado,
+        "fuerza": fuerza,
+        "pagerank": pagerank(matriz),
+        "intermediacion": intermediacion(matriz, muestras, semilla),
+        "comunidad": comunidad,
+        "hub": hub,
+    }
+    return MetricasRed(nodos, columnas, campo, matriz.nnz // 2, modularidad(matriz, comunidad),
+                       n if muestras is None else min(muestras, n))
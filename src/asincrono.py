@@ -0,0 +1,222 @@
+"""
+API asíncrona del flujo completo (carga de la secuencia -> red de STRING ->
+mapeo de IDs -> guardado/gráfico), para usar Interacppy desde servicios asyncio.
+
+Cada etapa es una corrutina que ejecuta la etapa sincrónica correspondiente en
+un hilo (asyncio.to_thread), de modo que el event loop nunca se bloquea. Las
+solicitudes HTTP siguen pasando por la cache y la sesión compartida (con su
+pool de conexiones y la pausa global ante un 429 de Ensembl), y cada etapa
+tiene un límite de concurrencia compartido por todas las tareas del proceso.
+
+Ejemplo:
+    resultados = asyncio.run(asincrono.procesar_varias([("uniprot", "P04637"), ("pdb", "1TUP")], ["uniprot"]))
+"""
+import asyncio
+import weakref
+
+import src.expansion as expansion
+import src.guardar_interacciones as guardar_interacciones
+import src.obtener_interacciones as obtener_interacciones
+import src.pipeline as pipeline
+import src.taxonomia as taxonomia
+import src.visualizar_interacciones as visualizar_interacciones
+
+# Tareas simultáneas por etapa, compartidas por todas las corrutinas del mismo event loop
+LIMITES = {"carga": 8, "red": 4, "mapeo": 4, "guardado": 4}
+
+_semaforos = weakref.WeakKeyDictionary()
+
+
+def _semaforo(etapa):
+    """Semáforo de una etapa para el event loop actual (se crea la primera vez)."""
+    loop = asyncio.get_running_loop()
+    por_etapa = _semaforos.setdefault(loop, {})
+    if etapa not in por_etapa:
+        por_etapa[etapa] = asyncio.Semaphore(LIMITES[etapa])
+    return por_etapa[etapa]
+
+
+async def _en_hilo(etapa, funcion, *args, **kwargs):
+    async with _semaforo(etapa):
+        return await asyncio.to_thread(funcion, *args, **kwargs)
+
+
+class ResultadoProteina:
+    """
+    Resultado del procesamiento de una proteína.
+
+    :ivar id: Identificador o ruta recibida.
+    :ivar tipo: "pdb", "archivo" o "uniprot".
+    :ivar estado: "ok" o "error".
+    :ivar mensaje: Descripción del error (vacío si no hubo).
+    :ivar especie: Especie detectada (o None).
+    :ivar taxon: Taxón de STRING al que se dirigen las consultas (o None si falló la carga).
+    :ivar id_iter: ID usado para consultar STRING (o None si falló la carga).
+    :ivar red: Red descargada (ver `obtener_interacciones.obtener_red`), o None.
+    :ivar tablas: Diccionario {formato: TablaInteracciones}.
+    :ivar archivos: Lista de archivos generados (interacciones y gráficos).
+    """
+    __slots__ = ("id", "tipo", "estado", "mensaje", "especie", "taxon", "id_iter", "red", "tablas", "archivos")
+
+    def __init__(self, id, tipo, estado="error", mensaje="", especie=None, id_iter=None, taxon=None):
+        self.id = id
+        self.tipo = tipo
+        self.estado = estado
+        self.mensaje = mensaje
+        self.especie = especie
+        self.taxon = taxon
+        self.id_iter = id_iter
+        self.red = None
+        self.tablas = {}
+        self.archivos = []
+
+    @classmethod
+    def desde_estado(cls, estado):
+        """Crea el resultado a partir del diccionario de estado de `pipeline.cargar_proteina`."""
+        return cls(estado["id"], estado["tipo"], estado["estado"], estado["mensaje"], estado["especie"], estado["id_iter"],
+                   estado["taxon"])
+
+    @property
+    def ok(self):
+        return self.estado == "ok"
+
+    def a_dict(self):
+        """Estado en el mismo formato que `pipeline.procesar_proteina` (el que registra el modo lote)."""
+        return {"id": self.id, "tipo": self.tipo, "estado": self.estado, "mensaje": self.mensaje,
+                "especie": self.especie, "taxon": self.taxon, "id_iter": self.id_iter,
+                "interacciones": {formato: len(tabla) for formato, tabla in self.tablas.items()}}
+
+    def __repr__(self):
+        return f"ResultadoProteina(id={self.id!r}, estado={self.estado!r}, interacciones={self.a_dict()['interacciones']})"
+
+
+async def cargar(tipo, valor, especie=None):
+    """
+    Valida la entrada y carga la secuencia. Devuelve un ResultadoProteina (id_iter None si falló).
+    `especie` (nombre o taxón) reemplaza a la detectada.
+    """
+    return ResultadoProteina.desde_estado(await _en_hilo("carga", pipeline.cargar_proteina, tipo, valor, especie))
+
+
+async def obtener_red(id_iter, formatos, saltos=1, score_minimo=expansion.SCORE_MINIMO, especie=taxonomia.ESPECIE_POR_DEFECTO):
+    """Descarga la red de STRING (expandida si `saltos` > 1). Devuelve la red o None."""
+    return await _en_hilo("red", pipeline.descargar_red, id_iter, list(formatos), saltos, score_minimo, especie)
+
+
+async def obtener_redes(id_iters, formatos, especie=taxonomia.ESPECIE_POR_DEFECTO):
+    """Descarga juntas las redes de varias proteínas de una especie (ver `obtener_interacciones.obtener_redes`)."""
+    return await _en_hilo("red", obtener_interacciones.obtener_redes, list(id_iters), list(formatos), especie=especie)
+
+
+async def mapear(red, formatos, agregacion="max"):
+    """Deriva la tabla de interacciones de cada formato. Devuelve {formato: TablaInteracciones}."""
+    def derivar():
+        tablas = {}
+        for formato in formatos:
+            tabla = obtener_interacciones.derivar_tabla(red, formato, agregacion)
+            if tabla is not None:
+                tablas[formato] = tabla
+        return tablas
+    return await _en_hilo("mapeo", derivar)
+
+
+async def guardar(tabla, ruta_archivo, formato_guardado="json"):
+    """Guarda una tabla de interacciones. Devuelve la ruta del archivo o None si hubo un error."""
+    return await _en_hilo("guardado", guardar_interacciones.guardar_interacciones, tabla, ruta_archivo, formato_guardado)
+
+
+async def graficar(tabla, proteina, ruta_archivo, salida="U", disposicion="auto"):
+    """Guarda el grafo de una tabla como PNG, sin ventana. Devuelve la ruta o None."""
+    return await _en_hilo("guardado", visualizar_interacciones.visualizar_interacciones, tabla, proteina,
+                          salida=salida, ruta_archivo=ruta_archivo, disposicion=disposicion, mostrar=False)
+
+
+async def _guardar_salidas(resultado, ruta_guardar, visualizar, formato_guardado, disposicion):
+    if not ruta_guardar:
+        return
+    tareas = []
+    for formato, tabla in resultado.tablas.items():
+        if not len(tabla):
+            continue
+        ruta = f"{ruta_guardar}_{formato}{guardar_interacciones.EXTENSIONES[formato_guardado]}"
+        tareas.append(guardar(tabla, ruta, formato_guardado))
+        if visualizar:
+            tareas.append(graficar(tabla, resultado.id_iter, f"{ruta_guardar}_{formato}", formato, disposicion))
+    resultado.archivos = [ruta for ruta in await asyncio.gather(*tareas) if ruta]
+
+
+def _terminar(resultado, formatos):
+    if resultado.red is None and formatos:
+        resultado.mensaje = "No se pudo obtener la red de STRING."
+    else:
+        resultado.estado = "ok"
+    return resultado
+
+
+async def procesar(tipo, valor, formatos, ruta_guardar=None, visualizar=False, saltos=1,
+                   score_minimo=expansion.SCORE_MINIMO, formato_guardado="json", disposicion="auto", agregacion="max",
+                   especie=None):
+    """
+    Ejecuta el flujo completo para una proteína.
+
+    :param tipo: "pdb", "archivo" o "uniprot".
+    :param valor: Identificador o ruta de la proteína.
+    :param formatos: Formatos de salida (uniprot, ensembl, pdb).
+    :param ruta_guardar: Ruta base de los archivos de interacciones y gráficos, o None para no guardar.
+    :param visualizar: Si es True (y hay `ruta_guardar`) se guarda el grafo de cada formato como PNG.
+    :param saltos: Distancia máxima a la proteína en la red (1 = red de STRING por defecto).
+    :param score_minimo: Score combinado mínimo (0-1000) de las aristas al expandir la red.
+    :param formato_guardado: Formato de los archivos de interacciones (ver `guardar_interacciones.FORMATOS`).
+    :param disposicion: Disposición de los nodos de los grafos.
+    :param agregacion: Cómo se combinan los scores de las interacciones repetidas ("max" o "mean").
+    :param especie: Especie (nombre o taxón) que reemplaza a la detectada, o None para usar la detectada.
+    :return: ResultadoProteina.
+    """
+    formatos = list(formatos or [])
+    resultado = await cargar(tipo, valor, especie)
+    if resultado.id_iter is None:
+        return resultado
+
+    resultado.red = await obtener_red(resultado.id_iter, formatos, saltos, score_minimo, resultado.taxon)
+    if resultado.red is not None:
+        resultado.tablas = await mapear(resultado.red, formatos, agregacion)
+        await _guardar_salidas(resultado, ruta_guardar, visualizar, formato_guardado, disposicion)
+    return _terminar(resultado, formatos)
+
+
+async def procesar_varias(entradas, formatos, prefijo_guardar=None, visualizar=False, formato_guardado="json",
+                          disposicion="auto", agregacion="max", especie=None):
+    """
+    Procesa varias proteínas concurrentemente. Las secuencias se cargan en paralelo
+    y las redes se piden juntas a STRING con una consulta agrupada por especie (las
+    de distintas especies, en paralelo).
+
+    :param entradas: Iterable de tuplas (tipo, valor).
+    :param formatos: Formatos de salida (uniprot, ensembl, pdb).
+    :param prefijo_guardar: Prefijo de los archivos de cada proteína (<prefijo>_<id>), o None para no guardar.
+    :param visualizar: Si es True (y hay `prefijo_guardar`) se guarda el grafo de cada formato como PNG.
+    :param especie: Especie (nombre o taxón) de todas las entradas, o None para usar la detectada en cada una.
+    :return: Lista de ResultadoProteina en el mismo orden que `entradas`.
+    """
+    formatos = list(formatos or [])
+    resultados = await asyncio.gather(*(cargar(tipo, valor, especie) for tipo, valor in entradas))
+    cargados = [resultado for resultado in resultados if resultado.id_iter is not None]
+
+    redes = {}
+    if cargados and formatos:
+        grupos = obtener_interacciones.agrupar_por_especie({resultado.id_iter: resultado.taxon for resultado in cargados})
+        for redes_especie in await asyncio.gather(*(obtener_redes(id_iters, formatos, taxon)
+                                                    for taxon, id_iters in grupos.items())):
+            redes.update(redes_especie)
+
+    async def completar(resultado):
+        resultado.red = redes.get(resultado.id_iter)
+        if resultado.red is not None:
+            resultado.tablas = await mapear(resultado.red, formatos, agregacion)
+            nombre = pipeline.nombre_salida(resultado.tipo, resultado.id)
+            ruta_guardar = f"{prefijo_guardar}_{nombre}" if prefijo_guardar else None
+            await _guardar_salidas(resultado, ruta_guardar, visualizar, formato_guardado, disposicion)
+        _terminar(resultado, formatos)
+
+    await asyncio.gather(*(completar(resultado) for resultado in cargados))
+    return resultados
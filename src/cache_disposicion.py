@@ -0,0 +1,236 @@
+"""
+Cache en disco de las disposiciones (posiciones de los nodos) de los grafos.
+
+La clave es una huella canónica del conjunto de nodos, las aristas con su score
+y los parámetros de la disposición. Los nodos se identifican por su clave
+canónica (el ID de STRING), de modo que las salidas uniprot/ensembl/pdb de una
+misma red comparten la disposición.
+
+Cuando no hay una entrada exacta se puede recuperar la disposición guardada más
+parecida (misma proteína central, mismos parámetros de disposición y muchos nodos
+en común) para arrancar desde ella el cálculo en lugar de empezar de cero.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+RUTA_CACHE = os.environ.get(
+    "INTERACPPY_CACHE_DISPOSICION",
+    os.path.join(os.path.expanduser("~"), ".cache", "interacppy", "disposiciones.sqlite"),
+)
+
+# Tamaño máximo de la cache en bytes antes de desalojar las entradas menos usadas
+MAX_BYTES = 64 * 1024 * 1024
+
+# Proporción mínima de nodos en común (Jaccard) para reutilizar una disposición parecida
+SIMILITUD_MINIMA = 0.6
+
+# Disposiciones parecidas que se comparan como máximo
+MAX_CANDIDATOS = 20
+
+# Decimales del score que entran en la huella
+DECIMALES_SCORE = 3
+
+
+def _parametros(parametros):
+    """Representación canónica (JSON con claves ordenadas) de los parámetros de una disposición."""
+    return json.dumps(parametros or {}, sort_keys=True)
+
+
+def huella(claves, aristas, parametros):
+    """
+    Calcula la huella canónica de un grafo.
+
+    :param claves: Claves canónicas de los nodos.
+    :param aristas: Iterable de tuplas (clave_1, clave_2, score).
+    :param parametros: Diccionario con los parámetros de la disposición.
+    :return: Hash SHA-256 en hexadecimal, independiente del orden de nodos y aristas.
+    """
+    h = hashlib.sha256()
+    h.update(_parametros(parametros).encode("utf-8"))
+    for clave in sorted(set(map(str, claves))):
+        h.update(b"N" + clave.encode("utf-8") + b"\n")
+    canonicas = sorted(
+        (min(str(a), str(b)), max(str(a), str(b)), f"{score:.{DECIMALES_SCORE}f}") for a, b, score in aristas
+    )
+    for a, b, score in canonicas:
+        h.update(f"E{a}\t{b}\t{score}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class CacheDisposicion:
+    """
+    Disposiciones guardadas en SQLite, con desalojo LRU cuando se supera el presupuesto de bytes.
+
+    :param ruta: Archivo SQLite de la cache.
+    :param max_bytes: Tamaño máximo de las posiciones almacenadas.
+    """
+
+    def __init__(self, ruta=RUTA_CACHE, max_bytes=MAX_BYTES):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.parecidas = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS disposiciones (
+                huella TEXT PRIMARY KEY,
+                ancla TEXT,
+                nodos TEXT,
+                posiciones BLOB,
+                tamano INTEGER,
+                creado REAL,
+                ultimo_acceso REAL,
+                parametros TEXT
+            )"""
+        )
+        # Las caches creadas antes de guardar los parámetros no los tienen: esas entradas
+        # solo sirven como coincidencia exacta, nunca como disposición parecida
+        columnas = [fila[1] for fila in self._db.execute("PRAGMA table_info(disposiciones)")]
+        if "parametros" not in columnas:
+            self._db.execute("ALTER TABLE disposiciones ADD COLUMN parametros TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_ancla ON disposiciones (ancla)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_disp_ultimo_acceso ON disposiciones (ultimo_acceso)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(tamano), 0) FROM disposiciones").fetchone()[0]
+
+    @staticmethod
+    def _posiciones(nodos, blob):
+        return dict(zip(json.loads(nodos), np.frombuffer(blob, dtype=np.float32).reshape(-1, 2).tolist()))
+
+    def leer(self, huella_grafo):
+        """Devuelve {clave: [x, y]} guardado para la huella, o None si no existe."""
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT nodos, posiciones FROM disposiciones WHERE huella = ?", (huella_grafo,)
+            ).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+            self._db.execute("UPDATE disposiciones SET ultimo_acceso = ? WHERE huella = ?", (time.time(), huella_grafo))
+            self.aciertos += 1
+        return self._posiciones(*fila)
+
+    def parecida(self, ancla, claves, parametros=None):
+        """
+        Busca la disposición guardada con la misma `ancla` y los mismos `parametros` (tipo de
+        disposición y semilla) que comparte más nodos con `claves`.
+
+        :return: {clave: [x, y]} de la más parecida, o None si ninguna alcanza SIMILITUD_MINIMA.
+        """
+        claves = set(map(str, claves))
+        with self._lock:
+            filas = self._db.execute(
+                "SELECT huella, nodos, posiciones FROM disposiciones WHERE ancla = ? AND parametros = ? "
+                "ORDER BY ultimo_acceso DESC LIMIT ?", (ancla, _parametros(parametros), MAX_CANDIDATOS)
+            ).fetchall()
+        mejor, similitud_mejor = None, SIMILITUD_MINIMA
+        for _, nodos, posiciones in filas:
+            guardadas = set(json.loads(nodos))
+            similitud = len(claves & guardadas) / len(claves | guardadas)
+            if similitud >= similitud_mejor:
+                mejor, similitud_mejor = (nodos, posiciones), similitud
+        if mejor is None:
+            return None
+        with self._lock:
+            self.parecidas += 1
+        return self._posiciones(*mejor)
+
+    def guardar(self, huella_grafo, ancla, posiciones, parametros=None):
+        """
+        Guarda una disposición y desaloja las entradas menos usadas si se supera `max_bytes`.
+
+        :param posiciones: Diccionario {clave: (x, y)}.
+        :param parametros: Parámetros con los que se calculó (los mismos de la huella).
+        """
+        nodos = json.dumps([str(clave) for clave in posiciones])
+        blob = np.asarray(list(posiciones.values()), dtype=np.float32).tobytes()
+        tamano = len(nodos) + len(blob)
+        if tamano > self.max_bytes:
+            return
+        ahora = time.time()
+        with self._lock:
+            anterior = self._db.execute("SELECT tamano FROM disposiciones WHERE huella = ?", (huella_grafo,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO disposiciones (huella, ancla, nodos, posiciones, tamano, creado, ultimo_acceso, "
+                "parametros) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (huella_grafo, ancla, nodos, blob, tamano, ahora, ahora, _parametros(parametros)),
+            )
+            self._bytes += tamano - (anterior[0] if anterior else 0)
+            self._desalojar()
+
+    def _desalojar(self):
+        # Se llama con el lock tomado
+        while self._bytes > self.max_bytes:
+            filas = self._db.execute(
+                "SELECT huella, tamano FROM disposiciones ORDER BY ultimo_acceso LIMIT 64"
+            ).fetchall()
+            if not filas:
+                self._bytes = 0
+                return
+            for huella_grafo, tamano in filas:
+                self._db.execute("DELETE FROM disposiciones WHERE huella = ?", (huella_grafo,))
+                self._bytes -= tamano
+                if self._bytes <= self.max_bytes:
+                    break
+
+    def vaciar(self):
+        """Elimina todas las disposiciones guardadas."""
+        with self._lock:
+            self._db.execute("DELETE FROM disposiciones")
+            self._bytes = 0
+
+    def estadisticas(self):
+        """Devuelve los contadores de aciertos, disposiciones parecidas, fallos y el tamaño de la cache."""
+        with self._lock:
+            entradas = self._db.execute("SELECT COUNT(*) FROM disposiciones").fetchone()[0]
+        return {"aciertos": self.aciertos, "parecidas": self.parecidas, "fallos": self.fallos,
+                "entradas": entradas, "bytes": self._bytes}
+
+    def cerrar(self):
+        with self._lock:
+            self._db.close()
+
+
+_config = {"activa": True, "ruta": RUTA_CACHE, "max_bytes": MAX_BYTES}
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configurar(activa=None, ruta=None, max_bytes=None):
+    """
+    Cambia la configuración de la cache global de disposiciones.
+
+    :param activa: Si es False, las disposiciones se calculan siempre y no se guardan.
+    :param ruta: Archivo SQLite de la cache.
+    :param max_bytes: Presupuesto máximo de bytes.
+    """
+    global _cache
+    for clave, valor in (("activa", activa), ("ruta", ruta), ("max_bytes", max_bytes)):
+        if valor is not None:
+            _config[clave] = valor
+    with _cache_lock:
+        if _cache is not None:
+            _cache.cerrar()
+            _cache = None
+
+
+def obtener_cache():
+    """Devuelve la cache global (creándola la primera vez), o None si está desactivada."""
+    global _cache
+    if not _config["activa"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheDisposicion(_config["ruta"], _config["max_bytes"])
+        return _cache
@@ -0,0 +1,344 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import src.sesion_http as sesion_http
+
+# Ubicación por defecto de la cache (se puede cambiar con la variable de entorno INTERACPPY_CACHE)
+RUTA_CACHE = os.environ.get(
+    "INTERACPPY_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "interacppy", "http.sqlite"),
+)
+
+# Tamaño máximo de la cache en bytes antes de desalojar las entradas menos usadas
+MAX_BYTES = 512 * 1024 * 1024
+
+DIA = 24 * 60 * 60
+
+# Fuente de datos de cada host y tiempo de vida (en segundos) de sus respuestas
+FUENTES_POR_HOST = {
+    "files.rcsb.org": "rcsb",
+    "www.uniprot.org": "uniprot",
+    "rest.uniprot.org": "uniprot",
+    "string-db.org": "string",
+    "rest.ensembl.org": "ensembl",
+    "www.ebi.ac.uk": "pdbe",
+}
+TTL_POR_FUENTE = {
+    "rcsb": 30 * DIA,      # las estructuras publicadas casi nunca cambian
+    "uniprot": 7 * DIA,
+    "string": 30 * DIA,    # STRING publica versiones nuevas cada varios meses
+    "ensembl": 7 * DIA,
+    "pdbe": 7 * DIA,
+}
+TTL_POR_DEFECTO = DIA
+
+
+class SinConexionError(requests.exceptions.ConnectionError):
+    """Se pidió una URL que no está en la cache estando en modo sin conexión."""
+
+
+class Respuesta:
+    """
+    Respuesta HTTP mínima (compatible con el uso que hacemos de requests.Response)
+    que puede venir de la red o de la cache.
+    """
+    __slots__ = ("url", "status_code", "headers", "content", "desde_cache")
+
+    def __init__(self, url, status_code, headers, content, desde_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.desde_cache = desde_cache
+
+    @classmethod
+    def desde_requests(cls, response):
+        return cls(response.url, response.status_code, dict(response.headers), response.content)
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_lines(self, decode_unicode=False):
+        for linea in self.content.splitlines():
+            yield linea.decode("utf-8", errors="replace") if decode_unicode else linea
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def normalizar_url(url):
+    """
+    Normaliza una URL para usarla como clave: esquema y host en minúsculas,
+    parámetros ordenados y sin fragmento.
+    """
+    partes = urlsplit(url)
+    host = partes.hostname or ""
+    if partes.port and partes.port not in (80, 443):
+        host = f"{host}:{partes.port}"
+    query = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((partes.scheme.lower(), host.lower(), partes.path or "/", query, ""))
+
+
+def _clave(url, variante=""):
+    clave = normalizar_url(url)
+    return f"{clave}#{variante}" if variante else clave
+
+
+def fuente_de_url(url):
+    """Devuelve el nombre de la fuente de datos (rcsb, string, ...) de una URL."""
+    return FUENTES_POR_HOST.get((urlsplit(url).hostname or "").lower())
+
+
+class CacheHTTP:
+    """
+    Cache persistente de respuestas HTTP sobre SQLite, con TTL por fuente y
+    desalojo LRU cuando se supera el presupuesto de bytes.
+
+    :param ruta: Archivo SQLite de la cache.
+    :param max_bytes: Tamaño máximo del contenido almacenado.
+    :param ttl_por_fuente: Diccionario {fuente: segundos} que reemplaza los TTL por defecto.
+    """
+
+    def __init__(self, ruta=RUTA_CACHE, max_bytes=MAX_BYTES, ttl_por_fuente=None):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.ttl_por_fuente = dict(TTL_POR_FUENTE, **(ttl_por_fuente or {}))
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS respuestas (
+                clave TEXT PRIMARY KEY,
+                fuente TEXT,
+                status INTEGER,
+                cabeceras TEXT,
+                contenido BLOB,
+                tamano INTEGER,
+                creado REAL,
+                ultimo_acceso REAL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acceso ON respuestas (ultimo_acceso)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()[0]
+
+    def ttl(self, fuente):
+        return self.ttl_por_fuente.get(fuente, TTL_POR_DEFECTO)
+
+    def leer(self, url, variante="", refrescar_desde=None):
+        """
+        Devuelve la Respuesta guardada para la URL, o None si no existe o expiró.
+
+        :param variante: Distingue contenidos parciales o transformados de la misma URL.
+        :param refrescar_desde: Momento (time.time()) antes del cual una respuesta guardada
+                                se considera vencida aunque no haya expirado su TTL.
+        """
+        clave = _clave(url, variante)
+        ahora = time.time()
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT fuente, status, cabeceras, contenido, creado FROM respuestas WHERE clave = ?", (clave,)
+            ).fetchone()
+            if (fila is None or ahora - fila[4] > self.ttl(fila[0])
+                    or (refrescar_desde is not None and fila[4] < refrescar_desde)):
+                self.fallos += 1
+                return None
+            self._db.execute("UPDATE respuestas SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+            self.aciertos += 1
+        return Respuesta(url, fila[1], json.loads(fila[2]), fila[3], desde_cache=True)
+
+    def guardar(self, url, respuesta, variante=""):
+        """Guarda una respuesta y desaloja las entradas menos usadas si se supera `max_bytes`."""
+        clave = _clave(url, variante)
+        contenido = respuesta.content
+        if len(contenido) > self.max_bytes:
+            return
+        ahora = time.time()
+        with self._lock:
+            anterior = self._db.execute("SELECT tamano FROM respuestas WHERE clave = ?", (clave,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (clave, fuente_de_url(url), respuesta.status_code, json.dumps(dict(respuesta.headers)),
+                 contenido, len(contenido), ahora, ahora),
+            )
+            self._bytes += len(contenido) - (anterior[0] if anterior else 0)
+            self._desalojar()
+
+    def _desalojar(self):
+        # Se llama con el lock tomado
+        while self._bytes > self.max_bytes:
+            filas = self._db.execute(
+                "SELECT clave, tamano FROM respuestas ORDER BY ultimo_acceso LIMIT 64"
+            ).fetchall()
+            if not filas:
+                self._bytes = 0
+                return
+            for clave, tamano in filas:
+                self._db.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+                self._bytes -= tamano
+                if self._bytes <= self.max_bytes:
+                    break
+
+    def vaciar(self):
+        """Elimina todas las entradas de la cache."""
+        with self._lock:
+            self._db.execute("DELETE FROM respuestas")
+            self._bytes = 0
+
+    def estadisticas(self):
+        """Devuelve los contadores de aciertos/fallos y el tamaño actual de la cache."""
+        with self._lock:
+            entradas = self._db.execute("SELECT COUNT(*) FROM respuestas").fetchone()[0]
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": entradas, "bytes": self._bytes}
+
+    def cerrar(self):
+        with self._lock:
+            self._db.close()
+
+
+# Configuración global usada por `get`
+_config = {"activa": True, "solo_cache": False, "ruta": RUTA_CACHE, "max_bytes": MAX_BYTES, "ttl_por_fuente": None}
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configurar(activa=None, solo_cache=None, ruta=None, max_bytes=None, ttl_por_fuente=None):
+    """
+    Cambia la configuración de la cache global.
+
+    :param activa: Si es False, todas las solicitudes van a la red y no se guarda nada.
+    :param solo_cache: Modo sin conexión: solo se responde desde la cache.
+    :param ruta: Archivo SQLite de la cache.
+    :param max_bytes: Presupuesto máximo de bytes.
+    :param ttl_por_fuente: Diccionario {fuente: segundos}.
+    """
+    global _cache
+    for clave, valor in (("activa", activa), ("solo_cache", solo_cache), ("ruta", ruta),
+                         ("max_bytes", max_bytes), ("ttl_por_fuente", ttl_por_fuente)):
+        if valor is not None:
+            _config[clave] = valor
+    with _cache_lock:
+        if _cache is not None:
+            _cache.cerrar()
+            _cache = None
+
+
+def ttl(fuente):
+    """Tiempo de vida (en segundos) configurado para las respuestas de una fuente (string, ensembl, ...)."""
+    return (_config["ttl_por_fuente"] or {}).get(fuente, TTL_POR_FUENTE.get(fuente, TTL_POR_DEFECTO))
+
+
+def sin_conexion():
+    """True si la cache global está en modo sin conexión (solo se responde desde la cache)."""
+    return _config["solo_cache"]
+
+
+def obtener_cache():
+    """Devuelve la cache global (creándola la primera vez), o None si está desactivada."""
+    global _cache
+    if not _config["activa"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheHTTP(_config["ruta"], _config["max_bytes"], _config["ttl_por_fuente"])
+        return _cache
+
+
+def get(url, headers=None, refrescar_desde=None, **kwargs):
+    """
+    Realiza un GET pasando por la cache en disco; los fallos de cache se
+    resuelven con la sesión compartida de `sesion_http`.
+
+    Solo se guardan las respuestas 200. En modo `solo_cache` una URL ausente
+    lanza SinConexionError (subclase de requests.exceptions.ConnectionError).
+
+    Con `refrescar_desde` (un time.time()) las respuestas guardadas antes de ese
+    momento se vuelven a pedir y se reemplazan (ej. al actualizar resultados con
+    --actualizar); en modo `solo_cache` se ignora, porque no se puede acceder a la red.
+    """
+    cache = obtener_cache()
+    if cache is not None:
+        respuesta = cache.leer(url, refrescar_desde=None if _config["solo_cache"] else refrescar_desde)
+        if respuesta is not None:
+            return respuesta
+
+    if _config["solo_cache"]:
+        raise SinConexionError(f"Modo sin conexión: {url} no está en la cache")
+
+    respuesta = Respuesta.desde_requests(sesion_http.get(url, headers=headers, **kwargs))
+    if cache is not None and respuesta.status_code == 200:
+        cache.guardar(url, respuesta)
+    return respuesta
+
+
+def iterar_lineas(url, es_fin=None, headers=None):
+    """
+    Itera las líneas (str, sin salto de línea) de una respuesta de texto sin
+    descargarla entera.
+
+    Los archivos .gz se descomprimen al vuelo. Si `es_fin(linea)` es verdadero
+    se corta la descarga en esa línea (que no se devuelve). Las líneas leídas
+    se guardan en la cache como una variante "prefijo" de la URL, así que una
+    nueva lectura no vuelve a acceder a la red.
+
+    Lanza requests.exceptions.HTTPError si la respuesta no es 200.
+    """
+    cache = obtener_cache()
+    variante = "prefijo"
+    if cache is not None:
+        respuesta = cache.leer(url, variante)
+        if respuesta is not None:
+            yield from respuesta.iter_lines(decode_unicode=True)
+            return
+
+    if _config["solo_cache"]:
+        raise SinConexionError(f"Modo sin conexión: {url} no está en la cache")
+
+    response = sesion_http.get(url, headers=headers, stream=True)
+    try:
+        if response.status_code != 200:
+            Respuesta(url, response.status_code, {}, b"").raise_for_status()
+
+        if url.endswith(".gz"):
+            response.raw.decode_content = True
+            lineas = gzip.GzipFile(fileobj=response.raw)
+        else:
+            lineas = response.iter_lines()
+
+        leidas = []
+        for linea in lineas:
+            linea = linea.decode("utf-8", errors="replace").rstrip("\r\n")
+            if es_fin is not None and es_fin(linea):
+                break
+            leidas.append(linea)
+            yield linea
+
+        if cache is not None:
+            contenido = "\n".join(leidas).encode("utf-8")
+            cache.guardar(url, Respuesta(url, 200, {}, contenido), variante)
+    finally:
+        # Cerrar la conexión descarta el resto del archivo (coordenadas) sin leerlo
+        response.close()
+
+
+def estadisticas():
+    """Contadores de la cache global ({} si está desactivada)."""
+    cache = obtener_cache()
+    return cache.estadisticas() if cache is not None else {}
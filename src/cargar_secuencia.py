@@ -1,107 +1,147 @@
+import re
 import requests
-from io import StringIO
-from Bio import SeqIO
 
-def load_sequence_from_pdb(pdb_id):
+import src.cache_http as cache_http
+import src.estructura as estructura
+
+RCSB_SERVER = "https://files.rcsb.org"
+UNIPROT_SERVER = "https://www.uniprot.org"
+
+# Organismo y taxón en la cabecera FASTA de UniProt
+PATRON_ORGANISMO = re.compile(r"\bOS=(.+?)(?= [A-Z]{2}=|$)")
+PATRON_TAXON = re.compile(r"\bOX=(\d+)")
+
+def cargar_estructura_desde_pdb(pdb_id):
     """
-    Carga la secuencia de proteína desde un archivo PDB usando el identificador PDB.
+    Carga la cabecera de una estructura de RCSB separada por cadena.
+
+    Se descarga el archivo PDB comprimido y se procesa en streaming: la descarga
+    se corta al terminar la cabecera, sin transferir las coordenadas. Las entradas
+    grandes que RCSB ya no publica en formato PDB se leen desde su mmCIF.
+
+    :param pdb_id: Identificador PDB.
+    :return: EstructuraProteina, o None si el ID no existe en RCSB o no se pudo descargar.
     """
-    url = f"https://files.rcsb.org/download/{pdb_id}.pdb"
-    response = requests.get(url, stream=True)
+    for extension in (".pdb.gz", ".cif.gz"):
+        url = f"{RCSB_SERVER}/download/{pdb_id}{extension}"
+        es_fin = estructura.es_fin_cabecera_cif if estructura.es_mmcif(url) else estructura.es_fin_cabecera
+        try:
+            return estructura.parsear_estructura(cache_http.iterar_lineas(url, es_fin=es_fin), url)
+        except requests.exceptions.HTTPError:
+            continue
+        except requests.exceptions.RequestException as e:
+            # Sin conexión o tiempo agotado: probar otro formato no cambiaría el resultado
+            print(f"Error al descargar la estructura {pdb_id}: {e}")
+            return None
+    return None
 
-    if response.status_code != 200:
-        print(f"El ID introducido no es un ID de PDB válido: {pdb_id}")
+def cargar_estructura_desde_archivo(file_path):
+    """
+    Carga la cabecera de un archivo de estructura local separada por cadena.
+
+    :param file_path: Ruta a un archivo .pdb, .ent o .cif (opcionalmente comprimido con gzip).
+    :return: EstructuraProteina, o None si no se pudo leer el archivo.
+    """
+    if not file_path.lower().endswith(estructura.EXTENSIONES):
+        print(f"Formato de archivo no soportado: {file_path}")
         return None
-    file = response.content.decode('utf-8')
-
-    # Ahora, extraemos la secuencia de aminoácidos del PDB
-    sequence = []
-    especie = None
-
-    for line in file.splitlines():
-        if line.startswith("SEQRES"):
-            sequence.append("".join(line[19:].split()))
-        elif line.startswith("SOURCE") and "ORGANISM_SCIENTIFIC" in line:
-            # Extraer el nombre científico de la especie
-            parts = line.split(":")
-            if len(parts) > 1:
-                especie = parts[1].strip().strip(";")
-
-    # Unir todas las cadenas de la secuencia
-    sequence = "".join(sequence)
-    if not sequence:
+    try:
+        return estructura.leer_archivo(file_path)
+    except Exception as e:
+        print(f"Error al procesar el archivo PDB: {e}")
+        return None
+
+def load_sequence_from_pdb(pdb_id):
+    """
+    Carga la secuencia de proteína (código de una letra, todas las cadenas
+    concatenadas) y la especie desde RCSB usando el identificador PDB.
+    """
+    datos = cargar_estructura_desde_pdb(pdb_id)
+    if datos is None:
+        print(f"El ID introducido no es un ID de PDB válido: {pdb_id}")
+        return None, None
+
+    if not datos.secuencia:
         print(f"No se pudo extraer la secuencia del PDB con ID {pdb_id}")
-        return None, especie
-    return sequence, especie
+        return None, datos.organismo
+    return datos.secuencia, datos.organismo
+
+def leer_fasta(texto):
+    """
+    Lee un FASTA con una sola entrada (el que devuelve UniProt para un ID).
+
+    :param texto: Contenido del archivo FASTA.
+    :return: Tupla (descripcion, secuencia): la cabecera sin ">" y la secuencia sin saltos de línea.
+    :raises ValueError: Si no hay ninguna entrada o hay más de una.
+    """
+    descripcion = None
+    partes = []
+    for linea in texto.splitlines():
+        linea = linea.strip()
+        if linea.startswith(">"):
+            if descripcion is not None:
+                raise ValueError("El FASTA tiene más de una entrada.")
+            descripcion = linea[1:].strip()
+        elif linea and descripcion is not None:
+            partes.append(linea)
+        elif linea:
+            raise ValueError("El FASTA no empieza con una cabecera '>'.")
+    if descripcion is None:
+        raise ValueError("El FASTA no tiene ninguna entrada.")
+    return descripcion, "".join(partes)
 
 def load_sequence_from_uniprot(uniprot_id):
     """
     Carga la secuencia de proteína desde UniProt usando el ID de UniProt.
     """
-    url = f"https://www.uniprot.org/uniprot/{uniprot_id}.fasta"
-    response = requests.get(url)
+    return cargar_fasta_desde_uniprot(uniprot_id)[0]
+
+def cargar_fasta_desde_uniprot(uniprot_id):
+    """
+    Carga la secuencia de proteína y el organismo desde el FASTA de UniProt.
+
+    La cabecera de UniProt incluye el organismo (OS=) y su taxón de NCBI (OX=),
+    ej. ">sp|P04637|P53_HUMAN Cellular tumor antigen p53 OS=Homo sapiens OX=9606 GN=TP53".
+
+    :param uniprot_id: Identificador de UniProt.
+    :return: Tupla (secuencia, organismo, taxon); (None, None, None) si no se pudo leer.
+    """
+    url = f"{UNIPROT_SERVER}/uniprot/{uniprot_id}.fasta"
+    response = cache_http.get(url)
 
     if response.status_code != 200:
         print(f"El ID introducido no es un ID de UniProt válido: {uniprot_id}")
-        return None
+        return None, None, None
 
-    # Usamos BioPython para leer la secuencia en formato FASTA
-    fasta_data = response.text
     try:
-        # SeqIO.read para leer una sola entrada FASTA
-        record = SeqIO.read(StringIO(fasta_data), "fasta")
-        
-        return str(record.seq)
-    except Exception as e:
+        descripcion, secuencia = leer_fasta(response.text)
+    except ValueError as e:
         print(f"Error al leer el archivo FASTA de UniProt: {e}")
-        return None
+        return None, None, None
+
+    organismo = PATRON_ORGANISMO.search(descripcion)
+    taxon = PATRON_TAXON.search(descripcion)
+    return (secuencia, organismo.group(1).strip() if organismo else None,
+            int(taxon.group(1)) if taxon else None)
 
 def load_sequence_from_file(file_path):
     """
-    Carga la secuencia de la proteína, el ID de PDB y la especie desde un archivo PDB.
+    Carga la secuencia de la proteína, el ID de PDB y la especie desde un archivo
+    .pdb, .ent o .cif (opcionalmente comprimido con gzip). Solo se lee la cabecera.
     
-    :param file_path: Ruta del archivo PDB local.
+    :param file_path: Ruta del archivo de estructura local.
     :return: Tuple (secuencia, pdb_id, especie) o (None, None, None) si no se encuentra la información.
     """
-    secuencia = []
-    pdb_id = None  # Cambié 'uniprot_id' por 'pdb_id' para extraer el ID de PDB
-    especie = None
+    datos = cargar_estructura_desde_archivo(file_path)
+    if datos is None:
+        return None, None, None
 
-    try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-        
-        # Extraer la secuencia de la proteína
-        for line in lines:
-            if line.startswith("SEQRES"):  # Las líneas que contienen la secuencia de la proteína
-                secuencia.append("".join(line[19:].split()))  # Concatenar las cadenas de aminoácidos
-            elif line.startswith("SOURCE") and "ORGANISM_SCIENTIFIC" in line:
-                # Extraer el nombre científico de la especie
-                parts = line.split(":")
-                if len(parts) > 1:
-                    especie = parts[1].strip().strip(";")
-        
-        secuencia = "".join(secuencia)  # Unir todas las cadenas de la secuencia
-        
-        # Buscar el ID de PDB en las líneas DBREF
-        for line in lines:
-            if line.startswith("DBREF"):
-                # La estructura de la línea DBREF es: DBREF <pdb_id> <cadena> <inicio> <fin> <base> <id_uniprot> <nombre_uniprot> ...
-                parts = line.split()  # Separar la línea en partes
-                if len(parts) > 1:  # Asegurarse de que haya al menos 2 partes
-                    pdb_id = parts[1]  # El ID de PDB está en la segunda columna (índice 1)
-                    break  # Salir del bucle una vez encontrado
-        
-        if not secuencia:
-            print("No se pudo encontrar la secuencia de la proteína en el archivo PDB.")
-            return None, None, None
-        
-        if not pdb_id:
-            print("No se encontró un ID de PDB en el archivo PDB.")
-            return secuencia, None, especie
-        
-        return secuencia, pdb_id, especie
-    
-    except Exception as e:
-        print(f"Error al procesar el archivo PDB: {e}")
+    if not datos.secuencia:
+        print("No se pudo encontrar la secuencia de la proteína en el archivo PDB.")
         return None, None, None
+
+    if not datos.pdb_id:
+        print("No se encontró un ID de PDB en el archivo PDB.")
+        return datos.secuencia, None, datos.organismo
+
+    return datos.secuencia, datos.pdb_id, datos.organismo
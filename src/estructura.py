@@ -0,0 +1,264 @@
+import gzip
+import re
+
+# Conversión de códigos de residuo de tres letras a una letra
+TRES_A_UNO = {
+    # Aminoácidos estándar
+    "ALA": "A", "ARG": "R", "ASN": "N", "ASP": "D", "CYS": "C",
+    "GLN": "Q", "GLU": "E", "GLY": "G", "HIS": "H", "ILE": "I",
+    "LEU": "L", "LYS": "K", "MET": "M", "PHE": "F", "PRO": "P",
+    "SER": "S", "THR": "T", "TRP": "W", "TYR": "Y", "VAL": "V",
+    # Aminoácidos no estándar y modificados frecuentes
+    "SEC": "U", "PYL": "O", "MSE": "M", "ASX": "B", "GLX": "Z",
+    "UNK": "X",
+    # Nucleótidos (ADN y ARN)
+    "DA": "A", "DC": "C", "DG": "G", "DT": "T", "DU": "U", "DI": "I",
+    "A": "A", "C": "C", "G": "G", "U": "U", "T": "T", "I": "I", "N": "N",
+}
+
+# Registros con los que empiezan las coordenadas: la cabecera (SEQRES/SOURCE/DBREF) ya terminó
+REGISTROS_FIN_CABECERA = ("ATOM", "HETATM", "MODEL")
+
+# Extensiones de archivo de estructura aceptadas
+EXTENSIONES_PDB = (".pdb", ".pdb.gz", ".ent", ".ent.gz")
+EXTENSIONES_CIF = (".cif", ".cif.gz")
+EXTENSIONES = EXTENSIONES_PDB + EXTENSIONES_CIF
+
+
+class EstructuraProteina:
+    """
+    Datos de cabecera de una estructura, separados por cadena.
+
+    :ivar pdb_id: Identificador PDB de la entrada (o None).
+    :ivar organismo: Nombre científico del organismo de origen (o None).
+    :ivar cadenas: Diccionario {id_cadena: secuencia en código de una letra}, en orden de aparición.
+    :ivar dbref: Lista de tuplas (id_cadena, base_de_datos, accesion, nombre) con las referencias externas.
+    """
+    __slots__ = ("pdb_id", "organismo", "cadenas", "dbref")
+
+    def __init__(self, pdb_id=None, organismo=None, cadenas=None, dbref=None):
+        self.pdb_id = pdb_id
+        self.organismo = organismo
+        self.cadenas = cadenas if cadenas is not None else {}
+        self.dbref = dbref if dbref is not None else []
+
+    @property
+    def secuencia(self):
+        """Secuencias de todas las cadenas concatenadas."""
+        return "".join(self.cadenas.values())
+
+    def accesiones(self, base_de_datos="UNP"):
+        """Devuelve {id_cadena: accesion} para las referencias de la base indicada (UNP = UniProt)."""
+        resultado = {}
+        for cadena, base, accesion, _ in self.dbref:
+            if base == base_de_datos:
+                resultado.setdefault(cadena, accesion)
+        return resultado
+
+    def __repr__(self):
+        cadenas = ", ".join(f"{cadena}:{len(secuencia)}" for cadena, secuencia in self.cadenas.items())
+        return f"EstructuraProteina(pdb_id={self.pdb_id!r}, organismo={self.organismo!r}, cadenas=[{cadenas}])"
+
+
+def tres_a_uno(residuos):
+    """
+    Convierte una lista de códigos de tres letras a una secuencia de una letra.
+    Los códigos desconocidos se representan con "X".
+    """
+    return "".join([TRES_A_UNO.get(residuo, "X") for residuo in residuos])
+
+
+def es_fin_cabecera(linea):
+    """Indica si la línea ya pertenece a la sección de coordenadas del PDB."""
+    return linea.startswith(REGISTROS_FIN_CABECERA)
+
+
+def es_fin_cabecera_cif(linea):
+    """Indica si la línea inicia la categoría de coordenadas (_atom_site) de un mmCIF."""
+    return linea.startswith("_atom_site.")
+
+
+def parsear_pdb(lineas):
+    """
+    Recorre una sola vez las líneas de un archivo PDB y extrae los datos de la cabecera.
+    Deja de leer en cuanto empiezan las coordenadas, sin consumir el resto del archivo.
+
+    :param lineas: Iterable de líneas (str) del archivo PDB.
+    :return: EstructuraProteina (con `cadenas` vacío si no hay SEQRES).
+    """
+    estructura = EstructuraProteina()
+    residuos = {}
+
+    for linea in lineas:
+        if linea.startswith(REGISTROS_FIN_CABECERA):
+            break
+        registro = linea[:6]
+        if registro == "SEQRES":
+            # Los registros truncados antes del identificador de cadena no aportan residuos
+            if len(linea) > 11:
+                residuos.setdefault(linea[11], []).extend(linea[19:].split())
+        elif registro == "SOURCE" and "ORGANISM_SCIENTIFIC" in linea and estructura.organismo is None:
+            # Extraer el nombre científico de la especie
+            partes = linea.split(":")
+            if len(partes) > 1:
+                estructura.organismo = partes[1].strip().strip(";").strip()
+        elif registro == "HEADER":
+            estructura.pdb_id = linea[62:66].strip() or estructura.pdb_id
+        elif registro == "DBREF ":
+            # DBREF <pdb_id> <cadena> <inicio> <fin> <base> <accesion> <nombre> ...
+            estructura.pdb_id = estructura.pdb_id or linea[7:11].strip()
+            estructura.dbref.append((linea[12:13], linea[26:32].strip(), linea[33:41].strip(), linea[42:54].strip()))
+        elif registro == "DBREF1":
+            # Las accesiones largas se reparten en DBREF1 (base y nombre) y DBREF2 (accesion)
+            estructura.pdb_id = estructura.pdb_id or linea[7:11].strip()
+            estructura.dbref.append((linea[12:13], linea[26:32].strip(), None, linea[47:67].strip()))
+        elif registro == "DBREF2" and estructura.dbref:
+            cadena, base, _, nombre = estructura.dbref[-1]
+            estructura.dbref[-1] = (cadena, base, linea[18:40].strip(), nombre)
+
+    estructura.cadenas = {cadena: tres_a_uno(lista) for cadena, lista in residuos.items()}
+    return estructura
+
+
+# Token de mmCIF: cadena entre comillas simples o dobles (la comilla de cierre va seguida
+# de un espacio o del fin de línea) o una palabra sin espacios
+_PATRON_TOKEN_CIF = re.compile(r"""'(.*?)'(?=\s|$)|"(.*?)"(?=\s|$)|(\S+)""")
+
+# Categorías de mmCIF que se conservan; el resto se descarta al leer
+_CATEGORIAS_CIF = ("_entry", "_entity_poly", "_entity_src_gen", "_entity_src_nat",
+                   "_pdbx_entity_src_syn", "_struct_ref", "_struct_ref_seq")
+
+
+def _tokens_cif(lineas):
+    """
+    Genera los tokens (texto, es_valor) de un mmCIF. `es_valor` es True para los
+    valores entre comillas o campos de texto con ";", que nunca son palabras clave.
+    Se detiene al llegar a las coordenadas (_atom_site).
+    """
+    lineas = iter(lineas)
+    for linea in lineas:
+        if linea.startswith(";"):
+            # Campo de texto multilínea: termina en una línea que empieza con ";"
+            partes = [linea[1:]]
+            for linea in lineas:
+                if linea.startswith(";"):
+                    break
+                partes.append(linea)
+            yield "\n".join(partes), True
+            continue
+        if es_fin_cabecera_cif(linea):
+            return
+        for token in _PATRON_TOKEN_CIF.finditer(linea):
+            simple, doble, palabra = token.groups()
+            if palabra is not None:
+                if palabra.startswith("#"):
+                    break
+                yield palabra, False
+            else:
+                yield simple if simple is not None else doble, True
+
+
+def leer_categorias_cif(lineas, categorias=_CATEGORIAS_CIF):
+    """
+    Lee las categorías indicadas de un mmCIF (hasta las coordenadas).
+
+    :return: Diccionario {categoria: {atributo: [valores]}}.
+    """
+    datos = {}
+    nombres_loop = None     # atributos de un loop_ mientras se leen sus nombres
+    valores_loop = None     # atributos del loop_ cuyos valores se están leyendo
+    indice = 0
+    pendiente = None        # atributo simple esperando su valor
+
+    def agregar(nombre, valor):
+        categoria, _, atributo = nombre.partition(".")
+        if categoria in categorias:
+            datos.setdefault(categoria, {}).setdefault(atributo, []).append(valor)
+
+    for token, es_valor in _tokens_cif(lineas):
+        if not es_valor and token == "loop_":
+            nombres_loop, valores_loop, pendiente = [], None, None
+        elif not es_valor and token.startswith("_"):
+            if nombres_loop is not None:
+                nombres_loop.append(token)
+            else:
+                valores_loop, pendiente = None, token
+        elif not es_valor and token.startswith("data_"):
+            nombres_loop = valores_loop = pendiente = None
+        elif pendiente is not None:
+            agregar(pendiente, token)
+            pendiente = None
+        else:
+            if nombres_loop is not None:
+                valores_loop, nombres_loop, indice = nombres_loop, None, 0
+            if valores_loop:
+                agregar(valores_loop[indice % len(valores_loop)], token)
+                indice += 1
+
+    return datos
+
+
+def parsear_mmcif(lineas):
+    """
+    Extrae de un archivo mmCIF (PDBx) las secuencias por cadena, el organismo y las
+    referencias externas. Deja de leer al llegar a las coordenadas (_atom_site).
+
+    :param lineas: Iterable de líneas (str) del archivo mmCIF.
+    :return: EstructuraProteina.
+    """
+    datos = leer_categorias_cif(lineas)
+    estructura = EstructuraProteina()
+
+    estructura.pdb_id = (datos.get("_entry", {}).get("id") or [None])[0]
+
+    poly = datos.get("_entity_poly", {})
+    for cadenas, secuencia in zip(poly.get("pdbx_strand_id", []), poly.get("pdbx_seq_one_letter_code_can", [])):
+        secuencia = "".join(secuencia.split())
+        for cadena in cadenas.split(","):
+            estructura.cadenas[cadena.strip()] = secuencia
+
+    for categoria, atributo in (("_entity_src_gen", "pdbx_gene_src_scientific_name"),
+                                ("_entity_src_nat", "pdbx_organism_scientific"),
+                                ("_pdbx_entity_src_syn", "organism_scientific")):
+        nombres = [nombre for nombre in datos.get(categoria, {}).get(atributo, []) if nombre not in ("?", ".")]
+        if nombres:
+            estructura.organismo = nombres[0].upper()
+            break
+
+    ref = datos.get("_struct_ref", {})
+    bases = dict(zip(ref.get("id", []), zip(ref.get("db_name", []), ref.get("db_code", []))))
+    ref_seq = datos.get("_struct_ref_seq", {})
+    for ref_id, cadena, accesion in zip(ref_seq.get("ref_id", []), ref_seq.get("pdbx_strand_id", []),
+                                        ref_seq.get("pdbx_db_accession", [])):
+        base, nombre = bases.get(ref_id, (None, None))
+        estructura.dbref.append((cadena, base, accesion, nombre))
+
+    return estructura
+
+
+def es_mmcif(nombre):
+    """Indica si un nombre de archivo o URL corresponde a un mmCIF (.cif o .cif.gz)."""
+    return nombre.lower().endswith(EXTENSIONES_CIF)
+
+
+def abrir_texto(ruta):
+    """Abre un archivo de texto, descomprimiéndolo al vuelo si termina en .gz."""
+    if ruta.lower().endswith(".gz"):
+        return gzip.open(ruta, "rt", encoding="utf-8", errors="replace")
+    return open(ruta, "r", encoding="utf-8", errors="replace")
+
+
+def parsear_estructura(lineas, nombre):
+    """Elige el parser (PDB o mmCIF) según la extensión de `nombre`."""
+    return parsear_mmcif(lineas) if es_mmcif(nombre) else parsear_pdb(lineas)
+
+
+def leer_archivo(ruta):
+    """
+    Lee la cabecera de un archivo de estructura local (.pdb, .ent, .cif, opcionalmente .gz)
+    en streaming, sin cargar las coordenadas en memoria.
+
+    :return: EstructuraProteina.
+    """
+    with abrir_texto(ruta) as f:
+        return parsear_estructura((linea.rstrip("\r\n") for linea in f), ruta)
@@ -0,0 +1,97 @@
+"""
+Expansión de la red de una proteína a varios saltos (búsqueda en anchura).
+
+Cada nivel de la búsqueda se consulta con una sola ronda de solicitudes agrupadas
+a interaction_partners (ver `obtener_interacciones.obtener_vecinos`), de modo que
+la cantidad de solicitudes crece con el número de saltos y el tamaño de la
+frontera, no con la cantidad de nodos visitados.
+"""
+import src.obtener_interacciones as obtener_interacciones
+import src.taxonomia as taxonomia
+
+# Score combinado mínimo (0-1000) de las aristas que se siguen
+SCORE_MINIMO = 400
+
+# Nodos nuevos que se agregan como máximo en cada salto, y límites de toda la red
+MAX_NODOS_POR_SALTO = 50
+MAX_NODOS = 500
+MAX_ARISTAS = 5000
+
+
+def expandir(proteina_id, saltos=2, score_minimo=SCORE_MINIMO, vecinos_por_nodo=obtener_interacciones.LIMITE_VECINOS,
+             max_nodos_por_salto=MAX_NODOS_POR_SALTO, max_nodos=MAX_NODOS, max_aristas=MAX_ARISTAS,
+             formatos=obtener_interacciones.FORMATOS, tamano_lote=obtener_interacciones.TAMANO_LOTE_STRING,
+             max_concurrencia=obtener_interacciones.MAX_CONCURRENCIA, especie=taxonomia.ESPECIE_POR_DEFECTO,
+             refrescar_desde=None):
+    """
+    Obtiene el vecindario de una proteína hasta `saltos` saltos de distancia.
+
+    En cada salto se piden juntos los vecinos de toda la frontera; de los nodos
+    no visitados se agregan los `max_nodos_por_salto` unidos por la arista de
+    mayor score. La búsqueda termina al agotar los saltos o al alcanzar
+    `max_nodos` o `max_aristas`. Al final se pide una ronda más para la última
+    frontera, solo para agregar las aristas entre nodos ya visitados.
+
+    Args:
+    proteina_id (str): El identificador de la proteína (UniProt, PDB o STRING).
+    saltos (int): Distancia máxima a la proteína consultada.
+    score_minimo (int): Score combinado mínimo (0-1000) de las aristas.
+    vecinos_por_nodo (int): Vecinos que se piden a STRING por cada nodo de la frontera.
+    max_nodos_por_salto (int): Nodos nuevos que se agregan como máximo en cada salto.
+    max_nodos (int): Cantidad máxima de nodos de la red.
+    max_aristas (int): Cantidad máxima de aristas de la red.
+    formatos (list): Formatos de salida que se van a derivar.
+    tamano_lote (int): Identificadores por solicitud a STRING.
+    max_concurrencia (int): Número máximo de solicitudes simultáneas a Ensembl.
+    especie (int): Taxón de STRING de la proteína (ver src/taxonomia.py).
+    refrescar_desde (float): Momento antes del cual no se usan las respuestas guardadas
+                             (ver `obtener_interacciones.obtener_red`), o None.
+
+    Returns:
+    dict: Red con el mismo formato que `obtener_interacciones.obtener_red`, más
+          "distancias" ({id_string: salto}) y "truncada" (True si se alcanzó un límite),
+          o None si la proteína no se encontró en STRING.
+    """
+    semilla = obtener_interacciones.resolver_string_ids([proteina_id], tamano_lote, especie=especie,
+                                                        refrescar_desde=refrescar_desde).get(proteina_id)
+    if semilla is None:
+        print(f"Error: No se encontró {proteina_id} en STRING.")
+        return None
+
+    distancias = {semilla: 0}
+    aristas = {}        # (id_a, id_b) ordenado -> interacción, una sola vez por par
+    truncada = False
+
+    frontera = [semilla]
+    for salto in range(1, saltos + 2):
+        if not frontera or len(aristas) >= max_aristas:
+            break
+        vecinos = obtener_interacciones.obtener_vecinos(frontera, vecinos_por_nodo, score_minimo, tamano_lote, especie=especie,
+                                                        refrescar_desde=refrescar_desde)
+        items = sorted((item for lista in vecinos.values() if lista for item in lista),
+                       key=lambda item: -item.get("score", 0))
+
+        # Nodos nuevos, en orden de la mejor arista que los une a la frontera
+        nuevos = []
+        if salto <= saltos:
+            nuevos = list(dict.fromkeys(item["stringId_B"] for item in items if item["stringId_B"] not in distancias))
+            if len(nuevos) > max_nodos - len(distancias):
+                truncada = True
+            nuevos = nuevos[:max(min(max_nodos_por_salto, max_nodos - len(distancias)), 0)]
+            for nodo in nuevos:
+                distancias[nodo] = salto
+
+        # Solo se conservan las aristas entre nodos visitados, una vez por par
+        for item in items:
+            par = tuple(sorted((item["stringId_A"], item["stringId_B"])))
+            if par in aristas or par[0] not in distancias or par[1] not in distancias:
+                continue
+            if len(aristas) >= max_aristas:
+                truncada = True
+                break
+            aristas[par] = item
+        frontera = nuevos
+
+    red = obtener_interacciones.armar_red(proteina_id, list(aristas.values()), formatos, max_concurrencia, refrescar_desde)
+    red.update(distancias=distancias, truncada=truncada)
+    return red
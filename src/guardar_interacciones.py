@@ -1,48 +1,268 @@
+import gzip
 import json
 import os
+import time
+import uuid
 
-def guardar_interacciones_json(interacciones, ruta_archivo, identificadores=None):
+import src.perfil as perfil
+import src.tabla_interacciones as tabla_interacciones
+
+# Formatos de guardado y la extensión de cada uno
+EXTENSIONES = {
+    "json": ".json",
+    "json.gz": ".json.gz",
+    "ndjson": ".ndjson",
+    "ndjson.gz": ".ndjson.gz",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+FORMATOS = tuple(EXTENSIONES)
+
+# Las extensiones más largas primero, para reconocer ".ndjson.gz" antes que ".gz"
+_EXTENSIONES_CONOCIDAS = sorted(EXTENSIONES.values(), key=len, reverse=True)
+
+
+def _registros(interacciones, identificadores=None):
     """
-    Guarda las interacciones en un archivo JSON, asegurando que incluyan los identificadores correctos.
+    Genera las interacciones como diccionarios sin modificar los originales.
+    Una tabla se renombra por nodo y se convierte por bloques.
+    """
+    if isinstance(interacciones, tabla_interacciones.TablaInteracciones):
+        if identificadores:
+            interacciones = interacciones.renombrar(identificadores)
+        yield from interacciones.iterar()
+        return
 
-    :param interacciones: Lista de diccionarios con las interacciones a guardar.
-    :param ruta_archivo: Ruta del archivo donde se guardarán las interacciones.
+    for interaccion in interacciones:
+        if identificadores:
+            # Copia con los nombres genéricos reemplazados por los reales
+            interaccion = dict(interaccion)
+            for campo in ("proteina_1", "proteina_2"):
+                if campo in interaccion:
+                    interaccion[campo] = identificadores.get(interaccion[campo], interaccion[campo])
+        yield interaccion
+
+
+def _escribir_json(registros, archivo, indent=4):
+    """
+    Escribe un array JSON registro por registro. Con `indent` el resultado es el
+    mismo que json.dump(lista, indent=indent); sin él se escribe compacto.
+    """
+    archivo.write("[")
+    primero = True
+    for registro in registros:
+        if indent is not None:
+            texto = json.dumps(registro, indent=indent, ensure_ascii=False)
+            texto = "\n" + " " * indent + texto.replace("\n", "\n" + " " * indent)
+        else:
+            texto = json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+        archivo.write(texto if primero else "," + texto)
+        primero = False
+    archivo.write("\n]" if indent is not None and not primero else "]")
+
+
+def _escribir_ndjson(registros, archivo):
+    """Escribe un registro JSON por línea."""
+    for registro in registros:
+        archivo.write(json.dumps(registro, ensure_ascii=False))
+        archivo.write("\n")
+
+
+def _escribir_columnar(interacciones, identificadores, ruta, formato):
+    """Escribe un archivo Parquet o Feather con una columna por campo (requiere pyarrow)."""
+    import pyarrow as pa
+
+    tabla = interacciones
+    if not isinstance(tabla, tabla_interacciones.TablaInteracciones):
+        tabla = tabla_interacciones.TablaInteracciones.desde_lista(interacciones)
+    if identificadores:
+        tabla = tabla.renombrar(identificadores)
+
+    columnas = {
+        "proteina_1": pa.array(tabla.proteina_1.tolist(), type=pa.string()),
+        "proteina_2": pa.array(tabla.proteina_2.tolist(), type=pa.string()),
+    }
+    for campo in tabla_interacciones.CAMPOS_SCORE:
+        columnas[campo] = pa.array(tabla.columna(campo), type=pa.float32())
+    # La correspondencia de cada columna con el campo de la API de STRING viaja con el archivo
+    tabla_arrow = pa.table(columnas).replace_schema_metadata(
+        {"interacppy.canales": json.dumps(tabla_interacciones.CAMPOS_STRING)})
+
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(tabla_arrow, ruta, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(tabla_arrow, ruta, compression="zstd")
+
+
+@perfil.etapa("guardado")
+def _escribir(interacciones, identificadores, ruta, formato):
+    """Escribe las interacciones en `ruta` con el escritor del formato indicado."""
+    if formato in ("parquet", "feather"):
+        _escribir_columnar(interacciones, identificadores, ruta, formato)
+        return
+
+    registros = _registros(interacciones, identificadores)
+    abrir = gzip.open if formato.endswith(".gz") else open
+    with abrir(ruta, "wt", encoding="utf-8") as archivo:
+        if formato.startswith("ndjson"):
+            _escribir_ndjson(registros, archivo)
+        else:
+            # El JSON comprimido se escribe compacto; el plano conserva la sangría de siempre
+            _escribir_json(registros, archivo, indent=None if formato == "json.gz" else 4)
+
+
+def _nombre_alternativo(ruta):
+    """Nombre único para `ruta` (marca de tiempo + sufijo aleatorio), sin recorrer la carpeta."""
+    extension = next((ext for ext in _EXTENSIONES_CONOCIDAS if ruta.lower().endswith(ext)), "")
+    base = ruta[:len(ruta) - len(extension)]
+    return f"{base}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}{extension}"
+
+
+def _publicar(temporal, destino):
+    """
+    Mueve el archivo temporal a `destino` de forma atómica y sin pisar un archivo
+    existente. Lanza FileExistsError si `destino` ya existe.
+    """
+    try:
+        # link falla si el destino existe, así que nunca se sobrescribe un resultado
+        os.link(temporal, destino)
+    except FileExistsError:
+        raise
+    except (OSError, AttributeError):
+        # Sistemas de archivos sin enlaces: rename tampoco sobrescribe en Windows
+        if os.path.exists(destino):
+            raise FileExistsError(destino)
+        os.replace(temporal, destino)
+        return
+    os.unlink(temporal)
+
+
+def _publicar_en(temporal, ruta_completa, sobrescribir=False):
+    """
+    Publica el archivo temporal como `ruta_completa`, o con un nombre alternativo
+    único si ya existe (salvo con `sobrescribir`). Devuelve la ruta final.
+    """
+    if sobrescribir:
+        # Al actualizar resultados (ver src/manifiesto.py) el archivo se reemplaza en su lugar
+        os.replace(temporal, ruta_completa)
+        return ruta_completa
+
+    # Si el archivo ya existe, usar un nombre alternativo único
+    if os.path.exists(ruta_completa):
+        ruta_completa = _nombre_alternativo(ruta_completa)
+    try:
+        _publicar(temporal, ruta_completa)
+    except FileExistsError:
+        # Otro proceso tomó el nombre entre la verificación y la publicación
+        ruta_completa = _nombre_alternativo(ruta_completa)
+        _publicar(temporal, ruta_completa)
+    return ruta_completa
+
+
+def guardar_interacciones(interacciones, ruta_archivo, formato="json", identificadores=None, sobrescribir=False):
+    """
+    Guarda las interacciones en la carpeta "resultados" con el formato indicado.
+
+    Los registros se escriben de a uno en un archivo temporal de la misma carpeta
+    que luego se publica con el nombre final de forma atómica: un archivo a medio
+    escribir nunca queda con el nombre definitivo. Si el nombre ya existe, se usa
+    uno con marca de tiempo y sufijo aleatorio en lugar de buscar un número libre,
+    salvo con `sobrescribir`, que reemplaza el archivo existente (también de forma atómica).
+
+    :param interacciones: Lista de diccionarios o TablaInteracciones con las interacciones a guardar.
+    :param ruta_archivo: Ruta del archivo; la extensión se ajusta al formato.
+    :param formato: Uno de FORMATOS ("json", "json.gz", "ndjson", "ndjson.gz", "parquet", "feather").
     :param identificadores: Diccionario opcional que mapea nombres genéricos a identificadores reales (ej. Uniprot o PDB IDs).
+                            Las interacciones recibidas no se modifican.
+    :param sobrescribir: Si es True, un archivo existente con el mismo nombre se reemplaza.
+    :return: Ruta del archivo guardado, o None si hubo un error.
     """
+    if formato not in EXTENSIONES:
+        print(f"Formato de guardado {formato} no soportado. Use uno de: {', '.join(FORMATOS)}.")
+        return None
+
+    temporal = None
     try:
         # Asegurarse de que la carpeta "resultados" exista
-        if not os.path.exists('resultados'):
-            os.makedirs('resultados')
-            
-
-        # Asegurarse de que el archivo tenga la extensión .json
-        if not ruta_archivo.lower().endswith('.json'):
-            ruta_archivo = f"{os.path.splitext(ruta_archivo)[0]}.json"
-
-        # Crear la ruta completa del archivo en la carpeta "resultados"
-        ruta_completa = os.path.join('resultados', os.path.basename(ruta_archivo))
-
-        # Verificar si el archivo ya existe y modificar el nombre si es necesario
-        if os.path.exists(ruta_completa):
-            base, ext = os.path.splitext(ruta_completa)
-            i = 1
-            # Generar un nuevo nombre con un número añadido al final
-            while os.path.exists(f"{base}_{i}{ext}"):
-                i += 1
-            ruta_completa = f"{base}_{i}{ext}"
-
-        # Si se proporcionaron identificadores, reemplazar nombres genéricos por los reales
-        if identificadores:
-            for interaccion in interacciones:
-                if "proteina_1" in interaccion:
-                    interaccion["proteina_1"] = identificadores.get(interaccion["proteina_1"], interaccion["proteina_1"])
-                if "proteina_2" in interaccion:
-                    interaccion["proteina_2"] = identificadores.get(interaccion["proteina_2"], interaccion["proteina_2"])
-
-        # Guardar las interacciones en formato JSON
-        with open(ruta_completa, 'w', encoding='utf-8') as file:
-            json.dump(interacciones, file, indent=4, ensure_ascii=False)
+        os.makedirs('resultados', exist_ok=True)
+
+        # Ajustar la extensión al formato (reemplazando una extensión conocida o la última)
+        nombre = os.path.basename(ruta_archivo)
+        extension = next((ext for ext in _EXTENSIONES_CONOCIDAS if nombre.lower().endswith(ext)), None)
+        if extension is not None:
+            nombre = nombre[:len(nombre) - len(extension)]
+        else:
+            nombre = os.path.splitext(nombre)[0]
+        ruta_completa = os.path.join('resultados', nombre + EXTENSIONES[formato])
+
+        # Temporal oculto con nombre único en la misma carpeta (el rename final no cambia de disco)
+        temporal = os.path.join('resultados', f".{nombre}.{uuid.uuid4().hex}.tmp")
+        _escribir(interacciones, identificadores, temporal, formato)
+
+        ruta_completa = _publicar_en(temporal, ruta_completa, sobrescribir)
+        temporal = None
+
         print(f"Interacciones guardadas en: {ruta_completa}")
-    
+        return ruta_completa
+
+    except ImportError:
+        print(f"Error: el formato {formato} requiere pyarrow (pip install pyarrow).")
+    except Exception as e:
+        print(f"Error al guardar las interacciones en {formato}: {e}")
+    finally:
+        if temporal is not None and os.path.exists(temporal):
+            os.unlink(temporal)
+    return None
+
+
+def guardar_metricas(metricas, ruta_archivo, sobrescribir=False):
+    """
+    Guarda las métricas por nodo de una red (ver src/analisis.py) en la carpeta
+    "resultados", como un JSON {"resumen": {...}, "nodos": [{"proteina", metrica: valor, ...}]}.
+    Se publica igual que las interacciones: de forma atómica y sin pisar un archivo
+    existente salvo con `sobrescribir`.
+
+    :param metricas: MetricasRed devuelto por `analisis.analizar`.
+    :param ruta_archivo: Ruta del archivo; la extensión se reemplaza por ".json".
+    :param sobrescribir: Si es True, un archivo existente con el mismo nombre se reemplaza.
+    :return: Ruta del archivo guardado, o None si hubo un error.
+    """
+    temporal = None
+    try:
+        os.makedirs('resultados', exist_ok=True)
+        nombre = os.path.splitext(os.path.basename(ruta_archivo))[0]
+        ruta_completa = os.path.join('resultados', nombre + ".json")
+
+        temporal = os.path.join('resultados', f".{nombre}.{uuid.uuid4().hex}.tmp")
+        with perfil.etapa("guardado"), open(temporal, "w", encoding="utf-8") as archivo:
+            archivo.write('{"resumen": ')
+            json.dump(metricas.resumen(), archivo, ensure_ascii=False)
+            archivo.write(', "nodos": ')
+            _escribir_json(metricas.iterar(), archivo, indent=None)
+            archivo.write("}")
+        ruta_completa = _publicar_en(temporal, ruta_completa, sobrescribir)
+        temporal = None
+
+        print(f"Métricas guardadas en: {ruta_completa}")
+        return ruta_completa
+
     except Exception as e:
-        print(f"Error al guardar las interacciones en JSON: {e}")
+        print(f"Error al guardar las métricas: {e}")
+    finally:
+        if temporal is not None and os.path.exists(temporal):
+            os.unlink(temporal)
+    return None
+
+
+def guardar_interacciones_json(interacciones, ruta_archivo, identificadores=None):
+    """
+    Guarda las interacciones en un archivo JSON, asegurando que incluyan los identificadores correctos.
+
+    :param interacciones: Lista de diccionarios o TablaInteracciones con las interacciones a guardar.
+    :param ruta_archivo: Ruta del archivo donde se guardarán las interacciones.
+    :param identificadores: Diccionario opcional que mapea nombres genéricos a identificadores reales (ej. Uniprot o PDB IDs).
+    :return: Ruta del archivo guardado, o None si hubo un error.
+    """
+    return guardar_interacciones(interacciones, ruta_archivo, "json", identificadores)
@@ -0,0 +1,284 @@
+"""
+Índice local de mapeo de identificadores (Ensembl/STRING -> UniProt/PDB y PDB -> UniProt)
+construido a partir de archivos de mapeo masivo:
+
+- STRING:  <taxon>.protein.aliases.<version>.txt.gz
+- UniProt: idmapping.dat.gz (o el recorte por especie, ej. HUMAN_9606_idmapping.dat.gz)
+- SIFTS:   pdb_chain_uniprot.csv.gz
+
+Uso:
+    python -m src.indice_ids --string-aliases 9606.protein.aliases.v12.0.txt.gz \\
+        --uniprot-idmapping HUMAN_9606_idmapping.dat.gz --sifts pdb_chain_uniprot.csv.gz
+"""
+import argparse
+import csv
+import gzip
+import os
+import sqlite3
+import threading
+
+RUTA_INDICE = os.environ.get(
+    "INTERACPPY_INDICE",
+    os.path.join(os.path.expanduser("~"), ".cache", "interacppy", "indice_ids.sqlite"),
+)
+
+# Tipos de mapeo: ENSP -> UniProt, ENSP -> PDB y PDB -> UniProt
+TIPOS = ("uniprot", "pdb", "pdb_uniprot")
+
+# Filas insertadas por transacción al construir el índice
+TAMANO_LOTE_INSERCION = 50000
+
+# Máximo de parámetros por consulta IN (el límite de SQLite es 999 en versiones antiguas)
+TAMANO_LOTE_CONSULTA = 500
+
+
+def normalizar_id(id_):
+    """
+    Normaliza un identificador para el índice: quita el prefijo de especie de STRING
+    ("9606.ENSP...") y el sufijo de versión ("ENSP....4"), y lo pasa a mayúsculas.
+    """
+    partes = id_.strip().split(".")
+    if len(partes) > 1 and partes[0].isdigit():
+        partes = partes[1:]
+    if len(partes) > 1 and partes[-1].isdigit():
+        partes = partes[:-1]
+    return ".".join(partes).upper()
+
+
+def _abrir(ruta):
+    if ruta.lower().endswith(".gz"):
+        return gzip.open(ruta, "rt", encoding="utf-8", errors="replace")
+    return open(ruta, "r", encoding="utf-8", errors="replace")
+
+
+def leer_string_aliases(ruta):
+    """
+    Genera mapeos (origen, tipo, destino, prioridad) desde un archivo de alias de STRING.
+    Las columnas son: string_protein_id, alias, source.
+    """
+    with _abrir(ruta) as f:
+        for linea in f:
+            if linea.startswith("#"):
+                continue
+            partes = linea.rstrip("\n").split("\t")
+            if len(partes) < 3:
+                continue
+            string_id, alias, fuente = partes[:3]
+            if "UniProt_AC" in fuente:
+                # El alias exacto "UniProt_AC" es el más confiable; los demás (BLAST, Ensembl) después
+                yield normalizar_id(string_id), "uniprot", alias, 0 if fuente == "UniProt_AC" else 1
+            elif "PDB" in fuente:
+                yield normalizar_id(string_id), "pdb", alias.upper(), 1
+
+
+def leer_uniprot_idmapping(ruta):
+    """
+    Genera mapeos desde idmapping.dat de UniProt (columnas: accesion, tipo_id, id).
+    Se usan los tipos Ensembl_PRO (ENSP -> UniProt) y PDB (PDB -> UniProt).
+    """
+    with _abrir(ruta) as f:
+        for linea in f:
+            partes = linea.rstrip("\n").split("\t")
+            if len(partes) < 3:
+                continue
+            accesion, tipo_id, id_ = partes[:3]
+            if tipo_id == "Ensembl_PRO":
+                yield normalizar_id(id_), "uniprot", accesion, 0
+            elif tipo_id == "PDB":
+                yield normalizar_id(id_.split(":")[0]), "pdb_uniprot", accesion, 1
+
+
+def leer_sifts(ruta):
+    """
+    Genera mapeos PDB -> UniProt desde pdb_chain_uniprot.csv de SIFTS
+    (columnas: PDB, CHAIN, SP_PRIMARY, ...).
+    """
+    with _abrir(ruta) as f:
+        filas = csv.reader(linea for linea in f if not linea.startswith("#"))
+        cabecera = next(filas, None)
+        if not cabecera:
+            return
+        columnas = {nombre.strip().upper(): i for i, nombre in enumerate(cabecera)}
+        i_pdb, i_uniprot = columnas["PDB"], columnas["SP_PRIMARY"]
+        for fila in filas:
+            if len(fila) > max(i_pdb, i_uniprot):
+                yield normalizar_id(fila[i_pdb]), "pdb_uniprot", fila[i_uniprot], 0
+
+
+def construir(ruta, string_aliases=(), uniprot_idmapping=(), sifts=()):
+    """
+    Construye (o amplía) el índice SQLite a partir de los archivos de mapeo.
+
+    Si después de cargar todo hay proteínas con UniProt pero sin PDB, se deriva
+    ENSP -> PDB uniendo ENSP -> UniProt con PDB -> UniProt.
+
+    :return: Diccionario {tipo: cantidad de mapeos} del índice resultante.
+    """
+    if os.path.dirname(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    db = sqlite3.connect(ruta)
+    db.execute(
+        """CREATE TABLE IF NOT EXISTS mapeos (
+            origen TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            prioridad INTEGER NOT NULL,
+            destino TEXT NOT NULL,
+            PRIMARY KEY (origen, tipo, prioridad, destino)
+        ) WITHOUT ROWID"""
+    )
+
+    fuentes = [(leer_string_aliases, r) for r in string_aliases] + \
+              [(leer_uniprot_idmapping, r) for r in uniprot_idmapping] + \
+              [(leer_sifts, r) for r in sifts]
+    for lector, archivo in fuentes:
+        print(f"Cargando {archivo}...")
+        lote = []
+        for origen, tipo, destino, prioridad in lector(archivo):
+            lote.append((origen, tipo, prioridad, destino))
+            if len(lote) >= TAMANO_LOTE_INSERCION:
+                db.executemany("INSERT OR IGNORE INTO mapeos VALUES (?, ?, ?, ?)", lote)
+                db.commit()
+                lote = []
+        db.executemany("INSERT OR IGNORE INTO mapeos VALUES (?, ?, ?, ?)", lote)
+        db.commit()
+
+    # ENSP -> PDB derivado a través de UniProt para las proteínas sin PDB directo
+    db.execute(
+        """INSERT OR IGNORE INTO mapeos
+           SELECT u.origen, 'pdb', 2, p.origen
+           FROM mapeos u JOIN mapeos p ON p.tipo = 'pdb_uniprot' AND p.destino = u.destino
+           WHERE u.tipo = 'uniprot'
+             AND NOT EXISTS (SELECT 1 FROM mapeos d WHERE d.origen = u.origen AND d.tipo = 'pdb')"""
+    )
+    db.commit()
+    # Para buscar en sentido inverso (UniProt -> ENSP), ver IndiceIds.buscar_inverso
+    db.execute("CREATE INDEX IF NOT EXISTS idx_destino ON mapeos (tipo, destino)")
+    db.execute("ANALYZE")
+
+    conteos = dict(db.execute("SELECT tipo, COUNT(DISTINCT origen) FROM mapeos GROUP BY tipo").fetchall())
+    db.close()
+    return conteos
+
+
+class IndiceIds:
+    """
+    Consultas de solo lectura sobre un índice construido con `construir`.
+    Cada búsqueda es una consulta sobre la clave primaria (B-tree), O(log n).
+    """
+
+    def __init__(self, ruta=RUTA_INDICE):
+        self.ruta = ruta
+        self._db = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def buscar(self, tipo, ids):
+        """
+        Busca varios identificadores a la vez.
+
+        :param tipo: "uniprot", "pdb" o "pdb_uniprot".
+        :param ids: Identificadores originales (con o sin prefijo de especie/versión).
+        :return: Diccionario {id_original: destino} solo con los IDs encontrados.
+        """
+        normalizados = {}
+        for id_ in ids:
+            normalizados.setdefault(normalizar_id(id_), []).append(id_)
+
+        resultado = {}
+        claves = list(normalizados)
+        for i in range(0, len(claves), TAMANO_LOTE_CONSULTA):
+            lote = claves[i:i + TAMANO_LOTE_CONSULTA]
+            marcas = ",".join("?" * len(lote))
+            with self._lock:
+                filas = self._db.execute(
+                    f"SELECT origen, destino FROM mapeos WHERE tipo = ? AND origen IN ({marcas}) "
+                    "ORDER BY origen, prioridad, destino",
+                    [tipo] + lote,
+                ).fetchall()
+            for origen, destino in filas:
+                for id_ in normalizados[origen]:
+                    # La primera fila de cada origen es la de mayor prioridad
+                    resultado.setdefault(id_, destino)
+        return resultado
+
+    def buscar_inverso(self, tipo, destinos):
+        """
+        Busca los orígenes que mapean a cada destino (ej. UniProt -> ENSP con tipo "uniprot").
+
+        :return: Diccionario {destino: [origenes]} solo con los destinos encontrados.
+        """
+        destinos = list(dict.fromkeys(destinos))
+        resultado = {}
+        for i in range(0, len(destinos), TAMANO_LOTE_CONSULTA):
+            lote = destinos[i:i + TAMANO_LOTE_CONSULTA]
+            marcas = ",".join("?" * len(lote))
+            with self._lock:
+                filas = self._db.execute(
+                    f"SELECT destino, origen FROM mapeos WHERE tipo = ? AND destino IN ({marcas}) "
+                    "ORDER BY destino, prioridad, origen",
+                    [tipo] + lote,
+                ).fetchall()
+            for destino, origen in filas:
+                resultado.setdefault(destino, []).append(origen)
+        return resultado
+
+    def cerrar(self):
+        with self._lock:
+            self._db.close()
+
+
+_config = {"ruta": RUTA_INDICE}
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def configurar(ruta=None):
+    """Cambia la ruta del índice usado por `buscar` (None deja la actual)."""
+    global _indice
+    if ruta is not None:
+        _config["ruta"] = ruta
+    with _indice_lock:
+        if _indice is not None:
+            _indice.cerrar()
+        _indice = None
+
+
+def obtener_indice():
+    """Devuelve el índice global, o None si todavía no se construyó."""
+    global _indice
+    with _indice_lock:
+        if _indice is None and os.path.exists(_config["ruta"]):
+            _indice = IndiceIds(_config["ruta"])
+        return _indice
+
+
+def buscar(tipo, ids):
+    """Busca en el índice global; devuelve {} si no hay índice."""
+    indice = obtener_indice()
+    return indice.buscar(tipo, ids) if indice is not None else {}
+
+
+def buscar_inverso(tipo, destinos):
+    """Búsqueda inversa en el índice global; devuelve {} si no hay índice."""
+    indice = obtener_indice()
+    return indice.buscar_inverso(tipo, destinos) if indice is not None else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye el índice local de mapeo de identificadores.")
+    parser.add_argument("--salida", default=RUTA_INDICE, help=f"Ruta del índice SQLite (por defecto {RUTA_INDICE}).")
+    parser.add_argument("--string-aliases", nargs="+", default=[], help="Archivos protein.aliases de STRING.")
+    parser.add_argument("--uniprot-idmapping", nargs="+", default=[], help="Archivos idmapping.dat de UniProt.")
+    parser.add_argument("--sifts", nargs="+", default=[], help="Archivos pdb_chain_uniprot.csv de SIFTS.")
+    args = parser.parse_args()
+
+    if not (args.string_aliases or args.uniprot_idmapping or args.sifts):
+        parser.error("Debe indicar al menos un archivo de mapeo.")
+
+    conteos = construir(args.salida, args.string_aliases, args.uniprot_idmapping, args.sifts)
+    print(f"Índice guardado en: {args.salida}")
+    for tipo in TIPOS:
+        print(f"  {tipo}: {conteos.get(tipo, 0)} identificadores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import src.expansion as expansion
+import src.manifiesto as manifiesto
+import src.obtener_interacciones as obtener_interacciones
+import src.pipeline as pipeline
+
+# Número de proteínas procesadas en paralelo por defecto
+PARALELISMO = 4
+
+# IDs cuyas redes se piden juntas a STRING
+TAMANO_BLOQUE = obtener_interacciones.TAMANO_LOTE_STRING
+
+
+def leer_ids(ruta_lote):
+    """
+    Lee los identificadores de un archivo de texto o CSV de a una línea por vez.
+
+    Cada línea contiene un ID (PDB, UniProt o ruta a un .pdb) y opcionalmente,
+    separado por coma o tabulación, su tipo ("pdb", "uniprot" o "archivo").
+    Se ignoran las líneas vacías, los comentarios (#) y una cabecera "id".
+
+    :param ruta_lote: Ruta del archivo con los identificadores.
+    :return: Generador de tuplas (tipo, id).
+    """
+    with open(ruta_lote, newline="", encoding="utf-8") as f:
+        dialecto = "excel-tab" if "\t" in f.readline() else "excel"
+        f.seek(0)
+        for fila in csv.reader(f, dialect=dialecto):
+            if not fila or not fila[0].strip() or fila[0].lstrip().startswith("#"):
+                continue
+            valor = fila[0].strip()
+            if valor.lower() == "id":
+                continue
+            tipo = fila[1].strip().lower() if len(fila) > 1 and fila[1].strip() else pipeline.detectar_tipo(valor)
+            yield tipo, valor
+
+
+def ruta_progreso(ruta_lote):
+    """Ruta del archivo de checkpoint asociado a un lote."""
+    return f"{ruta_lote}.progreso.jsonl"
+
+
+def leer_progreso(ruta):
+    """
+    Lee el checkpoint de un lote.
+
+    :return: Diccionario {id: estado} con el último estado registrado de cada ID.
+    """
+    estados = {}
+    if not os.path.exists(ruta):
+        return estados
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                estado = json.loads(linea)
+            except json.JSONDecodeError:
+                # Una línea truncada por una interrupción se vuelve a procesar
+                continue
+            estados[estado["id"]] = estado
+    return estados
+
+
+def escribir_resumen(estados, ruta_resumen):
+    """Escribe un CSV con el estado final de cada ID del lote."""
+    formatos = sorted({formato for estado in estados.values() for formato in estado.get("interacciones", {})})
+    with open(ruta_resumen, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["id", "tipo", "estado", "especie", "taxon"] + [f"interacciones_{formato}" for formato in formatos] + ["mensaje"])
+        for estado in estados.values():
+            conteos = [estado.get("interacciones", {}).get(formato, "") for formato in formatos]
+            escritor.writerow([estado["id"], estado["tipo"], estado["estado"], estado.get("especie") or "", estado.get("taxon") or ""]
+                              + conteos + [estado.get("mensaje", "")])
+
+
+def _bloques(entradas, tamano):
+    """Agrupa un iterable en listas de a lo sumo `tamano` elementos sin leerlo entero."""
+    bloque = []
+    for entrada in entradas:
+        bloque.append(entrada)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def _estado_error(tipo, valor, mensaje):
+    return {"id": valor, "tipo": tipo, "estado": "error", "mensaje": mensaje, "especie": None, "taxon": None, "id_iter": None,
+            "interacciones": {}}
+
+
+def procesar_lote(ruta_lote, salidas, prefijo_guardar=None, paralelismo=PARALELISMO, reintentar_errores=True,
+                  tamano_bloque=TAMANO_BLOQUE, saltos=1, score_minimo=expansion.SCORE_MINIMO, visualizar=False,
+                  disposicion="auto", formato_guardado="json", agregacion="max", especie=None, actualizar=False,
+                  ttl=manifiesto.TTL, canal=None):
+    """
+    Procesa todos los IDs de un archivo con un pool de hilos.
+
+    Los IDs se leen en bloques de `tamano_bloque`: las secuencias del bloque se
+    cargan en paralelo, sus redes de STRING se piden juntas con
+    `obtener_interacciones.obtener_redes_por_especie` (unas pocas solicitudes por
+    especie del bloque en lugar de una por proteína) y luego se generan las
+    salidas en paralelo.
+
+    El progreso se registra en `<ruta_lote>.progreso.jsonl` a medida que termina
+    cada ID, de modo que si la ejecución se interrumpe, la siguiente retoma
+    desde donde quedó. Al final se escribe un resumen CSV en la carpeta "resultados".
+
+    Las salidas se registran en el manifiesto de resultados (ver src/manifiesto.py).
+    Con `actualizar` no se usa el checkpoint: los IDs cuya entrada del manifiesto
+    está vigente no se consultan, los demás se descargan de nuevo y solo se
+    reescriben los archivos que cambiaron (las respuestas de STRING y Ensembl
+    guardadas en caché antes de empezar no se usan). El manifiesto se guarda al terminar
+    cada bloque, así que una actualización interrumpida también se retoma.
+
+    :param ruta_lote: Archivo de texto/CSV con un ID por línea.
+    :param salidas: Formatos de salida (uniprot, ensembl, pdb).
+    :param prefijo_guardar: Prefijo opcional para los archivos JSON de cada ID.
+    :param paralelismo: Número de proteínas procesadas simultáneamente.
+    :param reintentar_errores: Si es True, los IDs que fallaron en una ejecución anterior se reintentan.
+    :param tamano_bloque: IDs que se procesan juntos en cada consulta agrupada a STRING.
+    :param saltos: Distancia máxima a cada proteína en su red (1 = red de STRING por defecto).
+    :param score_minimo: Score combinado mínimo (0-1000) de las aristas al expandir las redes.
+    :param visualizar: Si es True se guarda el grafo de cada ID como PNG, sin abrir ventanas.
+    :param disposicion: Disposición de los nodos de los grafos (ver `visualizar_interacciones.DISPOSICIONES`).
+    :param formato_guardado: Formato de los archivos de interacciones (ver `guardar_interacciones.FORMATOS`).
+    :param agregacion: Cómo se combinan los scores de las interacciones repetidas ("max" o "mean").
+    :param especie: Especie (nombre o taxón) de todos los IDs, o None para usar la detectada en cada uno.
+    :param actualizar: Si es True, se actualizan los resultados existentes según el manifiesto.
+    :param ttl: Segundos tras los cuales una entrada del manifiesto se vuelve a descargar al actualizar.
+    :param canal: Canal de score con el que se calculan las métricas por nodo de cada red (ver
+                  src/analisis.py), o None para no calcularlas.
+    :return: Diccionario {id: estado} con el resultado de todos los IDs.
+    """
+    if not os.path.exists(ruta_lote):
+        print(f"Error: No se encontró el archivo de lote {ruta_lote}.")
+        return {}
+
+    salidas = salidas or []
+    progreso = ruta_progreso(ruta_lote)
+    estados = leer_progreso(progreso)
+    hechos = set()
+    if not actualizar:
+        hechos = {id_ for id_, estado in estados.items() if estado["estado"] == "ok" or not reintentar_errores}
+    if hechos:
+        print(f"Retomando lote: {len(hechos)} IDs ya procesados.")
+    registro = manifiesto.Manifiesto()
+    # Al actualizar, lo descargado antes de este lote se vuelve a pedir; lo de este lote se comparte
+    refrescar_desde = time.time() if actualizar else None
+
+    def ruta_guardar(tipo, valor):
+        nombre = pipeline.nombre_salida(tipo, valor)
+        return f"{prefijo_guardar}_{nombre}" if prefijo_guardar else nombre
+
+    def cargar(entrada):
+        tipo, valor = entrada
+        try:
+            return pipeline.cargar_proteina(tipo, valor, especie)
+        except Exception as e:
+            # Un ID con problemas no debe detener el resto del lote
+            print(f"Error al procesar {valor}: {e}")
+            return _estado_error(tipo, valor, str(e))
+
+    def generar(estado, red):
+        tipo, valor = estado["tipo"], estado["id"]
+        try:
+            return pipeline.generar_salidas(estado, red, salidas, ruta_guardar=ruta_guardar(tipo, valor), visualizar=visualizar,
+                                            mostrar_interacciones=False, disposicion=disposicion, mostrar_ventana=False,
+                                            formato_guardado=formato_guardado, agregacion=agregacion, registro=registro,
+                                            actualizar=actualizar, canal=canal)
+        except Exception as e:
+            print(f"Error al procesar {valor}: {e}")
+            return dict(estado, estado="error", mensaje=str(e))
+
+    def pendientes():
+        vistos = set()
+        for tipo, valor in leer_ids(ruta_lote):
+            if valor in hechos or valor in vistos:
+                continue
+            vistos.add(valor)
+            yield tipo, valor
+
+    with open(progreso, "a+", encoding="utf-8") as checkpoint, ThreadPoolExecutor(max_workers=max(1, paralelismo)) as executor:
+        # Si la ejecución anterior se cortó a mitad de una línea, empezar en una nueva
+        if checkpoint.tell() > 0:
+            checkpoint.seek(checkpoint.tell() - 1)
+            if checkpoint.read(1) != "\n":
+                checkpoint.write("\n")
+
+        def registrar(estado):
+            estados[estado["id"]] = estado
+            checkpoint.write(json.dumps(estado, ensure_ascii=False) + "\n")
+            checkpoint.flush()
+
+        for bloque in _bloques(pendientes(), max(1, tamano_bloque)):
+            desconocidos = [(tipo, valor) for tipo, valor in bloque if tipo is None]
+            for _, valor in desconocidos:
+                registrar(_estado_error(None, valor, "No se reconoce el tipo de ID."))
+
+            # Al actualizar, los IDs vigentes según el manifiesto no se consultan
+            entradas = []
+            for tipo, valor in bloque:
+                if tipo is None:
+                    continue
+                clave = manifiesto.clave(ruta_guardar(tipo, valor))
+                if actualizar and registro.vigente(clave, salidas, formato_guardado, visualizar, ttl, canal=canal):
+                    registrar(registro.estado(clave))
+                else:
+                    entradas.append((tipo, valor))
+
+            # 1. Cargar las secuencias del bloque en paralelo
+            cargados = []
+            for estado in executor.map(cargar, entradas):
+                if estado["id_iter"] is None:
+                    registrar(estado)
+                else:
+                    cargados.append(estado)
+
+            # 2. Una consulta agrupada a STRING por especie para todas las redes del bloque
+            redes = {}
+            if cargados and salidas and saltos > 1:
+                # La expansión ya agrupa las consultas de cada salto; las proteínas se expanden en paralelo
+                futuros = {executor.submit(pipeline.descargar_red, estado["id_iter"], salidas, saltos, score_minimo,
+                                           estado["taxon"], refrescar_desde): estado["id_iter"] for estado in cargados}
+                for futuro in as_completed(futuros):
+                    redes[futuros[futuro]] = futuro.result()
+            elif cargados and salidas:
+                redes = obtener_interacciones.obtener_redes_por_especie(
+                    {estado["id_iter"]: estado["taxon"] for estado in cargados}, salidas, refrescar_desde=refrescar_desde)
+
+            # 3. Derivar, guardar y registrar cada proteína
+            for estado in executor.map(lambda estado: generar(estado, redes.get(estado["id_iter"])), cargados):
+                registrar(estado)
+            registro.guardar()
+
+    os.makedirs("resultados", exist_ok=True)
+    nombre_lote = os.path.splitext(os.path.basename(ruta_lote))[0]
+    ruta_resumen = os.path.join("resultados", f"{nombre_lote}_resumen.csv")
+    escribir_resumen(estados, ruta_resumen)
+
+    correctos = sum(1 for estado in estados.values() if estado["estado"] == "ok")
+    print(f"Lote terminado: {correctos}/{len(estados)} IDs procesados correctamente. Resumen en: {ruta_resumen}")
+    return estados
@@ -0,0 +1,169 @@
+"""
+Manifiesto de la carpeta de resultados (resultados/manifiesto.json), para
+actualizarla sin volver a procesar todo.
+
+Por cada conjunto de salidas de una proteína (la ruta base de sus archivos) se
+registra cuándo se descargó su red y, si se descargó en modo actualización, las
+versiones de STRING y Ensembl en ese momento (las ejecuciones normales no las
+consultan, para no hacer solicitudes de más, y quedan como desconocidas); por
+cada formato de salida, el archivo escrito, la huella de su contenido (ver
+`TablaInteracciones.huella`), el grafo PNG y cuándo se escribió.
+
+En modo actualización (--actualizar):
+
+- las entradas más recientes que el TTL y cuyas fuentes no cambiaron de versión
+  no se vuelven a consultar (si la versión registrada o la actual es desconocida
+  se consideran cambiadas);
+- las demás se descargan de nuevo, y solo se reescriben los archivos cuya huella
+  cambió, reemplazándolos en su lugar en vez de crear copias con otro nombre.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+import src.cache_http as cache_http
+import src.obtener_interacciones as obtener_interacciones
+
+RUTA_MANIFIESTO = os.path.join("resultados", "manifiesto.json")
+
+# Antigüedad máxima de una entrada antes de volver a descargarla (la misma que la cache de STRING)
+TTL = cache_http.TTL_POR_FUENTE["string"]
+
+VERSION = 1
+
+
+def clave(ruta_guardar):
+    """Clave de una entrada: el nombre base de sus archivos dentro de "resultados"."""
+    return os.path.basename(ruta_guardar)
+
+
+class Manifiesto:
+    """
+    Registro de las salidas guardadas. Se puede usar desde varios hilos; los cambios
+    se escriben en disco al llamar a `guardar`.
+
+    :param ruta: Archivo JSON del manifiesto.
+    """
+
+    def __init__(self, ruta=RUTA_MANIFIESTO):
+        self.ruta = ruta
+        self.entradas = {}
+        self._versiones = None
+        self._consultadas = None
+        self._cambios = False
+        self._lock = threading.Lock()
+        self._lock_versiones = threading.Lock()
+        if os.path.exists(ruta):
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    self.entradas = json.load(f).get("entradas", {})
+            except (OSError, ValueError) as e:
+                print(f"No se pudo leer el manifiesto {ruta}: {e}. Se empieza uno nuevo.")
+
+    def versiones(self, desde=None):
+        """
+        Versiones actuales de las fuentes. Se consultan una sola vez por manifiesto, salvo
+        que la última consulta sea anterior a `desde` (ej. el inicio de un trabajo del servicio).
+        """
+        # La consulta (varias solicitudes HTTP) tiene su propio lock: los demás hilos pueden
+        # seguir leyendo y registrando entradas mientras tanto, y solo se consulta una vez
+        with self._lock_versiones:
+            with self._lock:
+                if self._versiones is not None and (desde is None or self._consultadas >= desde):
+                    return self._versiones
+            consultadas = time.time()
+            versiones = obtener_interacciones.versiones_fuentes()
+            with self._lock:
+                self._versiones, self._consultadas = versiones, consultadas
+                return versiones
+
+    def entrada(self, clave):
+        with self._lock:
+            return self.entradas.get(clave)
+
+    def salida(self, clave, formato):
+        """Registro de un formato de salida de una entrada, o None."""
+        with self._lock:
+            return self.entradas.get(clave, {}).get("salidas", {}).get(formato)
+
+    def vigente(self, clave, salidas, formato_guardado, visualizar=False, ttl=TTL, ahora=None, canal=None):
+        """
+        Indica si una entrada se puede conservar sin volver a consultarla: se descargó
+        hace menos de `ttl` segundos, las fuentes siguen en la misma versión y existen
+        los archivos de todos los formatos pedidos (y sus grafos, si se piden, y sus
+        métricas calculadas con el canal `canal`, si no es None).
+        """
+        entrada = self.entrada(clave)
+        if entrada is None or (ahora or time.time()) - entrada.get("actualizado", 0) > ttl:
+            return False
+        # Sin versiones actuales (sin conexión o si la consulta falló) o registradas, no se
+        # puede saber si las fuentes cambiaron: se toman como cambiadas
+        versiones = self.versiones()
+        if not versiones or entrada.get("fuentes") != versiones:
+            return False
+        for formato in salidas or []:
+            salida = entrada.get("salidas", {}).get(formato)
+            if salida is None or salida.get("formato_guardado") != formato_guardado:
+                return False
+            campos = ("archivo",) + (("grafo",) if visualizar else ()) + (("metricas",) if canal else ())
+            for campo in campos:
+                if salida.get("interacciones") and not (salida.get(campo) and os.path.exists(salida[campo])):
+                    return False
+            if canal and salida.get("interacciones") and salida.get("canal") != canal:
+                return False
+        return True
+
+    def estado(self, clave):
+        """Estado (como el de `pipeline.procesar_proteina`) de una entrada que se conserva."""
+        entrada = self.entrada(clave)
+        return {"id": entrada["id"], "tipo": entrada["tipo"], "estado": "ok", "mensaje": "Sin cambios (vigente).",
+                "especie": entrada.get("especie"), "taxon": entrada.get("taxon"), "id_iter": entrada.get("id_iter"),
+                "interacciones": {formato: salida.get("interacciones", 0) for formato, salida in entrada["salidas"].items()}}
+
+    def registrar(self, clave, estado, ahora=None, consultar_versiones=False):
+        """
+        Registra que la red de una entrada se acaba de descargar.
+
+        :param consultar_versiones: Si es True se guardan las versiones actuales de las fuentes
+                                    (ver `versiones`); si no, quedan como desconocidas (None).
+        """
+        versiones = self.versiones() if consultar_versiones else None
+        with self._lock:
+            entrada = self.entradas.setdefault(clave, {"salidas": {}})
+            entrada.update(id=estado["id"], tipo=estado["tipo"], especie=estado.get("especie"),
+                           taxon=estado.get("taxon"), id_iter=estado.get("id_iter"), fuentes=dict(versiones) if versiones is not None else None,
+                           actualizado=ahora or time.time())
+            self._cambios = True
+
+    def registrar_salida(self, clave, formato, archivo, formato_guardado, huella, interacciones, grafo=None,
+                         escrito=None, metricas=None, canal=None):
+        """
+        Registra un formato de salida de una entrada.
+
+        :param escrito: Momento en que se escribió el archivo; None si no cambió y se conserva el anterior.
+        :param metricas: Archivo de métricas por nodo (ver src/analisis.py), o None si no se calcularon.
+        :param canal: Canal de score con el que se calcularon las métricas.
+        """
+        with self._lock:
+            salidas = self.entradas.setdefault(clave, {"salidas": {}})["salidas"]
+            anterior = salidas.get(formato, {})
+            salidas[formato] = {"archivo": archivo, "formato_guardado": formato_guardado, "huella": huella,
+                                "interacciones": interacciones, "grafo": grafo, "metricas": metricas, "canal": canal,
+                                "escrito": escrito or anterior.get("escrito")}
+            self._cambios = True
+
+    def guardar(self):
+        """Escribe el manifiesto de forma atómica si hubo cambios. Devuelve la ruta, o None si no hizo falta."""
+        with self._lock:
+            if not self._cambios:
+                return None
+            if os.path.dirname(self.ruta):
+                os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            temporal = f"{self.ruta}.{uuid.uuid4().hex}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"version": VERSION, "entradas": self.entradas}, f, ensure_ascii=False, indent=1)
+            os.replace(temporal, self.ruta)
+            self._cambios = False
+            return self.ruta
@@ -0,0 +1,147 @@
+"""
+Memoización en memoria con consultas compartidas ("single-flight").
+
+Si varios hilos piden a la vez la misma clave (por ejemplo, las xrefs de una
+proteína central como TP53 que aparece en muchas redes de un lote), solo el
+primero hace la solicitud y el resto espera su resultado. Los resultados se
+guardan en un LRU acotado por cantidad de entradas, de modo que la cantidad de
+solicitudes crece con los IDs distintos y no con las veces que aparecen.
+
+Los errores no se guardan: se propagan a todos los que esperaban esa clave y la
+próxima consulta lo vuelve a intentar.
+
+Cada resultado vence a los `ttl` segundos (en un proceso de larga vida, como el
+servicio de src/servicio.py, así no se siguen usando respuestas que la cache en
+disco ya dio por vencidas). Para actualizar resultados se puede pedir que no se usen los valores obtenidos
+antes de cierto momento (`refrescar_desde`): se vuelven a consultar y reemplazan
+a los guardados.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
+_config = {"activa": True}
+_memos = weakref.WeakSet()
+
+
+class MemoLRU:
+    """
+    Resultados por clave con consultas compartidas y desalojo LRU.
+
+    :param max_entradas: Cantidad máxima de resultados guardados.
+    :param ttl: Segundos tras los cuales un resultado vence, o una función sin argumentos que
+                los devuelve (para seguir una configuración que puede cambiar); None para no vencer.
+    """
+
+    def __init__(self, max_entradas, ttl=None):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.compartidas = 0
+        self.fallos = 0
+        self._valores = OrderedDict()
+        self._en_vuelo = {}
+        self._lock = threading.Lock()
+        _memos.add(self)
+
+    def obtener(self, clave, funcion, *args, refrescar_desde=None, **kwargs):
+        """
+        Devuelve el resultado guardado para `clave`; si no hay, espera a la consulta
+        en curso para la misma clave o llama a funcion(*args, **kwargs).
+
+        :param refrescar_desde: Momento (time.time()) antes del cual los resultados guardados
+                                o las consultas en curso no sirven y se vuelve a consultar.
+        """
+        with self._lock:
+            if clave in self._valores:
+                valor, guardado = self._valores[clave]
+                if self._vencido(guardado):
+                    del self._valores[clave]
+                elif refrescar_desde is None or guardado >= refrescar_desde:
+                    self._valores.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+            futuro, inicio = self._en_vuelo.get(clave, (None, None))
+            if futuro is not None and (refrescar_desde is None or inicio >= refrescar_desde):
+                self.compartidas += 1
+                propio = False
+            else:
+                self.fallos += 1
+                propio = True
+                inicio = time.time()
+                futuro = Future()
+                # Una consulta en curso anterior a `refrescar_desde` sigue la suya, pero ya no se comparte
+                self._en_vuelo[clave] = (futuro, inicio)
+
+        if not propio:
+            return futuro.result()
+
+        try:
+            valor = funcion(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._terminar_vuelo(clave, futuro)
+            futuro.set_exception(e)
+            raise
+
+        with self._lock:
+            self._terminar_vuelo(clave, futuro)
+            # No se pisa un resultado de una consulta más reciente
+            if _config["activa"] and self.max_entradas > 0 and self._valores.get(clave, (None, 0))[1] <= inicio:
+                self._valores[clave] = (valor, inicio)
+                self._valores.move_to_end(clave)
+                while len(self._valores) > self.max_entradas:
+                    self._valores.popitem(last=False)
+        futuro.set_result(valor)
+        return valor
+
+    def _vencido(self, guardado):
+        ttl = self.ttl() if callable(self.ttl) else self.ttl
+        return ttl is not None and time.time() - guardado > ttl
+
+    def _terminar_vuelo(self, clave, futuro):
+        # Se llama con el lock tomado; otra consulta pudo haber reemplazado a esta al refrescar
+        if self._en_vuelo.get(clave, (None,))[0] is futuro:
+            del self._en_vuelo[clave]
+
+    def vaciar(self):
+        """Descarta los resultados guardados (las consultas en curso no se interrumpen)."""
+        with self._lock:
+            self._valores.clear()
+
+    def estadisticas(self):
+        """Devuelve los aciertos, las consultas compartidas, los fallos y las entradas guardadas."""
+        with self._lock:
+            return {"aciertos": self.aciertos, "compartidas": self.compartidas, "fallos": self.fallos,
+                    "entradas": len(self._valores)}
+
+    def __len__(self):
+        return len(self._valores)
+
+
+def configurar(activa=None):
+    """
+    Activa o desactiva el guardado de resultados en todas las memos. Desactivadas
+    se siguen compartiendo las consultas simultáneas, pero no se guarda nada.
+    """
+    if activa is not None:
+        _config["activa"] = activa
+    if not _config["activa"]:
+        vaciar()
+
+
+def vaciar():
+    """Descarta los resultados guardados de todas las memos."""
+    for memo in list(_memos):
+        memo.vaciar()
+
+
+def estadisticas():
+    """Suma de las estadísticas de todas las memos (ver `MemoLRU.estadisticas`)."""
+    total = {"aciertos": 0, "compartidas": 0, "fallos": 0, "entradas": 0}
+    for memo in list(_memos):
+        for campo, valor in memo.estadisticas().items():
+            total[campo] += valor
+    return total
@@ -1,224 +1,626 @@
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import requests
 
-import requests
+import src.cache_http as cache_http
+import src.indice_ids as indice_ids
+import src.memo as memo
+import src.perfil as perfil
+import src.red_local as red_local
+import src.sesion_http as sesion_http
+import src.tabla_interacciones as tabla_interacciones
+import src.taxonomia as taxonomia
+
+# URL base de las APIs de Ensembl y STRING
+ENSEMBL_SERVER = "https://rest.ensembl.org"
+STRING_SERVER = "https://string-db.org"
+
+# Formatos de salida soportados y cuáles necesitan las xrefs de Ensembl
+FORMATOS = ("uniprot", "ensembl", "pdb")
+FORMATOS_CON_XREFS = ("uniprot", "pdb")
+
+# Identificadores por solicitud a STRING y vecinos que STRING agrega a la red de una proteína
+TAMANO_LOTE_STRING = 100
+LIMITE_VECINOS = 10
+
+# Ensembl limita a ~15 solicitudes por segundo por IP; con 6 en vuelo nos
+# mantenemos por debajo del límite con latencias normales.
+MAX_CONCURRENCIA = 6
+MAX_REINTENTOS_429 = 5
+
+# Respuestas que se conservan en memoria (ver src/memo.py): las mismas proteínas
+# aparecen en muchas redes de un lote y no se vuelven a pedir. Vencen con el mismo
+# TTL que la cache en disco de su fuente
+MAX_MEMO_XREFS = 20000
+MAX_MEMO_STRING = 256
+MAX_MEMO_PDBE = 5000
+
+_memo_xrefs = memo.MemoLRU(MAX_MEMO_XREFS, ttl=lambda: cache_http.ttl("ensembl"))
+_memo_string = memo.MemoLRU(MAX_MEMO_STRING, ttl=lambda: cache_http.ttl("string"))
+_memo_pdbe = memo.MemoLRU(MAX_MEMO_PDBE, ttl=lambda: cache_http.ttl("pdbe"))
+
+# Momento (time.monotonic) hasta el cual todos los hilos deben esperar tras un 429
+_pausa_hasta = 0.0
+_pausa_lock = threading.Lock()
+
+
+def _segundos_retry_after(response, intento):
+    """
+    Devuelve cuántos segundos esperar tras un HTTP 429, usando la cabecera
+    Retry-After si existe o un backoff exponencial en caso contrario.
+    """
+    valor = response.headers.get("Retry-After")
+    try:
+        return max(float(valor), 0.0)
+    except (TypeError, ValueError):
+        return min(2 ** intento * 0.5, 30.0)
+
 
-def convertir_a_uniprot(ids):
+def _esperar_limite():
+    """Bloquea el hilo actual mientras haya una pausa global por límite de tasa."""
+    while True:
+        with _pausa_lock:
+            restante = _pausa_hasta - time.monotonic()
+        if restante <= 0:
+            return
+        time.sleep(restante)
+
+
+def _pausar_todos(segundos):
+    """Extiende la pausa global para que ningún hilo consulte Ensembl durante `segundos`."""
+    global _pausa_hasta
+    with _pausa_lock:
+        _pausa_hasta = max(_pausa_hasta, time.monotonic() + segundos)
+
+
+def _consultar_xrefs(id_, refrescar_desde=None):
     """
-    Convierte identificadores usando la API de Ensembl para obtener UniProt IDs.
-    
+    Consulta el endpoint /xrefs/id de Ensembl para un único identificador.
+
     Args:
-    ids (list): Lista de IDs a convertir (por ejemplo, identificadores de Ensembl).
-    
+    id_ (str): Identificador (con o sin el prefijo de especie, ej. "9606.ENSP...").
+    refrescar_desde (float): Momento antes del cual las respuestas en memoria y en disco
+                             no se usan (ver `cache_http.get`), o None.
+
     Returns:
-    dict: Diccionario con mapeos {id_original: id_uniprot}.
+    list: Lista de referencias cruzadas devuelta por Ensembl.
     """
-    # URL base de la API de Ensembl
-    server = "https://rest.ensembl.org"
-    headers = {"Content-Type": "application/json"}
+    # Eliminar el prefijo "9606." si está presente
+    id_sanitizado = id_.split(".")[-1]
+    # Las consultas simultáneas del mismo ID (desde otras redes del lote) comparten una sola solicitud
+    url = f"{ENSEMBL_SERVER}/xrefs/id/{id_sanitizado}"
+    return _memo_xrefs.obtener(url, _descargar_xrefs, url, refrescar_desde, refrescar_desde=refrescar_desde)
 
-    mapeo_resultado = {}
 
+def _descargar_xrefs(url, refrescar_desde=None):
+    """Pide las xrefs a Ensembl respetando los 429 (pausa global y Retry-After)."""
+    for intento in range(MAX_REINTENTOS_429 + 1):
+        _esperar_limite()
+        response = cache_http.get(url, headers={"Content-Type": "application/json"}, refrescar_desde=refrescar_desde)
+        if response.status_code != 429 or intento == MAX_REINTENTOS_429:
+            break
+        # Ensembl nos pide bajar el ritmo: pausamos a todos los hilos, no solo a este
+        _pausar_todos(_segundos_retry_after(response, intento))
 
-    for id_ in ids:
-        # Eliminar el prefijo "9606." si está presente
-        id_sanitizado = id_.split(".")[-1]
+    response.raise_for_status()  # Lanza un error si la solicitud falla
+    return response.json()
 
-        # Construir la URL del endpoint
-        ext = f"/xrefs/id/{id_sanitizado}"
 
-        try:
-            # Realizar la solicitud
-            response = requests.get(server + ext, headers=headers)
-            response.raise_for_status()  # Lanza un error si la solicitud falla
-
-            # Procesar la respuesta
-            data = response.json()
-            if data:
-                # Asumimos que el primer resultado es el más relevante
-                mapeo_resultado[id_] = data[-1].get("primary_id")
-            else:
-                # Si no hay resultados, dejamos el ID original
-                mapeo_resultado[id_] = None
+def resolver_xrefs(ids, max_concurrencia=MAX_CONCURRENCIA, refrescar_desde=None):
+    """
+    Obtiene las referencias cruzadas de Ensembl para varios IDs en paralelo.
+
+    Args:
+    ids (list): Lista de IDs a consultar.
+    max_concurrencia (int): Número máximo de solicitudes simultáneas.
+    refrescar_desde (float): Momento antes del cual no se usan las respuestas guardadas, o None.
+
+    Returns:
+    dict: Diccionario {id_original: lista_xrefs}, con None si la consulta falló.
+    """
+    ids = list(dict.fromkeys(ids))
+    resultado = {}
+    if not ids:
+        return resultado
 
+    def consultar(id_):
+        try:
+            return _consultar_xrefs(id_, refrescar_desde)
         except requests.exceptions.RequestException as e:
             print(f"Error al procesar el ID {id_}: {e}")
-            mapeo_resultado[id_] = None
+            return None
 
-    return mapeo_resultado
+    with perfil.etapa("ensembl_xrefs"), ThreadPoolExecutor(max_workers=max(1, min(max_concurrencia, len(ids)))) as executor:
+        for id_, data in zip(ids, executor.map(consultar, ids)):
+            resultado[id_] = data
 
+    return resultado
+
+
+def _uniprot_desde_xrefs(data):
+    """Elige el UniProt ID a partir de la lista de xrefs de Ensembl de un nodo."""
+    if data:
+        # Asumimos que el primer resultado es el más relevante
+        return data[-1].get("primary_id")
+    # Si no hay resultados (o la consulta falló) no hay mapeo
+    return None
+
+
+def _pdb_desde_xrefs(data):
+    """Elige el PDB ID a partir de la lista de xrefs de Ensembl de un nodo."""
+    # Filtramos solo los XREF de PDB y usamos el primero, o None si no hay
+    pdb_ids = [entry.get("primary_id") for entry in data or [] if entry.get("dbname") == "PDB"]
+    return pdb_ids[0] if pdb_ids else None
+
+
+# Cómo extraer cada formato de la lista de xrefs de Ensembl de un nodo
+_DESDE_XREFS = {"uniprot": _uniprot_desde_xrefs, "pdb": _pdb_desde_xrefs}
+
+
+def _convertir(ids, formato, max_concurrencia):
+    """
+    Mapea IDs al formato pedido consultando primero el índice local
+    (ver src/indice_ids.py) y solo los que faltan en la API de Ensembl.
+    """
+    ids = list(dict.fromkeys(ids))
+    locales = indice_ids.buscar(formato, ids)
+    faltantes = [id_ for id_ in ids if id_ not in locales]
+    xrefs = resolver_xrefs(faltantes, max_concurrencia)
+    return {id_: locales[id_] if id_ in locales else _DESDE_XREFS[formato](xrefs.get(id_)) for id_ in ids}
+
+
+def convertir_a_uniprot(ids, max_concurrencia=MAX_CONCURRENCIA):
+    """
+    Convierte identificadores usando el índice local o la API de Ensembl para obtener UniProt IDs.
+    
+    Args:
+    ids (list): Lista de IDs a convertir (por ejemplo, identificadores de Ensembl).
+    max_concurrencia (int): Número máximo de solicitudes simultáneas a Ensembl.
+    
+    Returns:
+    dict: Diccionario con mapeos {id_original: id_uniprot}.
+    """
+    return _convertir(ids, "uniprot", max_concurrencia)
 
-import requests
 
-def convertir_a_pdb(ids):
+def convertir_a_pdb(ids, max_concurrencia=MAX_CONCURRENCIA):
     """
-    Convierte identificadores de Ensembl a identificadores PDB usando la API de Ensembl.
+    Convierte identificadores de Ensembl a identificadores PDB usando el índice local o la API de Ensembl.
     
     Args:
     ids (list): Lista de Ensembl IDs a convertir a PDB IDs.
+    max_concurrencia (int): Número máximo de solicitudes simultáneas a Ensembl.
     
     Returns:
     dict: Diccionario con mapeos {id_ensembl: id_pdb}.
     """
-    # URL base de la API de Ensembl
-    ensembl_server = "https://rest.ensembl.org"
+    return _convertir(ids, "pdb", max_concurrencia)
 
-    mapeo_resultado = {}
 
-    for id_ in ids:
-        # Eliminar el prefijo "9606." si está presente en el ID (aunque podría no ser necesario)
-        id_sanitizado = id_.split(".")[-1]
+def _consultar_string(metodo, identificadores, especie=taxonomia.ESPECIE_POR_DEFECTO, refrescar_desde=None, **parametros):
+    """
+    Consulta un método de la API JSON de STRING con uno o varios identificadores.
 
-        try:
-            # Consultamos Ensembl para obtener los datos de XREF de Ensembl
-            ext_ensembl = f"/xrefs/id/{id_sanitizado}"
-            response_ensembl = requests.get(ensembl_server + ext_ensembl, headers={"Content-Type": "application/json"})
-            response_ensembl.raise_for_status()  # Verifica si la solicitud fue exitosa
-            
-            # Procesar la respuesta de Ensembl
-            data_ensembl = response_ensembl.json()
-
-            pdb_ids = []
-            for entry in data_ensembl:
-                if entry.get("dbname") == "PDB":  # Filtramos solo los XREF de PDB
-                    pdb_ids.append(entry.get("primary_id"))
-
-            if pdb_ids:
-                # Usamos el primer PDB ID relacionado con el Ensembl ID
-                mapeo_resultado[id_] = pdb_ids[0]
-            else:
-                # Si no se encuentra PDB, asignamos None
-                mapeo_resultado[id_] = None
+    Args:
+    metodo (str): Método de la API ("network", "interaction_partners", "get_string_ids", ...).
+    identificadores (list): Identificadores a consultar; STRING los recibe separados por %0d.
+    especie (int): Taxón de STRING de las proteínas consultadas (ver src/taxonomia.py).
+    refrescar_desde (float): Momento antes del cual no se usan las respuestas guardadas, o None.
+    parametros: Parámetros adicionales de la consulta.
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error al procesar el ID {id_}: {e}")
-            mapeo_resultado[id_] = None
+    Returns:
+    list: Respuesta JSON de STRING.
+    """
+    # URL de la API de STRING; la especie forma parte de la URL, así que las caches
+    # en memoria y en disco quedan separadas por especie
+    url = f"{STRING_SERVER}/api/json/{metodo}?identifiers={'%0d'.join(identificadores)}&species={especie}"
+    for clave, valor in parametros.items():
+        url += f"&{clave}={valor}"
+
+    with perfil.etapa(f"string_{metodo}"):
+        return _memo_string.obtener(url, _descargar_json, url, refrescar_desde, refrescar_desde=refrescar_desde)
 
-    return mapeo_resultado
 
+def _descargar_json(url, refrescar_desde=None):
+    response = cache_http.get(url, refrescar_desde=refrescar_desde)
+    response.raise_for_status()  # Verifica si la solicitud fue exitosa
+    return response.json()
 
 
-def obtener_interacciones(proteina_id, formato_salida="uniprot"):
+def _mapear_nodos(data, formatos, max_concurrencia, refrescar_desde=None):
     """
-    Obtiene las interacciones proteicas a partir de la base de datos STRING
-    usando el identificador de proteína (UniProt ID o PDB ID).
-    
+    Prepara el mapeo de todos los nodos de `data` para los formatos que lo necesitan.
+
+    Primero se consulta el índice local; las xrefs de Ensembl solo se piden para
+    los nodos que no están en el índice para alguno de los formatos.
+
+    Returns:
+    tuple: (mapeo_local {formato: {id_string: id}}, xrefs {id_string: lista_xrefs}).
+    """
+    # Solo uniprot y pdb requieren mapeo; ensembl usa los IDs de STRING directamente
+    necesarios = [formato for formato in formatos if formato in FORMATOS_CON_XREFS]
+    if not necesarios:
+        return {}, {}
+    ids_para_convertir = set()
+    for item in data:
+        ids_para_convertir.add(item['stringId_A'])
+        ids_para_convertir.add(item['stringId_B'])
+    ids_para_convertir = sorted(ids_para_convertir)
+
+    with perfil.etapa("indice_ids"):
+        mapeo_local = {formato: indice_ids.buscar(formato, ids_para_convertir) for formato in necesarios}
+    faltantes = [id_ for id_ in ids_para_convertir if any(id_ not in mapeo_local[formato] for formato in necesarios)]
+    return mapeo_local, resolver_xrefs(faltantes, max_concurrencia, refrescar_desde)
+
+
+def _mapear_id(red, formato, string_id):
+    """Devuelve el ID de un nodo en el formato pedido (índice local primero, luego xrefs)."""
+    locales = red.get("mapeo_local", {}).get(formato, {})
+    if string_id in locales:
+        return locales[string_id]
+    return _DESDE_XREFS[formato](red["xrefs"].get(string_id))
+
+
+def armar_red(proteina_id, data, formatos=FORMATOS, max_concurrencia=MAX_CONCURRENCIA, refrescar_desde=None):
+    """
+    Arma el resultado de `obtener_red` a partir de una lista de interacciones de
+    STRING, preparando el mapeo de sus nodos para los formatos pedidos.
+    """
+    mapeo_local, xrefs = _mapear_nodos(data, formatos, max_concurrencia, refrescar_desde)
+    return {"proteina": proteina_id, "interacciones": data, "xrefs": xrefs, "mapeo_local": mapeo_local}
+
+
+def obtener_red(proteina_id, formatos=FORMATOS, max_concurrencia=MAX_CONCURRENCIA, especie=taxonomia.ESPECIE_POR_DEFECTO,
+                refrescar_desde=None):
+    """
+    Descarga una sola vez la red de STRING de una proteína y, si algún formato
+    lo necesita, las referencias cruzadas de Ensembl de todos sus nodos.
+
+    Todos los formatos de salida se derivan luego de este resultado en memoria
+    con `derivar_interacciones`, sin nuevas solicitudes HTTP.
+
     Args:
     proteina_id (str): El identificador de la proteína (UniProt o PDB).
-    
+    formatos (list): Formatos de salida que se van a derivar.
+    max_concurrencia (int): Número máximo de solicitudes simultáneas a Ensembl.
+    especie (int): Taxón de STRING de la proteína (ver src/taxonomia.py).
+    refrescar_desde (float): Momento (time.time()) antes del cual las respuestas de STRING y
+                             Ensembl guardadas en memoria o en disco no se usan y se vuelven
+                             a pedir (al actualizar resultados), o None para usarlas.
+
     Returns:
-    dict: Un diccionario con la lista de interacciones y los atributos
-          destacados para la proteína principal.
+    dict: {"proteina": id, "interacciones": datos_string, "xrefs": {id_string: xrefs},
+           "mapeo_local": {formato: {id_string: id}}}, o None si la solicitud a STRING falló.
     """
-    # URL de la API de STRING
-    url = f"https://string-db.org/api/json/network?identifiers={proteina_id}&species=9606"
+    # Si hay un almacén local de STRING (ver src/red_local.py) la red se arma sin acceder a la red
+    data = _redes_locales([proteina_id], especie).get(proteina_id)
+    if data is None:
+        try:
+            data = _consultar_string("network", [proteina_id], especie, refrescar_desde)
+        except requests.exceptions.RequestException as e:
+            print(f"Error en la solicitud: {e}")
+            return None
 
-    try:
-        # Hacer la solicitud a la API
-        response = requests.get(url)
-        response.raise_for_status()  # Verifica si la solicitud fue exitosa
-        
-        # Procesar la respuesta JSON
-        data = response.json()
+    return armar_red(proteina_id, data, formatos, max_concurrencia, refrescar_desde)
 
-        # Lista para almacenar las interacciones
-        interacciones = []
- 
 
-        # Recolectar todos los identificadores para la conversión
-        ids_para_convertir = set()
-        for item in data:
-            ids_para_convertir.add(item['stringId_A'])
-            ids_para_convertir.add(item['stringId_B'])
-        
+def _almacen(especie):
+    """Almacén local de STRING si está configurado y es de la especie pedida, o None."""
+    almacen = red_local.obtener_red_local()
+    if almacen is None or str(almacen.meta.get("especie")) != str(especie):
+        return None
+    return almacen
+
+
+def _redes_locales(proteina_ids, especie=taxonomia.ESPECIE_POR_DEFECTO):
+    """
+    Arma desde el almacén local de STRING las redes de las proteínas que contiene.
+
+    Returns:
+    dict: {proteina_id: datos_string} solo para las proteínas encontradas localmente.
+    """
+    almacen = _almacen(especie)
+    if almacen is None:
+        return {}
+    with perfil.etapa("red_local"):
+        return {proteina_id: almacen.red(string_id) for proteina_id, string_id in almacen.resolver(proteina_ids).items()}
+
+
+def _en_lotes(elementos, tamano):
+    """Divide una lista en sublistas de a lo sumo `tamano` elementos."""
+    return [elementos[i:i + tamano] for i in range(0, len(elementos), tamano)]
+
+
+def resolver_string_ids(proteina_ids, tamano_lote=TAMANO_LOTE_STRING, especie=taxonomia.ESPECIE_POR_DEFECTO,
+                        refrescar_desde=None):
+    """
+    Traduce identificadores (UniProt, PDB, ...) a identificadores de STRING, con una
+    solicitud a get_string_ids cada `tamano_lote` IDs. Los que están en el almacén
+    local de STRING se resuelven sin acceder a la red. Todos los IDs deben ser de
+    la especie `especie` (taxón de STRING). Con `refrescar_desde` no se usan las
+    respuestas guardadas antes de ese momento (ver `obtener_red`).
+
+    Returns:
+    dict: {proteina_id: id_string} solo con los IDs que se pudieron traducir.
+    """
+    almacen = _almacen(especie)
+    string_ids = almacen.resolver(proteina_ids) if almacen is not None else {}
+    remotas = [proteina_id for proteina_id in dict.fromkeys(proteina_ids) if proteina_id not in string_ids]
+    for lote in _en_lotes(remotas, tamano_lote):
+        try:
+            for item in _consultar_string("get_string_ids", lote, especie, refrescar_desde, limit=1):
+                string_ids.setdefault(lote[item["queryIndex"]], item["stringId"])
+        except requests.exceptions.RequestException as e:
+            print(f"Error en la solicitud: {e}")
+    return string_ids
+
 
-        # Si el formato es UniProt, convertimos los IDs a UniProt
-        if formato_salida == "uniprot":
-            print(f"Convirtiendo a UniProt...")
-            mapeo_ids = convertir_a_uniprot(list(ids_para_convertir))
-            # Crear la lista de interacciones con UniProt IDs
-            for item in data:
-                proteina_1 = mapeo_ids.get(item['stringId_A'], item['stringId_A'])
-                proteina_2 = mapeo_ids.get(item['stringId_B'], item['stringId_B'])
-
-                # Guardar la interacción con los scores
-                interacciones.append({
-                    "proteina_1": proteina_1,
-                    "proteina_2": proteina_2,
-                    "scores": {
-                        "combined_score": item.get("score", 0),
-                        "tscore": item.get("transferred_score", 0),
-                        "dscore": item.get("database_score", 0),
-                        "escore": item.get("experiments_score", 0),
-                        "pscore": item.get("prediction_score", 0),
-                        "nscore": item.get("neighborhood_score", 0),
-                    },
-                })
-
-        elif formato_salida == "ensembl":
-        # Si el formato es Ensembl, procesamos los Ensembl IDs directamente
-            print(f"Usando Ensembl IDs...")
-            for item in data:
-                # Procesar los IDs para eliminar todo lo que está antes del punto
-                proteina_1 = item['stringId_A'].split('.')[-1]  # Tomamos solo la parte después del punto
-                proteina_2 = item['stringId_B'].split('.')[-1]  # Tomamos solo la parte después del punto
-
-                # Guardar la interacción con los scores
-                interacciones.append({
-                    "proteina_1": proteina_1,
-                    "proteina_2": proteina_2,
-                    "scores": {
-                        "combined_score": item.get("score", 0),
-                        "tscore": item.get("transferred_score", 0),
-                        "dscore": item.get("database_score", 0),
-                        "escore": item.get("experiments_score", 0),
-                        "pscore": item.get("prediction_score", 0),
-                        "nscore": item.get("neighborhood_score", 0),
-                    }
-                },)
-
-        elif formato_salida == "pdb":
-            print(f"Convirtiendo a PDB...")
-            mapeo_ids = convertir_a_pdb(list(ids_para_convertir))
-            # Crear la lista de interacciones con PDB IDs
-            for item in data:
-                proteina_1 = mapeo_ids.get(item['stringId_A'], item['stringId_A'])
-                proteina_2 = mapeo_ids.get(item['stringId_B'], item['stringId_B'])
-
-            # Verificar si alguno de los nodos es None
-                if proteina_1 is None or proteina_2 is None:
-                    continue  # Saltar esta iteración si hay un nodo None
-
-                # Guardar la interacción con los scores
-                interacciones.append({
-                    "proteina_1": proteina_1,
-                    "proteina_2": proteina_2,
-                    "scores": {
-                        "combined_score": item.get("score", 0),
-                        "tscore": item.get("transferred_score", 0),
-                        "dscore": item.get("database_score", 0),
-                        "escore": item.get("experiments_score", 0),
-                        "pscore": item.get("prediction_score", 0),
-                        "nscore": item.get("neighborhood_score", 0),
-                    },
-                })
-            
+def obtener_vecinos(string_ids, limite=LIMITE_VECINOS, score_minimo=None, tamano_lote=TAMANO_LOTE_STRING,
+                    especie=taxonomia.ESPECIE_POR_DEFECTO, refrescar_desde=None):
+    """
+    Obtiene los mejores vecinos de varias proteínas con solicitudes agrupadas a
+    interaction_partners (o desde el almacén local de STRING si está configurado).
+
+    Args:
+    string_ids (list): Identificadores de STRING.
+    limite (int): Vecinos por proteína, ordenados por score combinado descendente.
+    score_minimo (int): Score combinado mínimo (0-1000), o None para el de STRING por defecto.
+    tamano_lote (int): Identificadores por solicitud a STRING.
+    especie (int): Taxón de STRING de las proteínas.
+    refrescar_desde (float): Momento antes del cual no se usan las respuestas guardadas, o None.
 
+    Returns:
+    dict: {id_string: [interacciones con stringId_A = id_string]}, con None para
+          las proteínas cuya solicitud falló.
+    """
+    vecinos = {string_id: [] for string_id in string_ids}
+    almacen = _almacen(especie)
+    remotos = []
+    for string_id in vecinos:
+        if almacen is not None and string_id in almacen.indices:
+            vecinos[string_id] = almacen.interacciones_vecinos(
+                string_id, limite, red_local.SCORE_MINIMO if score_minimo is None else score_minimo)
         else:
-            print(f"Formato {formato_salida} no soportado.")
-            return None
+            remotos.append(string_id)
 
-        
+    parametros = {"limit": limite}
+    if score_minimo is not None:
+        parametros["required_score"] = score_minimo
+    for lote in _en_lotes(remotos, tamano_lote):
+        try:
+            for item in _consultar_string("interaction_partners", lote, especie, refrescar_desde, **parametros):
+                if item["stringId_A"] in vecinos:
+                    vecinos[item["stringId_A"]].append(item)
+        except requests.exceptions.RequestException as e:
+            print(f"Error en la solicitud: {e}")
+            for string_id in lote:
+                vecinos[string_id] = None
+    return vecinos
+
+
+def obtener_redes(proteina_ids, formatos=FORMATOS, tamano_lote=TAMANO_LOTE_STRING, max_concurrencia=MAX_CONCURRENCIA,
+                  especie=taxonomia.ESPECIE_POR_DEFECTO, refrescar_desde=None):
+    """
+    Obtiene las redes de STRING de varias proteínas con pocas solicitudes.
+
+    En lugar de una llamada a /network por proteína, se hacen tres tipos de
+    consultas agrupadas de a `tamano_lote` identificadores:
+
+    1. get_string_ids: traduce cada ID consultado a su identificador de STRING.
+    2. interaction_partners: obtiene los vecinos de cada proteína, igual que los
+       que STRING agrega a la red de una sola proteína.
+    3. network: descarga las aristas entre los nodos de varias redes a la vez.
+
+    Luego la lista combinada de aristas se reparte por proteína consultada. Las
+    aristas compartidas entre redes se guardan una sola vez, y las xrefs de los
+    nodos se resuelven una sola vez para todo el panel.
+
+    STRING responde por especie, así que todas las proteínas de una llamada deben
+    ser de `especie`; los paneles con varios organismos se agrupan por taxón antes
+    (ver `agrupar_por_especie`).
+
+    Args:
+    proteina_ids (list): Identificadores a consultar (UniProt, PDB, ...).
+    formatos (list): Formatos de salida que se van a derivar.
+    tamano_lote (int): Identificadores por solicitud a STRING.
+    max_concurrencia (int): Número máximo de solicitudes simultáneas a Ensembl.
+    especie (int): Taxón de STRING de las proteínas (ver src/taxonomia.py).
+    refrescar_desde (float): Momento antes del cual no se usan las respuestas guardadas (ver `obtener_red`).
+
+    Returns:
+    dict: {proteina_id: red} con el mismo formato que `obtener_red`, o None
+          para las proteínas que no se pudieron consultar.
+    """
+    proteina_ids = list(dict.fromkeys(proteina_ids))
+    redes = {proteina_id: None for proteina_id in proteina_ids}
+
+    # Las proteínas presentes en el almacén local no se consultan a STRING
+    locales = _redes_locales(proteina_ids, especie)
+    remotas = [proteina_id for proteina_id in proteina_ids if proteina_id not in locales]
+
+    # 1. Traducir cada ID consultado a su identificador de STRING
+    string_ids = resolver_string_ids(remotas, tamano_lote, especie, refrescar_desde)
+
+    # 2. Vecinos de cada proteína (los nodos de su red)
+    nodos = {}
+    for string_id, items in obtener_vecinos(sorted(set(string_ids.values())), tamano_lote=tamano_lote,
+                                             especie=especie, refrescar_desde=refrescar_desde).items():
+        nodos[string_id] = None if items is None else {string_id} | {item["stringId_B"] for item in items}
+
+    # 3. Agrupar redes hasta llenar una solicitud y descargar sus aristas
+    grupos = []
+    grupo, union = [], set()
+    for string_id, nodos_red in nodos.items():
+        if nodos_red is None:
+            continue
+        if grupo and len(union | nodos_red) > tamano_lote:
+            grupos.append((grupo, union))
+            grupo, union = [], set()
+        grupo.append(string_id)
+        union |= nodos_red
+    if grupo:
+        grupos.append((grupo, union))
+
+    # Cada arista se guarda una sola vez, indexada por su par de nodos
+    aristas = {}
+    adyacencia = {}
+    descargados = set()
+    for grupo, union in grupos:
+        try:
+            data = _consultar_string("network", sorted(union), especie, refrescar_desde)
+        except requests.exceptions.RequestException as e:
+            print(f"Error en la solicitud: {e}")
+            continue
+        for item in data:
+            par = tuple(sorted((item["stringId_A"], item["stringId_B"])))
+            if par not in aristas:
+                aristas[par] = item
+                adyacencia.setdefault(par[0], []).append(par)
+        descargados.update(grupo)
+
+    # Repartir las aristas por proteína consultada
+    aristas_por_red = {}
+    for string_id in descargados:
+        nodos_red = nodos[string_id]
+        aristas_por_red[string_id] = [
+            aristas[par] for nodo in sorted(nodos_red) for par in adyacencia.get(nodo, []) if par[1] in nodos_red
+        ]
+
+    datos_por_proteina = dict(locales)
+    for proteina_id, string_id in string_ids.items():
+        if string_id in aristas_por_red:
+            datos_por_proteina[proteina_id] = aristas_por_red[string_id]
+
+    todas = [item for lista in datos_por_proteina.values() for item in lista]
+    mapeo_local, xrefs = _mapear_nodos(list({id(item): item for item in todas}.values()), formatos, max_concurrencia,
+                                       refrescar_desde)
+
+    for proteina_id, data in datos_por_proteina.items():
+        redes[proteina_id] = {"proteina": proteina_id, "interacciones": data, "xrefs": xrefs, "mapeo_local": mapeo_local}
+
+    return redes
+
+
+def agrupar_por_especie(especies):
+    """
+    Agrupa las proteínas de un panel por especie, conservando el orden de aparición.
+
+    Args:
+    especies (dict): {proteina_id: taxón de STRING}.
+
+    Returns:
+    dict: {taxón: [proteina_id, ...]}.
+    """
+    grupos = {}
+    for proteina_id, especie in especies.items():
+        grupos.setdefault(especie, []).append(proteina_id)
+    return grupos
+
+
+def obtener_redes_por_especie(especies, formatos=FORMATOS, tamano_lote=TAMANO_LOTE_STRING,
+                              max_concurrencia=MAX_CONCURRENCIA, refrescar_desde=None):
+    """
+    Igual que `obtener_redes` para un panel con proteínas de varias especies: se
+    hace una consulta agrupada por taxón, de modo que cada solicitud a STRING
+    lleva solo IDs de una especie y sus respuestas se cachean por separado.
+
+    Args:
+    especies (dict): {proteina_id: taxón de STRING}.
+
+    Returns:
+    dict: {proteina_id: red}, como `obtener_redes`.
+    """
+    redes = {}
+    for especie, proteina_ids in agrupar_por_especie(especies).items():
+        redes.update(obtener_redes(proteina_ids, formatos, tamano_lote=tamano_lote, max_concurrencia=max_concurrencia,
+                                   especie=especie, refrescar_desde=refrescar_desde))
+    return redes
+
+
+@perfil.etapa("derivar_tabla")
+def derivar_tabla(red, formato_salida="uniprot", agregacion="max"):
+    """
+    Construye la tabla de interacciones en el formato pedido a partir de una red
+    ya descargada con `obtener_red`. Cada nodo se traduce una sola vez, no una
+    vez por interacción.
+
+    Si varios IDs de STRING se traducen al mismo identificador, las interacciones
+    repetidas (también las invertidas, B-A) se unifican y los lazos se descartan
+    (ver `TablaInteracciones.canonica`).
+
+    Args:
+    red (dict): Resultado de `obtener_red`.
+    formato_salida (str): "uniprot", "ensembl" o "pdb".
+    agregacion (str): Cómo se combinan los scores de las repetidas: "max" o "mean".
+
+    Returns:
+    TablaInteracciones: Interacciones con sus scores, o None si el formato no está soportado.
+    """
+    data = red["interacciones"]
+
+    if formato_salida == "uniprot":
+        print(f"Convirtiendo a UniProt...")
+        tabla = tabla_interacciones.TablaInteracciones.desde_string(data, lambda string_id: _mapear_id(red, "uniprot", string_id))
+
+    elif formato_salida == "ensembl":
+        # Si el formato es Ensembl, usamos los Ensembl IDs directamente (la parte después del punto)
+        print(f"Usando Ensembl IDs...")
+        tabla = tabla_interacciones.TablaInteracciones.desde_string(data, lambda string_id: string_id.split('.')[-1])
+
+    elif formato_salida == "pdb":
+        print(f"Convirtiendo a PDB...")
+        tabla = tabla_interacciones.TablaInteracciones.desde_string(data, lambda string_id: _mapear_id(red, "pdb", string_id))
+
+        # Saltar las interacciones en las que alguno de los nodos no tiene PDB
+        sin_pdb = np.array([nodo is None for nodo in tabla.nodos], dtype=bool)
+        if sin_pdb.any():
+            tabla = tabla.filtrar(~sin_pdb[tabla.origen] & ~sin_pdb[tabla.destino])
+
+    else:
+        print(f"Formato {formato_salida} no soportado.")
+        return None
+
+    return tabla.canonica(agregacion)
+
+
+def derivar_interacciones(red, formato_salida="uniprot", agregacion="max"):
+    """
+    Igual que `derivar_tabla`, pero devuelve la lista de interacciones
+    {"proteina_1", "proteina_2", "scores"}, o None si el formato no está soportado.
+    """
+    tabla = derivar_tabla(red, formato_salida, agregacion)
+    return tabla.a_lista() if tabla is not None else None
 
-        # Retornar las interacciones 
-        return interacciones
+
+def obtener_interacciones(proteina_id, formato_salida="uniprot", especie=taxonomia.ESPECIE_POR_DEFECTO):
+    """
+    Obtiene las interacciones proteicas a partir de la base de datos STRING
+    usando el identificador de proteína (UniProt ID o PDB ID).
+
+    Para varios formatos de la misma proteína conviene llamar una vez a
+    `obtener_red` y luego a `derivar_interacciones` por formato.
     
-    except requests.exceptions.RequestException as e:
-        print(f"Error en la solicitud: {e}")
+    Args:
+    proteina_id (str): El identificador de la proteína (UniProt o PDB).
+    formato_salida (str): "uniprot", "ensembl" o "pdb".
+    especie (int): Taxón de STRING de la proteína (ver src/taxonomia.py).
+    
+    Returns:
+    list: La lista de interacciones con sus scores.
+    """
+    if formato_salida not in FORMATOS:
+        print(f"Formato {formato_salida} no soportado.")
+        return None
+
+    red = obtener_red(proteina_id, [formato_salida], especie=especie)
+    if red is None:
         return {
             "interacciones": []
         }
+    return derivar_interacciones(red, formato_salida)
     
 
 def obtener_interacciones_desde_pdb(pdb_id):
@@ -245,15 +647,17 @@ def obtener_uniprot_desde_pdb(pdb_id):
     :param pdb_id: El código PDB de la proteína.
     :return: ID de UniProt o None si no se encuentra.
     """
+    # Primero el índice local (SIFTS / idmapping de UniProt)
+    uniprot_id = indice_ids.buscar("pdb_uniprot", [pdb_id]).get(pdb_id)
+    if uniprot_id:
+        return uniprot_id
+
     # Construimos la URL de consulta
     url = f"https://www.ebi.ac.uk/pdbe/api/pdb/entry/summary/{pdb_id}"
     
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Si la respuesta no es exitosa, generará una excepción
-        
-        # Analizamos el JSON de la respuesta
-        data = response.json()
+        # Analizamos el JSON de la respuesta (una sola solicitud por PDB aunque se pida desde varios hilos)
+        data = _memo_pdbe.obtener(url, _descargar_json, url)
         
         # Buscamos el ID de UniProt
         uniprot_id = data.get(pdb_id.upper(), {}).get("uniprot", [None])[0]
@@ -267,3 +671,29 @@ def obtener_uniprot_desde_pdb(pdb_id):
     except requests.exceptions.RequestException as e:
         print(f"Error al obtener el UniProt desde PDB {pdb_id}: {e}")
         return None
+
+
+def versiones_fuentes():
+    """
+    Versiones actuales de STRING y Ensembl, para detectar cuándo cambiaron los datos
+    de origen (ver src/manifiesto.py). Se consultan sin pasar por la cache en disco,
+    que podría devolver una versión vieja; en modo sin conexión no se consultan.
+
+    Returns:
+    dict: {"string": "12.0", "ensembl": "113"}, sin las fuentes que no se pudieron consultar.
+    """
+    versiones = {}
+    if cache_http.sin_conexion():
+        return versiones
+    consultas = (
+        ("string", f"{STRING_SERVER}/api/json/version", lambda data: data[0]["string_version"]),
+        ("ensembl", f"{ENSEMBL_SERVER}/info/data?content-type=application/json", lambda data: max(data["releases"])),
+    )
+    for fuente, url, extraer in consultas:
+        try:
+            response = sesion_http.get(url, headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+            versiones[fuente] = str(extraer(response.json()))
+        except (requests.exceptions.RequestException, ValueError, LookupError, TypeError) as e:
+            print(f"No se pudo consultar la versión de {fuente}: {e}")
+    return versiones
@@ -0,0 +1,150 @@
+"""
+Instrumentación de una ejecución: tiempo por etapa (descarga de RCSB, STRING,
+xrefs de Ensembl, disposición del grafo, PNG, ...) y solicitudes HTTP por host
+con histograma de latencias.
+
+Está desactivada por defecto; con `activar()` (opción --perfil) cada etapa
+registra un evento que luego se resume con `imprimir_resumen()` o se exporta
+con `escribir_traza()` en formato Chrome trace (chrome://tracing o Perfetto).
+
+Las solicitudes HTTP se contabilizan en un solo lugar, `sesion_http.metricas`:
+el resumen por host de este módulo se arma con esas mismas métricas (las de
+--metricas-http), y aquí solo se guardan como eventos de la traza.
+
+Las etapas se marcan con un bloque `with perfil.etapa("nombre"):` o con el
+decorador `@perfil.etapa("nombre")`.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+_activo = False
+_inicio = None
+_eventos = []
+_lock = threading.Lock()
+
+
+def activar():
+    """Empieza a registrar etapas y solicitudes (reinicia lo registrado antes, también las métricas HTTP)."""
+    global _activo, _inicio
+    # sesion_http importa este módulo: se importa al usarlo para no crear un ciclo al cargar
+    import src.sesion_http as sesion_http
+    sesion_http.reiniciar_metricas()
+    with _lock:
+        _eventos.clear()
+        _inicio = time.perf_counter()
+        _activo = True
+
+
+def desactivar():
+    global _activo
+    _activo = False
+
+
+def activo():
+    return _activo
+
+
+def _registrar(nombre, categoria, inicio, segundos, args=None):
+    evento = {"nombre": nombre, "categoria": categoria, "inicio": inicio, "segundos": segundos,
+              "hilo": threading.get_ident(), "args": args or {}}
+    with _lock:
+        _eventos.append(evento)
+
+
+@contextlib.contextmanager
+def etapa(nombre, **args):
+    """Mide el tiempo de un bloque (o de cada llamada, usado como decorador)."""
+    if not _activo:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _registrar(nombre, "etapa", inicio, time.perf_counter() - inicio, args)
+
+
+def registrar_solicitud(host, inicio, segundos, num_bytes, error):
+    """Registra una solicitud HTTP como evento de la traza (lo llama `sesion_http.registrar_solicitud`)."""
+    if _activo:
+        _registrar(host, "http", inicio, segundos, {"bytes": num_bytes, "error": bool(error)})
+
+
+def resumen():
+    """
+    Devuelve el resumen de lo registrado:
+    {"segundos": duración total,
+     "etapas": {nombre: {"llamadas", "segundos", "media", "maximo"}},
+     "hosts": {host: {"solicitudes", "errores", "bytes", "segundos", "histograma": [conteo por rango]}}},
+    donde "hosts" son las métricas de `sesion_http.metricas`.
+    """
+    import src.sesion_http as sesion_http
+    with _lock:
+        eventos = list(_eventos)
+        inicio = _inicio
+    etapas = {}
+    for evento in eventos:
+        if evento["categoria"] == "etapa":
+            e = etapas.setdefault(evento["nombre"], {"llamadas": 0, "segundos": 0.0, "maximo": 0.0})
+            e["llamadas"] += 1
+            e["segundos"] += evento["segundos"]
+            e["maximo"] = max(e["maximo"], evento["segundos"])
+    hosts = {host: {campo: m[campo] for campo in ("solicitudes", "errores", "bytes", "segundos", "histograma")}
+             for host, m in sesion_http.metricas().items()}
+    for e in etapas.values():
+        e["media"] = e["segundos"] / e["llamadas"]
+    total = time.perf_counter() - inicio if inicio is not None else 0.0
+    return {"segundos": total, "etapas": etapas, "hosts": hosts}
+
+
+def imprimir_resumen():
+    """Imprime una tabla con el tiempo por etapa y el histograma de latencias por host."""
+    datos = resumen()
+    print(f"Perfil de la ejecución: {datos['segundos']:.2f} s en total")
+    if datos["etapas"]:
+        print(f"{'Etapa':<24} {'Llamadas':>9} {'Total (s)':>10} {'%':>6} {'Media (ms)':>11} {'Máx (ms)':>9}")
+        for nombre, e in sorted(datos["etapas"].items(), key=lambda par: -par[1]["segundos"]):
+            porcentaje = 100 * e["segundos"] / datos["segundos"] if datos["segundos"] else 0.0
+            print(f"{nombre:<24} {e['llamadas']:>9} {e['segundos']:>10.2f} {porcentaje:>6.1f} "
+                  f"{e['media'] * 1000:>11.1f} {e['maximo'] * 1000:>9.1f}")
+    if datos["hosts"]:
+        import src.sesion_http as sesion_http
+        limites = sesion_http.LIMITES_HISTOGRAMA_MS
+        rangos = [f"<{limite}ms" for limite in limites] + [f">={limites[-1]}ms"]
+        print(f"{'Host':<24} {'Solic.':>7} {'Errores':>8} {'KB':>9} " + " ".join(f"{rango:>8}" for rango in rangos))
+        for host, h in sorted(datos["hosts"].items(), key=lambda par: -par[1]["segundos"]):
+            print(f"{host:<24} {h['solicitudes']:>7} {h['errores']:>8} {h['bytes'] / 1024:>9.1f} "
+                  + " ".join(f"{conteo:>8}" for conteo in h["histograma"]))
+
+
+def escribir_traza(ruta):
+    """
+    Escribe los eventos registrados en formato Chrome trace (JSON con "traceEvents").
+
+    :return: Ruta del archivo escrito.
+    """
+    with _lock:
+        eventos = list(_eventos)
+        inicio = _inicio or 0.0
+    pid = os.getpid()
+    traza = [
+        {
+            "name": evento["nombre"],
+            "cat": evento["categoria"],
+            "ph": "X",
+            "ts": round((evento["inicio"] - inicio) * 1e6, 1),
+            "dur": round(evento["segundos"] * 1e6, 1),
+            "pid": pid,
+            "tid": evento["hilo"],
+            "args": evento["args"],
+        }
+        for evento in eventos
+    ]
+    if os.path.dirname(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": traza, "displayTimeUnit": "ms"}, f)
+    return ruta
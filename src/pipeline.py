@@ -0,0 +1,334 @@
+import os
+import re
+import time
+
+import requests
+
+import src.cargar_secuencia as cargar_secuencia
+import src.estructura as estructura
+import src.expansion as expansion
+import src.guardar_interacciones as guardar_interacciones
+import src.manifiesto as manifiesto
+import src.obtener_interacciones as obtener_interacciones
+import src.perfil as perfil
+import src.taxonomia as taxonomia
+import src.visualizar_interacciones as visualizar_interacciones
+
+# Tipos de entrada aceptados
+TIPOS = ("pdb", "archivo", "uniprot")
+
+PATRON_UNIPROT = re.compile(r"^[A-Za-z0-9]{6,10}$")
+PATRON_PDB = re.compile(r"^[0-9][A-Za-z0-9]{3}$")
+
+
+def detectar_tipo(valor):
+    """
+    Deduce el tipo de entrada a partir del identificador.
+
+    :param valor: ID de PDB, ID de UniProt o ruta a un archivo de estructura.
+    :return: "pdb", "archivo", "uniprot" o None si no se reconoce.
+    """
+    if valor.lower().endswith(estructura.EXTENSIONES):
+        return "archivo"
+    if PATRON_PDB.match(valor):
+        return "pdb"
+    if PATRON_UNIPROT.match(valor):
+        return "uniprot"
+    return None
+
+
+def validar_entrada(tipo, valor):
+    """
+    Verifica que el valor tenga un formato válido para su tipo.
+
+    :return: Mensaje de error, o None si la entrada es válida.
+    """
+    # Validar que si se pasa un archivo, este tenga una extensión de estructura conocida
+    if tipo == "archivo" and not valor.lower().endswith(estructura.EXTENSIONES):
+        return "El archivo debe tener la extensión .pdb, .ent o .cif (opcionalmente .gz)."
+    # Verificación del formato de ID de UniProt
+    if tipo == "uniprot" and not PATRON_UNIPROT.match(valor):
+        return "El ID de UniProt no tiene un formato válido."
+    if tipo not in TIPOS:
+        return f"Tipo de entrada desconocido: {tipo}"
+    return None
+
+
+def cargar_entrada(tipo, valor):
+    """
+    Carga la secuencia de la proteína desde PDB ID, archivo PDB o UniProt.
+
+    :return: Tupla (secuencia, id_iter, especie, taxon); secuencia es None si no se pudo cargar
+             y taxon es None si la fuente no lo indica (solo UniProt lo incluye).
+    """
+    secuencia = None
+    id_iter = None
+    especie = None
+    taxon = None
+
+    if tipo == "pdb":
+        secuencia, especie = cargar_secuencia.load_sequence_from_pdb(valor)
+        if secuencia:
+            print(f"Secuencia cargada desde PDB {valor}: {secuencia[:50]}...")
+            id_iter = valor
+    elif tipo == "archivo":
+        secuencia, _, especie = cargar_secuencia.load_sequence_from_file(valor)
+        if secuencia:
+            print(f"Secuencia cargada desde archivo PDB {valor}: {secuencia[:50]}...")
+            id_iter = valor
+    elif tipo == "uniprot":
+        secuencia, especie, taxon = cargar_secuencia.cargar_fasta_desde_uniprot(valor)
+        if secuencia:
+            print(f"Secuencia cargada desde UniProt {valor}: {secuencia[:50]}...")
+            id_iter = valor
+
+    return secuencia, id_iter, especie, taxon
+
+
+def nombre_salida(tipo, valor):
+    """Nombre base de los archivos de resultados de una proteína (sin carpeta ni extensión si es un archivo)."""
+    if tipo != "archivo":
+        return valor
+    nombre = os.path.basename(valor)
+    extension = next((ext for ext in estructura.EXTENSIONES if nombre.lower().endswith(ext)), "")
+    return nombre[:len(nombre) - len(extension)] if extension else nombre
+
+
+def _estado_inicial(tipo, valor):
+    return {"id": valor, "tipo": tipo, "estado": "error", "mensaje": "", "especie": None, "taxon": None, "id_iter": None,
+            "interacciones": {}}
+
+
+def resolver_taxon(especie, taxon=None, forzada=None):
+    """
+    Especie de STRING a la que se dirigen las consultas de una proteína.
+
+    :param especie: Organismo detectado al cargar la secuencia (o None).
+    :param taxon: Taxón de NCBI detectado (o None).
+    :param forzada: Especie indicada por el usuario (nombre o taxón), que tiene prioridad.
+    :return: Taxón de STRING (int).
+    """
+    if forzada is not None:
+        organismo = forzada
+    elif taxon is not None:
+        organismo = taxon
+    else:
+        organismo = especie
+
+    especie_string = taxonomia.resolver(organismo, por_defecto=None)
+    if especie_string is None:
+        if organismo:
+            print(f"Especie no reconocida ({organismo}); se consulta STRING para "
+                  f"{taxonomia.nombre(taxonomia.ESPECIE_POR_DEFECTO)}.")
+        return taxonomia.ESPECIE_POR_DEFECTO
+    return especie_string
+
+
+def cargar_proteina(tipo, valor, especie=None):
+    """
+    Valida la entrada y carga la secuencia de la proteína.
+
+    :param tipo: "pdb", "archivo" o "uniprot".
+    :param valor: Identificador o ruta de la proteína.
+    :param especie: Especie (nombre o taxón) que reemplaza a la detectada, o None para usar la detectada.
+    :return: Diccionario de estado (ver `procesar_proteina`); "id_iter" queda en None si falló la carga.
+    """
+    estado = _estado_inicial(tipo, valor)
+
+    error = validar_entrada(tipo, valor)
+    if error:
+        print(f"Error: {error}")
+        estado["mensaje"] = error
+        return estado
+
+    try:
+        with perfil.etapa(f"carga_{tipo}"):
+            secuencia, id_iter, detectada, taxon = cargar_entrada(tipo, valor)
+    except requests.exceptions.RequestException as e:
+        print(f"Error al cargar la secuencia de {valor}: {e}")
+        estado["mensaje"] = str(e)
+        return estado
+    estado["especie"] = detectada
+
+    # Mostrar especie si se detectó
+    if detectada:
+        print(f"Especie detectada: {detectada}")
+    estado["taxon"] = resolver_taxon(detectada, taxon, especie)
+
+    # Verificar que la secuencia se haya cargado correctamente
+    if not secuencia:
+        print("Error: No se pudo cargar la secuencia de proteína.")
+        estado["mensaje"] = "No se pudo cargar la secuencia de proteína."
+        return estado
+
+    estado["id_iter"] = id_iter
+    return estado
+
+
+def generar_salidas(estado, red, salidas, ruta_guardar=None, visualizar=False, mostrar_interacciones=True,
+                    disposicion="auto", mostrar_ventana=True, formato_guardado="json", agregacion="max", registro=None,
+                    actualizar=False, canal=None, tablas=None):
+    """
+    Deriva cada formato de salida a partir de la red ya descargada y guarda/visualiza el resultado.
+
+    :param estado: Estado devuelto por `cargar_proteina`; se actualiza y se devuelve.
+    :param red: Resultado de `obtener_interacciones.obtener_red` (o None si falló).
+    :param disposicion: Disposición de los nodos del grafo (ver `visualizar_interacciones.DISPOSICIONES`).
+    :param mostrar_ventana: Si es False el grafo solo se guarda, sin abrir la ventana interactiva.
+    :param formato_guardado: Formato de los archivos de interacciones (ver `guardar_interacciones.FORMATOS`).
+    :param agregacion: Cómo se combinan los scores de las interacciones repetidas ("max" o "mean").
+    :param registro: Manifiesto (ver src/manifiesto.py) donde se registran las salidas guardadas, o None.
+    :param actualizar: Si es True, los archivos cuyo contenido no cambió respecto del manifiesto no se
+                       vuelven a escribir y los que cambiaron se reemplazan en su lugar.
+    :param canal: Canal de score (ver `tabla_interacciones.CAMPOS_SCORE`) con el que se calculan las
+                  métricas por nodo de cada red (ver src/analisis.py), o None para no calcularlas.
+    :param tablas: Diccionario opcional donde se deja la TablaInteracciones derivada para cada formato.
+    :return: El diccionario de estado actualizado.
+    """
+    id_iter = estado["id_iter"]
+    clave = manifiesto.clave(ruta_guardar) if registro is not None and ruta_guardar else None
+    if clave and red is not None:
+        registro.registrar(clave, estado, consultar_versiones=actualizar)
+
+    # Derivar las interacciones para cada formato de salida
+    for salida in salidas or []:
+        print(f"Procesando interacciones para formato: {salida}")
+        interacciones = obtener_interacciones.derivar_tabla(red, salida, agregacion) if red else None
+
+        if interacciones:
+            estado["interacciones"][salida] = len(interacciones)
+            if tablas is not None:
+                tablas[salida] = interacciones
+            if mostrar_interacciones:
+                print(f"Interacciones obtenidas para {salida}: {interacciones.a_lista()}")
+
+            # Al actualizar, una salida con la misma huella que la registrada no se vuelve a escribir
+            huella = interacciones.huella() if clave else None
+            previa = registro.salida(clave, salida) if clave else None
+            sin_cambios = (actualizar and previa is not None and previa["huella"] == huella
+                           and previa["formato_guardado"] == formato_guardado
+                           and bool(previa["archivo"]) and os.path.exists(previa["archivo"]))
+            archivo, grafo = (previa["archivo"], previa["grafo"]) if sin_cambios else (None, None)
+            if sin_cambios:
+                print(f"Sin cambios para {salida}: se conserva {archivo}")
+            # Las métricas dependen solo de las interacciones y del canal
+            metricas = previa.get("metricas") if sin_cambios and previa.get("canal") == canal else None
+
+            # Guardar las interacciones en un archivo y generar gráfico
+            if ruta_guardar and not sin_cambios:
+                archivo = guardar_interacciones.guardar_interacciones(
+                    interacciones, f"{ruta_guardar}_{salida}{guardar_interacciones.EXTENSIONES[formato_guardado]}",
+                    formato_guardado, sobrescribir=actualizar)
+
+            # Si se solicita, visualizar las interacciones para cada formato
+            if visualizar and (mostrar_ventana or not (sin_cambios and grafo and os.path.exists(grafo))):
+                grafo = visualizar_interacciones.visualizar_interacciones(interacciones, id_iter, salida=salida, ruta_archivo=f"{ruta_guardar}_{salida}",
+                                                                          disposicion=disposicion, mostrar=mostrar_ventana)
+
+            # Métricas por nodo de la red, junto al archivo de interacciones
+            if canal and not (metricas and os.path.exists(metricas)):
+                # SciPy solo se importa si se pide el análisis
+                import src.analisis as analisis
+                resultado = analisis.analizar(interacciones, canal)
+                resumen = resultado.resumen()
+                print(f"Análisis de {salida}: {resumen['nodos']} nodos, {resumen['aristas']} aristas, "
+                      f"{resumen['comunidades']} comunidades, hubs: {', '.join(resumen['hubs']) or 'ninguno'}")
+                if ruta_guardar:
+                    metricas = guardar_interacciones.guardar_metricas(resultado, f"{ruta_guardar}_{salida}_metricas.json",
+                                                                      sobrescribir=actualizar)
+
+            if clave:
+                registro.registrar_salida(clave, salida, archivo, formato_guardado, huella, len(interacciones), grafo,
+                                          escrito=None if sin_cambios else time.time(),
+                                          metricas=metricas if canal else None, canal=canal)
+        else:
+            estado["interacciones"][salida] = 0
+            print(f"No se pudieron obtener interacciones para {salida}.")
+            if clave and red is not None:
+                registro.registrar_salida(clave, salida, None, formato_guardado, None, 0, escrito=time.time())
+
+    if red is None and salidas:
+        estado["mensaje"] = "No se pudo obtener la red de STRING."
+        return estado
+
+    estado["estado"] = "ok"
+    return estado
+
+
+def descargar_red(id_iter, salidas, saltos=1, score_minimo=expansion.SCORE_MINIMO, especie=taxonomia.ESPECIE_POR_DEFECTO,
+                  refrescar_desde=None):
+    """
+    Descarga la red de STRING de una proteína: la red por defecto de STRING si
+    `saltos` es 1, o el vecindario expandido con `expansion.expandir` si es mayor.
+    `especie` es el taxón de STRING de la proteína (el "taxon" del estado). Con
+    `refrescar_desde` no se usan las respuestas guardadas antes de ese momento.
+    """
+    if saltos > 1:
+        return expansion.expandir(id_iter, saltos, score_minimo, formatos=salidas, especie=especie,
+                                  refrescar_desde=refrescar_desde)
+    return obtener_interacciones.obtener_red(id_iter, salidas, especie=especie, refrescar_desde=refrescar_desde)
+
+
+def procesar_proteina(tipo, valor, salidas, ruta_guardar=None, visualizar=False, mostrar_interacciones=True,
+                      saltos=1, score_minimo=expansion.SCORE_MINIMO, disposicion="auto", mostrar_ventana=True,
+                      formato_guardado="json", agregacion="max", especie=None, actualizar=False, ttl=manifiesto.TTL,
+                      canal=None, registro=None, tablas=None, refrescar_desde=None):
+    """
+    Ejecuta el flujo completo para una proteína: carga de la secuencia,
+    descarga de la red de interacciones, conversión a cada formato de salida
+    y guardado/visualización.
+
+    :param tipo: "pdb", "archivo" o "uniprot".
+    :param valor: Identificador o ruta de la proteína.
+    :param salidas: Lista de formatos de salida (uniprot, ensembl, pdb).
+    :param ruta_guardar: Ruta base de los archivos JSON, o None para no guardar.
+    :param visualizar: Si es True, se grafican las interacciones de cada formato.
+    :param mostrar_interacciones: Si es True, se imprimen las interacciones obtenidas.
+    :param saltos: Distancia máxima a la proteína en la red (1 = red de STRING por defecto).
+    :param score_minimo: Score combinado mínimo (0-1000) de las aristas al expandir la red.
+    :param disposicion: Disposición de los nodos del grafo (ver `visualizar_interacciones.DISPOSICIONES`).
+    :param mostrar_ventana: Si es False el grafo solo se guarda, sin abrir la ventana interactiva.
+    :param formato_guardado: Formato de los archivos de interacciones (ver `guardar_interacciones.FORMATOS`).
+    :param agregacion: Cómo se combinan los scores de las interacciones repetidas ("max" o "mean").
+    :param especie: Especie (nombre o taxón) que reemplaza a la detectada, o None para usar la detectada.
+    :param actualizar: Si es True y el manifiesto de resultados tiene una entrada vigente para `ruta_guardar`
+                       (ver `manifiesto.Manifiesto.vigente`), no se consulta nada; si no, la red se
+                       vuelve a descargar sin usar las caches y solo se reescriben los archivos que cambiaron.
+    :param ttl: Segundos tras los cuales una entrada del manifiesto se vuelve a descargar al actualizar.
+    :param canal: Canal de score con el que se calculan las métricas por nodo (ver src/analisis.py),
+                  o None para no calcularlas.
+    :param registro: Manifiesto compartido entre varias llamadas (ver src/servicio.py); por defecto
+                     se abre el de la carpeta de resultados si se guarda algo.
+    :param tablas: Diccionario opcional donde se deja la TablaInteracciones de cada formato de salida.
+    :param refrescar_desde: Al actualizar, momento (time.time()) antes del cual las respuestas de STRING
+                            y Ensembl en caché se vuelven a pedir; por defecto, el inicio de esta llamada.
+    :return: Diccionario con el estado del procesamiento:
+             {"id", "tipo", "estado", "mensaje", "especie", "taxon", "id_iter", "interacciones": {formato: cantidad}},
+             donde "especie" es el organismo detectado y "taxon" la especie de STRING consultada.
+    """
+    if actualizar and refrescar_desde is None:
+        refrescar_desde = time.time()
+    if not ruta_guardar:
+        registro = None
+    elif registro is None:
+        registro = manifiesto.Manifiesto()
+    if actualizar and registro is not None and registro.vigente(manifiesto.clave(ruta_guardar), salidas, formato_guardado,
+                                                                visualizar, ttl, canal=canal):
+        print(f"{valor}: sin cambios desde la última descarga, no se actualiza.")
+        return registro.estado(manifiesto.clave(ruta_guardar))
+
+    estado = cargar_proteina(tipo, valor, especie)
+    if estado["id_iter"] is None:
+        return estado
+
+    print(f"ID utilizado para interacciones: {estado['id_iter']}")
+
+    # La red de STRING y las xrefs se descargan una sola vez para todos los formatos
+    red = descargar_red(estado["id_iter"], salidas or [], saltos, score_minimo, estado["taxon"],
+                        refrescar_desde if actualizar else None)
+
+    estado = generar_salidas(estado, red, salidas, ruta_guardar, visualizar, mostrar_interacciones, disposicion, mostrar_ventana,
+                             formato_guardado, agregacion, registro, actualizar, canal, tablas)
+    if registro is not None:
+        registro.guardar()
+    return estado
@@ -0,0 +1,254 @@
+"""
+Almacén local de la red de STRING construido a partir de los archivos
+protein.links.detailed / protein.links.full, para consultar redes sin acceso a la red.
+
+Las aristas se guardan en formato CSR (por cada proteína, el rango de sus vecinos)
+en arrays de NumPy que se abren con memoria mapeada:
+
+    nodos.txt            un identificador de STRING por línea (índice = número de línea)
+    desplazamientos.npy  int64[n + 1], vecinos de i en vecinos[desplazamientos[i]:desplazamientos[i + 1]]
+    vecinos.npy          int32[m]
+    <canal>.npy          uint16[m] por canal de score (0-1000, como en los archivos de STRING)
+    meta.json            canales disponibles, especie y archivo de origen
+
+Uso:
+    python -m src.red_local 9606.protein.links.detailed.v12.0.txt.gz --salida red_9606
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from array import array
+
+import numpy as np
+
+import src.indice_ids as indice_ids
+
+RUTA_RED_LOCAL = os.environ.get("INTERACPPY_RED_LOCAL")
+
+# Columna de los archivos de STRING -> campo de la API JSON de STRING
+CANALES = {
+    "combined_score": "score",
+    "neighborhood": "nscore",
+    "fusion": "fscore",
+    "cooccurence": "pscore",
+    "coexpression": "ascore",
+    "experimental": "escore",
+    "database": "dscore",
+    "textmining": "tscore",
+}
+
+# Nombres de columna de los archivos protein.links.full que difieren de los .detailed
+ALIAS_COLUMNAS = {
+    "experiments": "experimental",
+}
+
+# Mismos valores por defecto que la API de STRING para la red de una proteína
+LIMITE_VECINOS = 10
+SCORE_MINIMO = 400
+
+
+def _abrir(ruta):
+    if ruta.lower().endswith(".gz"):
+        return gzip.open(ruta, "rt", encoding="utf-8")
+    return open(ruta, "r", encoding="utf-8")
+
+
+def importar(ruta_links, directorio):
+    """
+    Convierte un archivo protein.links.detailed/full de STRING en el almacén local.
+
+    :param ruta_links: Archivo de STRING (texto separado por espacios, opcionalmente .gz).
+    :param directorio: Carpeta donde se escriben los arrays.
+    :return: Tupla (cantidad de proteínas, cantidad de aristas dirigidas).
+    """
+    indices = {}
+    origen = array("i")
+    destino = array("i")
+
+    with _abrir(ruta_links) as f:
+        cabecera = f.readline().split()
+        columnas = [(i, ALIAS_COLUMNAS.get(nombre, nombre)) for i, nombre in enumerate(cabecera)
+                    if ALIAS_COLUMNAS.get(nombre, nombre) in CANALES]
+        if not columnas or cabecera[:2] != ["protein1", "protein2"]:
+            raise ValueError(f"{ruta_links} no parece un archivo protein.links de STRING")
+        scores = {nombre: array("H") for _, nombre in columnas}
+
+        for linea in f:
+            partes = linea.split()
+            if len(partes) < len(cabecera):
+                continue
+            origen.append(indices.setdefault(partes[0], len(indices)))
+            destino.append(indices.setdefault(partes[1], len(indices)))
+            for i, nombre in columnas:
+                scores[nombre].append(int(partes[i]))
+
+    # Ordenar las aristas por proteína de origen (y por score combinado descendente dentro de cada una)
+    origen = np.frombuffer(origen, dtype=np.int32)
+    destino = np.frombuffer(destino, dtype=np.int32)
+    combinado = np.frombuffer(scores["combined_score"], dtype=np.uint16)
+    orden = np.lexsort((-combinado.astype(np.int32), origen))
+
+    os.makedirs(directorio, exist_ok=True)
+    desplazamientos = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origen, minlength=len(indices)), out=desplazamientos[1:])
+    np.save(os.path.join(directorio, "desplazamientos.npy"), desplazamientos)
+    np.save(os.path.join(directorio, "vecinos.npy"), destino[orden])
+    for nombre, valores in scores.items():
+        np.save(os.path.join(directorio, f"{nombre}.npy"), np.frombuffer(valores, dtype=np.uint16)[orden])
+
+    with open(os.path.join(directorio, "nodos.txt"), "w", encoding="utf-8") as f:
+        for nombre in indices:
+            f.write(nombre + "\n")
+
+    especie = next(iter(indices), "").split(".")[0]
+    with open(os.path.join(directorio, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"canales": list(scores), "especie": especie, "origen": os.path.basename(ruta_links)}, f)
+
+    return len(indices), len(destino)
+
+
+class RedLocal:
+    """
+    Consultas sobre un almacén creado con `importar`. Los arrays se abren con
+    memoria mapeada, de modo que solo se leen del disco las páginas que se usan.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(directorio, "nodos.txt"), encoding="utf-8") as f:
+            self.nodos = [linea.rstrip("\n") for linea in f]
+        self.indices = {nombre: i for i, nombre in enumerate(self.nodos)}
+        self.desplazamientos = np.load(os.path.join(directorio, "desplazamientos.npy"), mmap_mode="r")
+        self.vecinos_csr = np.load(os.path.join(directorio, "vecinos.npy"), mmap_mode="r")
+        self.scores = {nombre: np.load(os.path.join(directorio, f"{nombre}.npy"), mmap_mode="r")
+                       for nombre in self.meta["canales"]}
+
+    def resolver(self, identificadores):
+        """
+        Traduce identificadores consultados (ID de STRING, ENSP, UniProt o PDB) a
+        identificadores de STRING presentes en el almacén.
+
+        :return: Diccionario {identificador: id_string} solo con los que se encontraron.
+        """
+        especie = self.meta.get("especie")
+        resultado = {}
+        pendientes = []
+        for id_ in identificadores:
+            for candidato in (id_, f"{especie}.{id_}"):
+                if candidato in self.indices:
+                    resultado[id_] = candidato
+                    break
+            else:
+                pendientes.append(id_)
+
+        # UniProt (o PDB -> UniProt) -> ENSP a través del índice local de IDs
+        if pendientes:
+            pdb_uniprot = indice_ids.buscar("pdb_uniprot", pendientes)
+            accesiones = {id_: pdb_uniprot.get(id_, id_) for id_ in pendientes}
+            inversos = indice_ids.buscar_inverso("uniprot", accesiones.values())
+            for id_, accesion in accesiones.items():
+                for ensp in inversos.get(accesion, []):
+                    if f"{especie}.{ensp}" in self.indices:
+                        resultado[id_] = f"{especie}.{ensp}"
+                        break
+        return resultado
+
+    def _fila(self, i):
+        inicio, fin = self.desplazamientos[i], self.desplazamientos[i + 1]
+        return inicio, fin
+
+    def vecinos(self, string_id, limite=LIMITE_VECINOS, score_minimo=SCORE_MINIMO):
+        """
+        Vecinos de una proteína ordenados por score combinado descendente.
+
+        :return: Lista de tuplas (id_string_vecino, posicion_arista).
+        """
+        i = self.indices.get(string_id)
+        if i is None:
+            return []
+        inicio, fin = self._fila(i)
+        combinado = self.scores["combined_score"][inicio:fin]
+        # Las aristas de cada fila ya están ordenadas por score combinado
+        cantidad = int(np.count_nonzero(combinado >= score_minimo))
+        if limite is not None:
+            cantidad = min(cantidad, limite)
+        return [(self.nodos[j], inicio + k) for k, j in enumerate(self.vecinos_csr[inicio:inicio + cantidad])]
+
+    def _item(self, a, b, posicion):
+        """Arma una interacción con los mismos campos que la API JSON de STRING."""
+        item = {"stringId_A": self.nodos[a], "stringId_B": self.nodos[b]}
+        for columna, campo in CANALES.items():
+            if columna in self.scores:
+                item[campo] = round(int(self.scores[columna][posicion]) / 1000, 3)
+        return item
+
+    def interacciones_vecinos(self, string_id, limite=LIMITE_VECINOS, score_minimo=SCORE_MINIMO):
+        """Equivalente a /api/json/interaction_partners de STRING para una proteína."""
+        a = self.indices.get(string_id)
+        return [self._item(a, self.indices[vecino], posicion)
+                for vecino, posicion in self.vecinos(string_id, limite, score_minimo)]
+
+    def aristas_entre(self, string_ids, score_minimo=SCORE_MINIMO):
+        """
+        Todas las aristas (una por par) entre un conjunto de proteínas.
+
+        :return: Lista de interacciones con el formato de la API de STRING.
+        """
+        nodos = np.array(sorted(self.indices[s] for s in string_ids if s in self.indices), dtype=np.int32)
+        interacciones = []
+        for a in nodos:
+            inicio, fin = self._fila(a)
+            vecinos = self.vecinos_csr[inicio:fin]
+            seleccion = np.nonzero(np.isin(vecinos, nodos) & (vecinos > a)
+                                   & (self.scores["combined_score"][inicio:fin] >= score_minimo))[0]
+            for k in seleccion:
+                interacciones.append(self._item(int(a), int(vecinos[k]), inicio + k))
+        return interacciones
+
+    def red(self, string_id, limite=LIMITE_VECINOS, score_minimo=SCORE_MINIMO):
+        """
+        Red de una proteína equivalente a /api/json/network de STRING: la proteína,
+        sus `limite` mejores vecinos y todas las aristas entre ellos.
+        """
+        nodos = {string_id} | {vecino for vecino, _ in self.vecinos(string_id, limite, score_minimo)}
+        return self.aristas_entre(nodos, score_minimo)
+
+
+_config = {"directorio": RUTA_RED_LOCAL}
+_red = None
+_red_lock = threading.Lock()
+
+
+def configurar(directorio=None):
+    """Indica la carpeta del almacén local (None la desactiva)."""
+    global _red
+    with _red_lock:
+        _config["directorio"] = directorio
+        _red = None
+
+
+def obtener_red_local():
+    """Devuelve el almacén configurado, o None si no hay ninguno."""
+    global _red
+    with _red_lock:
+        if _red is None and _config["directorio"] and os.path.exists(os.path.join(_config["directorio"], "meta.json")):
+            _red = RedLocal(_config["directorio"])
+        return _red
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa un archivo protein.links de STRING al almacén local.")
+    parser.add_argument("archivo", help="Archivo protein.links.detailed o protein.links.full (opcionalmente .gz).")
+    parser.add_argument("--salida", required=True, help="Carpeta del almacén local.")
+    args = parser.parse_args()
+
+    proteinas, aristas = importar(args.archivo, args.salida)
+    print(f"Almacén guardado en {args.salida}: {proteinas} proteínas, {aristas} aristas.")
+
+
+if __name__ == "__main__":
+    main()
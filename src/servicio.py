@@ -0,0 +1,518 @@
+"""
+Modo servicio: un proceso de larga duración que recibe trabajos por HTTP local
+(TCP en 127.0.0.1 o un socket Unix) y los procesa con el mismo flujo que la línea
+de comandos (`pipeline.procesar_proteina`).
+
+A diferencia de una ejecución de main.py por proteína, el proceso conserva entre
+trabajos las bibliotecas ya importadas, el pool de conexiones de `sesion_http`,
+las memos en memoria (`memo`), la cache HTTP abierta y el manifiesto de resultados.
+Al arrancar se importan en segundo plano networkx, matplotlib y SciPy, de modo que
+el primer grafo o análisis no paga ese costo.
+
+Cada proteína de un trabajo es una tarea en una cola con prioridad que atiende un
+pool acotado de hilos: las proteínas de un trabajo urgente pasan delante de las de
+uno enviado antes con menor prioridad (menor número = más urgente).
+
+API (JSON; los resultados en NDJSON, una línea por proteína):
+
+    POST   /trabajos                   {"ids": ["P04637", "1TUP"], "salidas": ["uniprot"], ...} -> 202
+    GET    /trabajos                   Resumen de todos los trabajos.
+    GET    /trabajos/<id>              Resumen de un trabajo.
+    GET    /trabajos/<id>/resultados   Estado de cada proteína a medida que termina (?esperar=0: solo lo ya hecho).
+    DELETE /trabajos/<id>              Cancela las proteínas que todavía no empezaron.
+    GET    /estado                     Cola, hilos, caches y conexiones HTTP.
+
+Las opciones de un trabajo (ver OPCIONES) son las de la línea de comandos; con
+"interacciones": true cada línea de resultados incluye además las interacciones
+de cada formato de salida.
+
+Ejemplo:
+    python main.py --servicio --paralelo 8
+    curl -X POST localhost:8765/trabajos -d '{"ids": ["P04637"], "salidas": ["uniprot"], "prioridad": 0}'
+    curl localhost:8765/trabajos/<id>/resultados
+"""
+import itertools
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import src.cache_http as cache_http
+import src.expansion as expansion
+import src.guardar_interacciones as guardar_interacciones
+import src.manifiesto as manifiesto
+import src.memo as memo
+import src.obtener_interacciones as obtener_interacciones
+import src.pipeline as pipeline
+import src.sesion_http as sesion_http
+import src.tabla_interacciones as tabla_interacciones
+import src.taxonomia as taxonomia
+import src.visualizar_interacciones as visualizar_interacciones
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+
+# Hilos que procesan proteínas a la vez
+TRABAJADORES = 4
+
+# Prioridad por defecto de un trabajo (menor número = más urgente)
+PRIORIDAD = 10
+
+# Proteínas pendientes como máximo en la cola; más allá, POST /trabajos responde 503
+MAX_PENDIENTES = 10000
+
+# Trabajos terminados que se conservan para consultar sus resultados
+MAX_TERMINADOS = 1000
+
+# Opciones de un trabajo y su valor por defecto
+OPCIONES = {
+    "salidas": ["uniprot"],
+    "guardar": None,
+    "formato_guardado": "json",
+    "visualizar": False,
+    "disposicion": "auto",
+    "saltos": 1,
+    "score_minimo": expansion.SCORE_MINIMO,
+    "agregacion": "max",
+    "especie": None,
+    "canal": None,
+    "actualizar": False,
+    "ttl_dias": manifiesto.TTL / cache_http.DIA,
+    "interacciones": False,
+    "prioridad": PRIORIDAD,
+}
+
+
+class ColaLlena(Exception):
+    """La cola no admite más proteínas pendientes."""
+
+
+def validar_opciones(datos):
+    """
+    Valida el cuerpo de POST /trabajos y completa las opciones por defecto.
+
+    :param datos: Diccionario con "ids" (lista de IDs de PDB/UniProt o rutas a archivos de
+                  estructura, cuyo tipo se detecta) y opcionalmente las claves de OPCIONES.
+    :return: Tupla (entradas [(tipo, valor)], opciones).
+    :raises ValueError: Con un mensaje para el cliente si algo no es válido.
+    """
+    if not isinstance(datos, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON.")
+    desconocidas = set(datos) - set(OPCIONES) - {"ids"}
+    if desconocidas:
+        raise ValueError(f"Opciones desconocidas: {', '.join(sorted(desconocidas))}.")
+    ids = datos.get("ids")
+    if isinstance(ids, str):
+        ids = [ids]
+    if not isinstance(ids, list) or not ids or not all(isinstance(id_, str) and id_.strip() for id_ in ids):
+        raise ValueError("'ids' debe ser una lista no vacía de IDs.")
+
+    entradas = []
+    for valor in ids:
+        valor = valor.strip()
+        tipo = pipeline.detectar_tipo(valor)
+        error = pipeline.validar_entrada(tipo, valor) if tipo else "No se reconoce el tipo de ID."
+        if error:
+            raise ValueError(f"{valor}: {error}")
+        entradas.append((tipo, valor))
+
+    opciones = dict(OPCIONES, **{clave: valor for clave, valor in datos.items() if clave != "ids"})
+    # Primero los tipos, para que ningún valor mal formado llegue a las comparaciones
+    if isinstance(opciones["salidas"], str):
+        opciones["salidas"] = [opciones["salidas"]]
+    if (not isinstance(opciones["salidas"], list) or not opciones["salidas"]
+            or not all(isinstance(salida, str) and salida in obtener_interacciones.FORMATOS for salida in opciones["salidas"])):
+        raise ValueError(f"'salidas' debe ser una lista con: {', '.join(obtener_interacciones.FORMATOS)}.")
+    for clave, permitidos in (("formato_guardado", guardar_interacciones.FORMATOS),
+                              ("disposicion", visualizar_interacciones.DISPOSICIONES),
+                              ("agregacion", tabla_interacciones.AGREGACIONES),
+                              ("canal", (None,) + tabla_interacciones.CAMPOS_SCORE)):
+        if not (opciones[clave] is None or isinstance(opciones[clave], str)) or opciones[clave] not in permitidos:
+            raise ValueError(f"'{clave}' debe ser uno de: {', '.join(str(p) for p in permitidos)}.")
+    for clave in ("saltos", "score_minimo", "prioridad"):
+        if not isinstance(opciones[clave], int) or isinstance(opciones[clave], bool):
+            raise ValueError(f"'{clave}' debe ser un entero.")
+    for clave in ("visualizar", "actualizar", "interacciones"):
+        if not isinstance(opciones[clave], bool):
+            raise ValueError(f"'{clave}' debe ser true o false.")
+    if not isinstance(opciones["ttl_dias"], (int, float)) or isinstance(opciones["ttl_dias"], bool):
+        raise ValueError("'ttl_dias' debe ser un número.")
+    if not (opciones["especie"] is None or isinstance(opciones["especie"], str)
+            or (isinstance(opciones["especie"], int) and not isinstance(opciones["especie"], bool))):
+        raise ValueError("'especie' debe ser un nombre o un taxón.")
+    if opciones["saltos"] < 1:
+        raise ValueError("'saltos' debe ser al menos 1.")
+    if opciones["guardar"] is not None:
+        # Los archivos siempre van a la carpeta "resultados" del servicio
+        if not isinstance(opciones["guardar"], str) or os.path.basename(opciones["guardar"]) != opciones["guardar"]:
+            raise ValueError("'guardar' debe ser un nombre base, sin carpetas.")
+    if opciones["actualizar"] and not opciones["guardar"]:
+        raise ValueError("'actualizar' requiere 'guardar'.")
+    if opciones["especie"] is not None and taxonomia.taxon(opciones["especie"]) is None:
+        raise ValueError(f"Especie desconocida: {opciones['especie']}.")
+    return entradas, opciones
+
+
+class Trabajo:
+    """
+    Un trabajo enviado al servicio: sus proteínas, opciones y resultados.
+
+    Los resultados se agregan a medida que termina cada proteína; `esperar_resultados`
+    permite seguirlos desde otro hilo sin sondear.
+    """
+
+    def __init__(self, entradas, opciones):
+        self.id = uuid.uuid4().hex[:12]
+        self.entradas = entradas
+        self.opciones = opciones
+        self.prioridad = opciones["prioridad"]
+        self.resultados = []
+        self.iniciadas = 0
+        self.canceladas = 0
+        self.cancelado = False
+        self.creado = time.time()
+        self.iniciado = None
+        self.terminado = None
+        self._condicion = threading.Condition()
+
+    def total(self):
+        return len(self.entradas)
+
+    def finalizado(self):
+        return len(self.resultados) + self.canceladas >= self.total()
+
+    def estado(self):
+        if self.finalizado():
+            return "cancelado" if self.canceladas else "terminado"
+        return "en_proceso" if self.iniciadas else "en_cola"
+
+    def resumen(self):
+        with self._condicion:
+            errores = sum(1 for resultado in self.resultados if resultado["estado"] != "ok")
+            return {"id": self.id, "estado": self.estado(), "prioridad": self.prioridad, "total": self.total(),
+                    "hechos": len(self.resultados), "errores": errores, "cancelados": self.canceladas,
+                    "creado": self.creado, "iniciado": self.iniciado, "terminado": self.terminado}
+
+    def iniciar(self):
+        """Marca que una proteína empezó; devuelve False si el trabajo se canceló y hay que saltearla."""
+        with self._condicion:
+            if self.cancelado:
+                self.canceladas += 1
+                self._al_cambiar()
+                return False
+            self.iniciadas += 1
+            self.iniciado = self.iniciado or time.time()
+            return True
+
+    def agregar(self, resultado):
+        with self._condicion:
+            self.resultados.append(resultado)
+            self._al_cambiar()
+
+    def cancelar(self):
+        with self._condicion:
+            self.cancelado = True
+
+    def _al_cambiar(self):
+        if self.finalizado() and self.terminado is None:
+            self.terminado = time.time()
+        self._condicion.notify_all()
+
+    def esperar_resultados(self, desde, timeout=None):
+        """
+        Espera a que haya resultados a partir de la posición `desde` o a que el trabajo termine.
+
+        :return: Tupla (resultados nuevos, finalizado).
+        """
+        with self._condicion:
+            self._condicion.wait_for(lambda: len(self.resultados) > desde or self.finalizado(), timeout)
+            return self.resultados[desde:], self.finalizado()
+
+
+class Servicio:
+    """
+    Cola con prioridad de proteínas y el pool de hilos que las procesa.
+
+    :param trabajadores: Hilos que procesan proteínas a la vez.
+    :param max_pendientes: Proteínas pendientes como máximo en la cola.
+    """
+
+    def __init__(self, trabajadores=TRABAJADORES, max_pendientes=MAX_PENDIENTES):
+        self.trabajadores = max(1, trabajadores)
+        self.max_pendientes = max_pendientes
+        self.trabajos = OrderedDict()
+        self.registro = manifiesto.Manifiesto()
+        self.iniciado = time.time()
+        self._cola = queue.PriorityQueue()
+        self._orden = itertools.count()
+        self._en_proceso = 0
+        self._hilos = []
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Arranca los hilos del pool y la precarga de bibliotecas y caches."""
+        for i in range(self.trabajadores):
+            hilo = threading.Thread(target=self._trabajar, name=f"servicio-{i}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+        threading.Thread(target=calentar, name="servicio-calentar", daemon=True).start()
+        return self
+
+    def detener(self):
+        """Termina los hilos después de la proteína que cada uno esté procesando; las pendientes se descartan."""
+        for _ in self._hilos:
+            # Más urgente que cualquier trabajo: cada hilo la toma apenas termina lo que está haciendo
+            self._cola.put((float("-inf"), next(self._orden), None, None))
+        for hilo in self._hilos:
+            hilo.join()
+        self._hilos = []
+        self.registro.guardar()
+
+    def enviar(self, entradas, opciones):
+        """
+        Encola un trabajo ya validado (ver `validar_opciones`).
+
+        :return: Trabajo.
+        :raises ColaLlena: Si la cola no admite tantas proteínas más.
+        """
+        trabajo = Trabajo(entradas, opciones)
+        with self._lock:
+            if self._cola.qsize() + len(entradas) > self.max_pendientes:
+                raise ColaLlena(f"La cola tiene {self._cola.qsize()} proteínas pendientes (máximo {self.max_pendientes}).")
+            self.trabajos[trabajo.id] = trabajo
+            self._descartar_terminados()
+            for tipo, valor in entradas:
+                self._cola.put((trabajo.prioridad, next(self._orden), trabajo, (tipo, valor)))
+        return trabajo
+
+    def _descartar_terminados(self):
+        terminados = [id_ for id_, trabajo in self.trabajos.items() if trabajo.finalizado()]
+        for id_ in terminados[:max(0, len(terminados) - MAX_TERMINADOS)]:
+            del self.trabajos[id_]
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            return self.trabajos.get(id_trabajo)
+
+    def listar(self):
+        with self._lock:
+            trabajos = list(self.trabajos.values())
+        return [trabajo.resumen() for trabajo in trabajos]
+
+    def estado(self):
+        """Estado del servicio: cola, hilos, trabajos, caches en memoria y en disco y conexiones HTTP."""
+        with self._lock:
+            trabajos = list(self.trabajos.values())
+            en_proceso = self._en_proceso
+        por_estado = {}
+        for trabajo in trabajos:
+            por_estado[trabajo.estado()] = por_estado.get(trabajo.estado(), 0) + 1
+        return {"trabajadores": self.trabajadores, "pendientes": self._cola.qsize(), "en_proceso": en_proceso,
+                "trabajos": por_estado, "activo_desde": self.iniciado, "memo": memo.estadisticas(),
+                "cache_http": cache_http.estadisticas(), "http": sesion_http.metricas()}
+
+    def _trabajar(self):
+        while True:
+            _, _, trabajo, entrada = self._cola.get()
+            if trabajo is None:
+                return
+            if not trabajo.iniciar():
+                continue
+            with self._lock:
+                self._en_proceso += 1
+            try:
+                trabajo.agregar(self._procesar(trabajo, *entrada))
+            finally:
+                with self._lock:
+                    self._en_proceso -= 1
+
+    def _procesar(self, trabajo, tipo, valor):
+        """Procesa una proteína de un trabajo y devuelve su estado (con sus interacciones si se pidieron)."""
+        opciones = trabajo.opciones
+        tablas = {} if opciones["interacciones"] else None
+        if opciones["actualizar"]:
+            # El manifiesto y las memos duran lo que el servicio: cada trabajo compara con las versiones
+            # de cuando empezó y vuelve a pedir lo que se guardó antes
+            self.registro.versiones(desde=trabajo.iniciado)
+        ruta_guardar = f"{opciones['guardar']}_{pipeline.nombre_salida(tipo, valor)}" if opciones["guardar"] else None
+        try:
+            estado = pipeline.procesar_proteina(
+                tipo, valor, opciones["salidas"], ruta_guardar=ruta_guardar, visualizar=opciones["visualizar"],
+                mostrar_interacciones=False, saltos=opciones["saltos"], score_minimo=opciones["score_minimo"],
+                disposicion=opciones["disposicion"], mostrar_ventana=False, formato_guardado=opciones["formato_guardado"],
+                agregacion=opciones["agregacion"], especie=opciones["especie"], actualizar=opciones["actualizar"],
+                ttl=opciones["ttl_dias"] * cache_http.DIA, canal=opciones["canal"], registro=self.registro, tablas=tablas,
+                refrescar_desde=trabajo.iniciado if opciones["actualizar"] else None)
+        except Exception as e:
+            # Una proteína con problemas no debe detener el servicio
+            print(f"Error al procesar {valor}: {e}")
+            estado = {"id": valor, "tipo": tipo, "estado": "error", "mensaje": str(e), "especie": None, "taxon": None,
+                      "id_iter": None, "interacciones": {}}
+        if tablas is not None:
+            estado = dict(estado, tablas={salida: tabla.a_lista() for salida, tabla in tablas.items()})
+        return estado
+
+
+def calentar():
+    """Importa las bibliotecas pesadas y abre la sesión HTTP y las caches antes del primer trabajo."""
+    try:
+        import networkx  # noqa: F401
+        from matplotlib.figure import Figure  # noqa: F401
+        import src.analisis  # noqa: F401
+    except ImportError as e:
+        print(f"No se pudo precargar una biblioteca: {e}")
+    sesion_http.obtener_sesion()
+    cache_http.obtener_cache()
+    taxonomia.taxon("Homo sapiens")
+
+
+class Manejador(BaseHTTPRequestHandler):
+    """Atiende la API HTTP; el servicio está en `self.server.servicio`."""
+    protocol_version = "HTTP/1.1"
+    server_version = "Interacppy"
+
+    def log_message(self, formato, *args):
+        # Sin el registro de cada solicitud en stderr: los trabajos ya informan su progreso
+        pass
+
+    def _json(self, codigo, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, codigo, mensaje):
+        self._json(codigo, {"error": mensaje})
+
+    def _ruta(self):
+        partes = urlsplit(self.path)
+        return [parte for parte in partes.path.split("/") if parte], parse_qs(partes.query)
+
+    def _trabajo(self, id_trabajo):
+        trabajo = self.server.servicio.obtener(id_trabajo)
+        if trabajo is None:
+            self._error(404, f"No existe el trabajo {id_trabajo}.")
+        return trabajo
+
+    def do_GET(self):
+        partes, consulta = self._ruta()
+        servicio = self.server.servicio
+        if partes == ["estado"]:
+            self._json(200, servicio.estado())
+        elif partes == ["trabajos"]:
+            self._json(200, servicio.listar())
+        elif len(partes) == 2 and partes[0] == "trabajos":
+            trabajo = self._trabajo(partes[1])
+            if trabajo is not None:
+                self._json(200, trabajo.resumen())
+        elif len(partes) == 3 and partes[0] == "trabajos" and partes[2] == "resultados":
+            trabajo = self._trabajo(partes[1])
+            if trabajo is not None:
+                self._resultados(trabajo, esperar=consulta.get("esperar", ["1"])[0] != "0")
+        else:
+            self._error(404, "Ruta desconocida.")
+
+    def do_POST(self):
+        partes, _ = self._ruta()
+        if partes != ["trabajos"]:
+            self._error(404, "Ruta desconocida.")
+            return
+        try:
+            longitud = int(self.headers.get("Content-Length") or 0)
+            entradas, opciones = validar_opciones(json.loads(self.rfile.read(longitud) or b"null"))
+            trabajo = self.server.servicio.enviar(entradas, opciones)
+        except (ValueError, TypeError) as e:
+            # TypeError por si algún valor con un tipo inesperado escapa a la validación
+            self._error(400, str(e))
+        except ColaLlena as e:
+            self._error(503, str(e))
+        else:
+            self._json(202, trabajo.resumen())
+
+    def do_DELETE(self):
+        partes, _ = self._ruta()
+        if len(partes) != 2 or partes[0] != "trabajos":
+            self._error(404, "Ruta desconocida.")
+            return
+        trabajo = self._trabajo(partes[1])
+        if trabajo is not None:
+            trabajo.cancelar()
+            self._json(200, trabajo.resumen())
+
+    def _resultados(self, trabajo, esperar=True):
+        """Envía los resultados como NDJSON por partes (chunked), siguiendo el trabajo hasta que termine."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        enviados = 0
+        try:
+            while True:
+                nuevos, finalizado = trabajo.esperar_resultados(enviados, timeout=None if esperar else 0)
+                if nuevos:
+                    bloque = "".join(json.dumps(resultado, ensure_ascii=False) + "\n" for resultado in nuevos).encode("utf-8")
+                    self.wfile.write(f"{len(bloque):x}\r\n".encode("ascii") + bloque + b"\r\n")
+                    self.wfile.flush()
+                    enviados += len(nuevos)
+                if (finalizado and not nuevos) or not esperar:
+                    break
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente dejó de leer: el trabajo sigue y sus resultados se pueden volver a pedir
+            self.close_connection = True
+
+
+class ServidorHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor HTTP sobre un socket Unix (solo accesible con permisos sobre el archivo)."""
+    daemon_threads = True
+
+    def get_request(self):
+        solicitud, _ = super().get_request()
+        # BaseHTTPRequestHandler espera una dirección (host, puerto)
+        return solicitud, ("local", 0)
+
+
+def crear_servidor(servicio, host=HOST, puerto=PUERTO, socket_unix=None):
+    """
+    Crea el servidor HTTP de un servicio, en TCP o en un socket Unix.
+
+    :param puerto: Puerto TCP (0 elige uno libre; ver `servidor.server_address`).
+    :param socket_unix: Ruta de un socket Unix; si se indica se usa en lugar de TCP.
+    """
+    if socket_unix:
+        if os.path.exists(socket_unix):
+            os.unlink(socket_unix)
+        servidor = ServidorUnix(socket_unix, Manejador)
+    else:
+        servidor = ServidorHTTP((host, puerto), Manejador)
+    servidor.servicio = servicio
+    return servidor
+
+
+def servir(trabajadores=TRABAJADORES, host=HOST, puerto=PUERTO, socket_unix=None):
+    """Ejecuta el servicio hasta Ctrl+C; al salir termina las proteínas en curso y guarda el manifiesto."""
+    servicio = Servicio(trabajadores).iniciar()
+    servidor = crear_servidor(servicio, host, puerto, socket_unix)
+    direccion = socket_unix or f"http://{servidor.server_address[0]}:{servidor.server_address[1]}"
+    print(f"Servicio escuchando en {direccion} con {servicio.trabajadores} hilos (Ctrl+C para terminar).")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("Deteniendo el servicio...")
+    finally:
+        servidor.server_close()
+        if socket_unix and os.path.exists(socket_unix):
+            os.unlink(socket_unix)
+        servicio.detener()
@@ -0,0 +1,165 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import src.perfil as perfil
+
+# Tiempo máximo (segundos) para conectar y para esperar datos del servidor
+TIMEOUT_CONEXION = 5
+TIMEOUT_LECTURA = 30
+
+# Reintentos ante errores transitorios: esperas de 0.5, 1, 2, ... segundos
+REINTENTOS = 3
+BACKOFF = 0.5
+ESTADOS_REINTENTABLES = (500, 502, 503, 504)
+
+# Conexiones keep-alive que se mantienen abiertas por host
+MAX_CONEXIONES_POR_HOST = 16
+
+# Límites superiores (en milisegundos) de los rangos del histograma de latencias por host
+LIMITES_HISTOGRAMA_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_config = {
+    "timeout": (TIMEOUT_CONEXION, TIMEOUT_LECTURA),
+    "reintentos": REINTENTOS,
+    "backoff": BACKOFF,
+}
+_sesion = None
+_sesion_lock = threading.Lock()
+
+_metricas = {}
+_metricas_lock = threading.Lock()
+
+
+def crear_sesion(reintentos=REINTENTOS, backoff=BACKOFF, max_conexiones=MAX_CONEXIONES_POR_HOST):
+    """
+    Crea una requests.Session con un pool de conexiones por host y reintentos
+    con backoff exponencial para errores de conexión y respuestas 5xx.
+
+    Los 429 no se reintentan aquí: cada cliente decide cómo respetar el límite
+    de tasa de su API (ver obtener_interacciones._consultar_xrefs).
+    """
+    reintento = Retry(
+        total=reintentos,
+        backoff_factor=backoff,
+        status_forcelist=ESTADOS_REINTENTABLES,
+        allowed_methods=("GET", "HEAD"),
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=max_conexiones, pool_maxsize=max_conexiones, max_retries=reintento)
+    sesion = requests.Session()
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    return sesion
+
+
+def configurar(timeout=None, reintentos=None, backoff=None):
+    """
+    Cambia la configuración de la sesión compartida.
+
+    :param timeout: Segundos (o tupla (conexión, lectura)) antes de abandonar una solicitud.
+    :param reintentos: Número de reintentos ante errores transitorios.
+    :param backoff: Factor del backoff exponencial entre reintentos.
+    """
+    global _sesion
+    if timeout is not None:
+        _config["timeout"] = timeout
+    if reintentos is not None:
+        _config["reintentos"] = reintentos
+    if backoff is not None:
+        _config["backoff"] = backoff
+    with _sesion_lock:
+        if _sesion is not None:
+            _sesion.close()
+        _sesion = None
+
+
+def obtener_sesion():
+    """Devuelve la sesión compartida, creándola la primera vez."""
+    global _sesion
+    with _sesion_lock:
+        if _sesion is None:
+            _sesion = crear_sesion(_config["reintentos"], _config["backoff"])
+        return _sesion
+
+
+def _rango(segundos):
+    milisegundos = segundos * 1000
+    for i, limite in enumerate(LIMITES_HISTOGRAMA_MS):
+        if milisegundos < limite:
+            return i
+    return len(LIMITES_HISTOGRAMA_MS)
+
+
+def registrar_solicitud(host, inicio, segundos, num_bytes, error):
+    """
+    Registra una solicitud HTTP en las métricas por host (las que leen --metricas-http
+    y --perfil) y, si el perfil está activo, como evento de la traza.
+    """
+    perfil.registrar_solicitud(host, inicio, segundos, num_bytes, error)
+    with _metricas_lock:
+        m = _metricas.setdefault(host, {"solicitudes": 0, "errores": 0, "segundos": 0.0, "latencia_max": 0.0, "bytes": 0,
+                                        "histograma": [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)})
+        m["histograma"][_rango(segundos)] += 1
+        m["solicitudes"] += 1
+        m["errores"] += int(error)
+        m["segundos"] += segundos
+        m["latencia_max"] = max(m["latencia_max"], segundos)
+        m["bytes"] += num_bytes
+
+
+def get(url, headers=None, timeout=None, **kwargs):
+    """
+    GET a través de la sesión compartida, con timeout y registro de métricas por host.
+
+    Devuelve el requests.Response; los errores de red se propagan como
+    requests.exceptions.RequestException después de agotar los reintentos.
+    """
+    host = urlsplit(url).hostname or ""
+    inicio = time.perf_counter()
+    try:
+        response = obtener_sesion().get(url, headers=headers, timeout=timeout or _config["timeout"], **kwargs)
+    except requests.exceptions.RequestException:
+        registrar_solicitud(host, inicio, time.perf_counter() - inicio, 0, True)
+        raise
+
+    if kwargs.get("stream"):
+        num_bytes = int(response.headers.get("Content-Length") or 0)
+    else:
+        num_bytes = len(response.content)
+    registrar_solicitud(host, inicio, time.perf_counter() - inicio, num_bytes, response.status_code >= 400)
+    return response
+
+
+def metricas():
+    """
+    Devuelve las métricas acumuladas por host:
+    {host: {"solicitudes", "errores", "segundos", "latencia_media", "latencia_max", "bytes", "histograma"}},
+    donde "histograma" cuenta las solicitudes por rango de latencia (ver LIMITES_HISTOGRAMA_MS).
+    """
+    with _metricas_lock:
+        resultado = {}
+        for host, m in _metricas.items():
+            resultado[host] = dict(m, histograma=list(m["histograma"]),
+                                   latencia_media=m["segundos"] / m["solicitudes"] if m["solicitudes"] else 0.0)
+        return resultado
+
+
+def reiniciar_metricas():
+    with _metricas_lock:
+        _metricas.clear()
+
+
+def imprimir_metricas():
+    """Imprime una tabla con la latencia y el volumen de datos por host."""
+    datos = metricas()
+    if not datos:
+        return
+    print(f"{'Host':<24} {'Solic.':>7} {'Errores':>8} {'Total (s)':>10} {'Media (ms)':>11} {'Máx (ms)':>9} {'KB':>9}")
+    for host, m in sorted(datos.items(), key=lambda par: -par[1]["segundos"]):
+        print(f"{host:<24} {m['solicitudes']:>7} {m['errores']:>8} {m['segundos']:>10.2f} "
+              f"{m['latencia_media'] * 1000:>11.1f} {m['latencia_max'] * 1000:>9.1f} {m['bytes'] / 1024:>9.1f}")
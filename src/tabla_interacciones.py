@@ -0,0 +1,279 @@
+"""
+Tabla columnar de interacciones: los nodos se codifican como enteros y cada
+score es una columna float32 de NumPy, en lugar de un diccionario por arista.
+"""
+import hashlib
+
+import numpy as np
+
+# Columnas de score, con el mismo nombre que en la lista de interacciones. Los canales se
+# llaman como las columnas de los archivos de STRING (ver src/red_local.py), no con los
+# campos abreviados de la API (ver CAMPOS_STRING y el README)
+CAMPOS_SCORE = ("combined_score", "textmining", "database", "experimental", "cooccurence", "neighborhood")
+
+# Campo de la API JSON de STRING del que sale cada columna
+CAMPOS_STRING = {
+    "combined_score": "score",
+    "textmining": "tscore",
+    "database": "dscore",
+    "experimental": "escore",
+    "cooccurence": "pscore",
+    "neighborhood": "nscore",
+}
+
+# Decimales con los que se exportan los scores (float32 tiene ~7 cifras significativas)
+DECIMALES = 6
+
+# Cómo se combinan los scores de las interacciones repetidas al unificarlas
+AGREGACIONES = ("max", "mean")
+
+
+class TablaInteracciones:
+    """
+    Interacciones en formato columnar.
+
+    :ivar nodos: Lista de identificadores; el código de un nodo es su posición en la lista.
+    :ivar origen: Array int32 con el código de la primera proteína de cada interacción.
+    :ivar destino: Array int32 con el código de la segunda proteína de cada interacción.
+    :ivar scores: Diccionario {campo: array float32} con una columna por score.
+    :ivar claves: Identificador canónico de cada nodo (el ID de STRING si se conoce), igual
+                  en todos los formatos de salida de una misma red; por defecto, los mismos `nodos`.
+    """
+    __slots__ = ("nodos", "origen", "destino", "scores", "claves")
+
+    def __init__(self, nodos, origen, destino, scores=None, claves=None):
+        self.nodos = list(nodos)
+        self.claves = list(claves) if claves is not None else self.nodos
+        self.origen = np.asarray(origen, dtype=np.int32)
+        self.destino = np.asarray(destino, dtype=np.int32)
+        scores = scores or {}
+        self.scores = {campo: np.asarray(scores.get(campo, np.zeros(len(self.origen))), dtype=np.float32)
+                       for campo in CAMPOS_SCORE}
+
+    @classmethod
+    def desde_lista(cls, interacciones):
+        """Crea la tabla a partir de una lista de {"proteina_1", "proteina_2", "scores"}."""
+        codigos = {}
+        origen = [codigos.setdefault(i["proteina_1"], len(codigos)) for i in interacciones]
+        destino = [codigos.setdefault(i["proteina_2"], len(codigos)) for i in interacciones]
+        scores = {campo: np.fromiter((i.get("scores", {}).get(campo, 0) for i in interacciones),
+                                     dtype=np.float32, count=len(interacciones))
+                  for campo in CAMPOS_SCORE}
+        return cls(codigos, origen, destino, scores)
+
+    @classmethod
+    def desde_string(cls, data, etiqueta):
+        """
+        Crea la tabla a partir de las interacciones de la API de STRING.
+
+        :param data: Lista de interacciones con stringId_A, stringId_B y los scores de STRING.
+        :param etiqueta: Función id_string -> identificador de salida (o None si no tiene).
+                         Se llama una sola vez por nodo; los nodos con la misma etiqueta se unifican,
+                         salvo los que no tienen etiqueta: cada uno conserva su propio código.
+        """
+        codigos_string = {}
+        origen = np.fromiter((codigos_string.setdefault(item["stringId_A"], len(codigos_string)) for item in data),
+                             dtype=np.int32, count=len(data))
+        destino = np.fromiter((codigos_string.setdefault(item["stringId_B"], len(codigos_string)) for item in data),
+                              dtype=np.int32, count=len(data))
+        scores = {campo: np.fromiter((item.get(CAMPOS_STRING[campo], 0) for item in data),
+                                     dtype=np.float32, count=len(data))
+                  for campo in CAMPOS_SCORE}
+
+        # Recodificar de ID de STRING a la etiqueta de salida; la clave de cada nodo es su primer ID de STRING
+        codigos = {}
+        nodos = []
+        claves = []
+        recodificar = np.zeros(len(codigos_string), dtype=np.int32)
+        for i, string_id in enumerate(codigos_string):
+            nodo = etiqueta(string_id)
+            # Las proteínas sin traducción son distintas entre sí aunque todas tengan etiqueta None
+            codigo = codigos.setdefault(nodo, len(nodos)) if nodo is not None else len(nodos)
+            if codigo == len(nodos):
+                nodos.append(nodo)
+                claves.append(string_id)
+            recodificar[i] = codigo
+        if len(recodificar):
+            origen, destino = recodificar[origen], recodificar[destino]
+        return cls(nodos, origen, destino, scores, claves)
+
+    def __len__(self):
+        return len(self.origen)
+
+    def __iter__(self):
+        return self.iterar()
+
+    def __repr__(self):
+        return f"TablaInteracciones({len(self)} interacciones, {len(self.nodos)} nodos)"
+
+    def columna(self, campo="combined_score"):
+        """Devuelve la columna de un score (array float32)."""
+        return self.scores[campo]
+
+    @property
+    def proteina_1(self):
+        """Identificadores de la primera proteína de cada interacción (array de objetos)."""
+        return np.asarray(self.nodos, dtype=object)[self.origen] if len(self) else np.array([], dtype=object)
+
+    @property
+    def proteina_2(self):
+        """Identificadores de la segunda proteína de cada interacción (array de objetos)."""
+        return np.asarray(self.nodos, dtype=object)[self.destino] if len(self) else np.array([], dtype=object)
+
+    def filtrar(self, mascara):
+        """Devuelve una tabla con las interacciones seleccionadas por una máscara booleana o índices."""
+        return TablaInteracciones(self.nodos, self.origen[mascara], self.destino[mascara],
+                                  {campo: columna[mascara] for campo, columna in self.scores.items()}, self.claves)
+
+    def umbral(self, minimo, campo="combined_score"):
+        """Interacciones con `campo` mayor o igual que `minimo`."""
+        return self.filtrar(self.scores[campo] >= minimo)
+
+    def mejores(self, k, campo="combined_score"):
+        """Las `k` interacciones de mayor `campo`, ordenadas de mayor a menor."""
+        columna = self.scores[campo]
+        if k < len(columna):
+            # argpartition es O(n); solo se ordenan las k seleccionadas
+            seleccion = np.argpartition(-columna, k)[:k]
+        else:
+            seleccion = np.arange(len(columna))
+        return self.filtrar(seleccion[np.argsort(-columna[seleccion], kind="stable")])
+
+    def canonica(self, agregacion="max"):
+        """
+        Devuelve una tabla con cada par de nodos una sola vez, sin importar el orden (A-B
+        y B-A son la misma interacción), y sin lazos (A-A). Aparecen cuando varios IDs
+        de STRING se traducen al mismo identificador de salida.
+
+        Los scores de las repetidas se combinan columna por columna con `agregacion`
+        ("max" o "mean"); cada par conserva la orientación y la posición de su primera aparición.
+        """
+        if agregacion not in AGREGACIONES:
+            raise ValueError(f"Agregación {agregacion} no soportada. Use una de: {', '.join(AGREGACIONES)}.")
+        sin_lazos = self.origen != self.destino
+        origen, destino = self.origen[sin_lazos], self.destino[sin_lazos]
+        par = np.minimum(origen, destino).astype(np.int64) * len(self.nodos) + np.maximum(origen, destino)
+        _, primera, grupo, cuentas = np.unique(par, return_index=True, return_inverse=True, return_counts=True)
+        if len(primera) == len(self):
+            return self
+
+        # Los grupos se numeran en el orden de su primera aparición
+        orden = np.argsort(primera, kind="stable")
+        posicion = np.empty_like(orden)
+        posicion[orden] = np.arange(len(orden))
+        grupo = posicion[grupo.ravel()]
+        cuentas = cuentas[orden]
+        filas = np.argsort(grupo, kind="stable")
+        inicios = np.concatenate(([0], np.cumsum(cuentas)[:-1])) if len(cuentas) else np.zeros(0, dtype=np.int64)
+
+        scores = {}
+        for campo, columna in self.scores.items():
+            columna = columna[sin_lazos][filas]
+            if not len(columna):
+                scores[campo] = columna
+            elif agregacion == "max":
+                scores[campo] = np.maximum.reduceat(columna, inicios)
+            else:
+                scores[campo] = np.add.reduceat(columna.astype(np.float64), inicios) / cuentas
+        seleccion = primera[orden]
+        return TablaInteracciones(self.nodos, origen[seleccion], destino[seleccion], scores, self.claves)
+
+    def indice(self):
+        """Devuelve un IndiceAristas para consultar vecinos y pares en tiempo constante."""
+        return IndiceAristas(self)
+
+    def renombrar(self, identificadores):
+        """Devuelve una tabla con los nodos renombrados según {nombre: nuevo_nombre}."""
+        return TablaInteracciones([identificadores.get(nodo, nodo) for nodo in self.nodos],
+                                  self.origen, self.destino, self.scores, self.claves)
+
+    def iterar(self, tamano_bloque=10000):
+        """
+        Genera las interacciones como diccionarios {"proteina_1", "proteina_2", "scores"},
+        convirtiendo las columnas de a `tamano_bloque` filas para no materializar toda la lista.
+        """
+        for inicio in range(0, len(self), tamano_bloque):
+            fin = inicio + tamano_bloque
+            columnas = {campo: np.round(columna[inicio:fin].astype(np.float64), DECIMALES).tolist()
+                        for campo, columna in self.scores.items()}
+            for i, (a, b) in enumerate(zip(self.origen[inicio:fin].tolist(), self.destino[inicio:fin].tolist())):
+                yield {
+                    "proteina_1": self.nodos[a],
+                    "proteina_2": self.nodos[b],
+                    "scores": {campo: columnas[campo][i] for campo in CAMPOS_SCORE},
+                }
+
+    def huella(self):
+        """
+        Hash SHA-256 (hexadecimal) del contenido exportado: los pares de proteínas en orden
+        y los scores redondeados a DECIMALES. Dos tablas con la misma huella producen el
+        mismo archivo en cualquier formato de guardado.
+        """
+        h = hashlib.sha256()
+        for a, b in zip(self.origen.tolist(), self.destino.tolist()):
+            h.update(f"{self.nodos[a]}\t{self.nodos[b]}\n".encode("utf-8"))
+        for campo in CAMPOS_SCORE:
+            h.update(campo.encode("utf-8"))
+            h.update(np.round(self.scores[campo].astype(np.float64), DECIMALES).tobytes())
+        return h.hexdigest()
+
+    def a_lista(self):
+        """Convierte la tabla en la lista de {"proteina_1", "proteina_2", "scores"} usada por el resto del paquete."""
+        return list(self.iterar())
+
+
+class IndiceAristas:
+    """
+    Índice de adyacencia de una tabla canónica (ver `TablaInteracciones.canonica`):
+    los vecinos de cada nodo quedan contiguos (formato CSR) y cada par sin orden
+    apunta a su fila, de modo que las consultas no recorren todas las interacciones.
+
+    Los nodos se indican con su identificador de salida (un elemento de `tabla.nodos`).
+
+    :ivar tabla: TablaInteracciones indexada.
+    """
+    __slots__ = ("tabla", "_codigos", "_inicio", "_vecinos", "_filas", "_pares")
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self._codigos = {nodo: codigo for codigo, nodo in enumerate(tabla.nodos)}
+        extremos = np.concatenate([tabla.origen, tabla.destino])
+        orden = np.argsort(extremos, kind="stable")
+        self._vecinos = np.concatenate([tabla.destino, tabla.origen])[orden]
+        self._filas = np.concatenate([np.arange(len(tabla))] * 2)[orden]
+        self._inicio = np.zeros(len(tabla.nodos) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(extremos, minlength=len(tabla.nodos)), out=self._inicio[1:])
+        self._pares = {(min(a, b), max(a, b)): fila
+                       for fila, (a, b) in enumerate(zip(tabla.origen.tolist(), tabla.destino.tolist()))}
+
+    def _rango(self, nodo):
+        codigo = self._codigos.get(nodo)
+        if codigo is None:
+            return 0, 0
+        return self._inicio[codigo], self._inicio[codigo + 1]
+
+    def grado(self, nodo):
+        """Cantidad de interacciones del nodo (0 si no está en la tabla)."""
+        inicio, fin = self._rango(nodo)
+        return int(fin - inicio)
+
+    def vecinos(self, nodo, campo="combined_score"):
+        """Devuelve {vecino: score} con las interacciones del nodo."""
+        inicio, fin = self._rango(nodo)
+        scores = self.tabla.scores[campo][self._filas[inicio:fin]].tolist()
+        return {self.tabla.nodos[vecino]: score for vecino, score in zip(self._vecinos[inicio:fin].tolist(), scores)}
+
+    def fila(self, nodo_1, nodo_2):
+        """Posición en la tabla de la interacción entre dos nodos (en cualquier orden), o None."""
+        a, b = self._codigos.get(nodo_1), self._codigos.get(nodo_2)
+        if a is None or b is None:
+            return None
+        return self._pares.get((min(a, b), max(a, b)))
+
+    def score(self, nodo_1, nodo_2, campo="combined_score"):
+        """Score de la interacción entre dos nodos (en cualquier orden), o None si no interactúan."""
+        fila = self.fila(nodo_1, nodo_2)
+        return None if fila is None else float(self.tabla.scores[campo][fila])
+
+    def __contains__(self, par):
+        return self.fila(*par) is not None
@@ -0,0 +1,101 @@
+"""
+Resolución del organismo de una proteína a su taxón de NCBI, sin acceso a la red.
+
+La tabla taxonomia.tsv (incluida junto a este módulo) tiene una línea por taxón:
+
+    taxon   especie_string   nombres
+
+donde `nombres` son el nombre científico y sus sinónimos o nombres comunes separados
+por "|", y `especie_string` es el taxón con el que STRING publica esa especie (para
+varias bacterias y levaduras STRING usa una cepa de referencia, ej. E. coli -> 511145).
+La tabla se lee una sola vez y se indexa por nombre normalizado.
+"""
+import functools
+import os
+import re
+
+RUTA_TABLA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomia.tsv")
+
+# Especie usada cuando no se detecta el organismo (la que el programa usaba siempre)
+ESPECIE_POR_DEFECTO = 9606
+
+_PARENTESIS = re.compile(r"\([^)]*\)")
+
+
+def normalizar(nombre):
+    """Minúsculas, sin paréntesis ni espacios repetidos (ej. "HOMO SAPIENS (HUMAN)" -> "homo sapiens")."""
+    return " ".join(_PARENTESIS.sub(" ", nombre).lower().split())
+
+
+@functools.lru_cache(maxsize=None)
+def _tabla():
+    """Lee la tabla: ({nombre normalizado: taxon}, {taxon: (especie_string, nombre científico)})."""
+    por_nombre = {}
+    por_taxon = {}
+    with open(RUTA_TABLA, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip() or linea.startswith("#"):
+                continue
+            taxon, especie_string, nombres = linea.rstrip("\n").split("\t")
+            nombres = nombres.split("|")
+            por_taxon[int(taxon)] = (int(especie_string), nombres[0])
+            for nombre in nombres:
+                por_nombre.setdefault(normalizar(nombre), int(taxon))
+    return por_nombre, por_taxon
+
+
+def taxon(organismo):
+    """
+    Taxón de NCBI de un organismo.
+
+    Acepta el nombre científico o común tal como aparece en los archivos PDB, mmCIF
+    o en la cabecera FASTA de UniProt, o directamente un taxón numérico. Si el nombre
+    completo no está en la tabla se prueba quitando palabras del final, de modo que
+    una cepa no listada se resuelve a su especie (ej. "ESCHERICHIA COLI O157:H7" -> 562).
+
+    :param organismo: Nombre del organismo o taxón (int o str).
+    :return: Taxón (int), o None si no se reconoce.
+    """
+    if organismo is None:
+        return None
+    if isinstance(organismo, int):
+        return organismo
+    organismo = str(organismo).strip()
+    if organismo.isdigit():
+        return int(organismo)
+
+    por_nombre, _ = _tabla()
+    # Los PDB quiméricos listan varios organismos separados por coma; se usa el primero
+    palabras = normalizar(organismo.split(",")[0]).split()
+    # No se baja de dos palabras: el género solo no identifica la especie
+    for fin in range(len(palabras), min(len(palabras), 2) - 1, -1):
+        encontrado = por_nombre.get(" ".join(palabras[:fin]))
+        if encontrado is not None:
+            return encontrado
+    return None
+
+
+def especie_string(taxon_id):
+    """Taxón con el que STRING publica la especie de `taxon_id` (el mismo si no hay otro en la tabla)."""
+    _, por_taxon = _tabla()
+    return por_taxon.get(taxon_id, (taxon_id, None))[0]
+
+
+def nombre(taxon_id):
+    """Nombre científico de un taxón, o None si no está en la tabla."""
+    _, por_taxon = _tabla()
+    return por_taxon.get(taxon_id, (None, None))[1]
+
+
+def resolver(organismo, por_defecto=ESPECIE_POR_DEFECTO):
+    """
+    Especie de STRING a la que se deben dirigir las consultas de una proteína.
+
+    :param organismo: Nombre del organismo o taxón (ver `taxon`), o None.
+    :param por_defecto: Especie usada si el organismo no se reconoce (None para distinguir ese caso).
+    :return: Taxón de STRING (int).
+    """
+    encontrado = taxon(organismo)
+    if encontrado is None:
+        return por_defecto
+    return especie_string(encontrado)
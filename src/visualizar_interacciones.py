@@ -1,19 +1,170 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+"""
+Disposición y dibujo del grafo de interacciones.
+
+networkx y matplotlib se importan recién al calcular una disposición o dibujar un
+grafo, no al importar el módulo: la línea de comandos arranca sin cargarlos cuando
+no se pide --visualizar. pyplot solo se usa para abrir la ventana interactiva; sin
+pantalla (ver `sin_pantalla`) se usa el backend Agg y el grafo solo se guarda.
+"""
 import json
 import os
+import sys
 
-def visualizar_interacciones(interacciones_data, proteina_principal, formato="grafo", salida="U", ruta_archivo=None):
+import numpy as np
+
+import src.cache_disposicion as cache_disposicion
+import src.perfil as perfil
+import src.tabla_interacciones as tabla_interacciones
+
+# Disposiciones disponibles; "auto" usa spring en grafos chicos y espectral en los grandes
+DISPOSICIONES = ("auto", "spring", "espectral", "kamada_kawai", "circular")
+
+# A partir de cuántos nodos "auto" deja de usar spring_layout (O(n²) por iteración)
+LIMITE_SPRING = 500
+
+# Iteraciones de spring_layout al partir de la disposición de un grafo parecido ya guardado
+ITERACIONES_PARECIDA = 15
+
+# A partir de cuántos nodos no se dibujan las etiquetas ni se usa la resolución máxima
+LIMITE_ETIQUETAS = 200
+DPI = 300
+DPI_GRAFOS_GRANDES = 150
+
+# Rangos de score y color de cada rango (de menor a mayor)
+LIMITES_SCORE = [0.4, 0.6, 0.8]
+COLORES = np.array(["gray", "yellow", "orange", "red"])
+ETIQUETAS_COLORES = [
+    "Low score (< 0.4)",
+    "Medium score (0.4-0.6)",
+    "High score (0.6-0.8)",
+    "Very high score (>= 0.8)",
+]
+
+
+def sin_pantalla():
+    """Indica si no hay una pantalla donde abrir ventanas (Linux u otro Unix sin DISPLAY ni WAYLAND_DISPLAY)."""
+    if sys.platform in ("win32", "darwin"):
+        return False
+    return not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def _pyplot():
+    """Importa pyplot, eligiendo el backend Agg si no hay pantalla y no se configuró otro."""
+    import matplotlib
+    if sin_pantalla() and "MPLBACKEND" not in os.environ:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def calcular_disposicion(grafo, disposicion="auto", semilla=42):
+    """
+    Calcula las posiciones de los nodos de un grafo de networkx.
+
+    :param grafo: Grafo de networkx (con el score combinado como atributo "weight").
+    :param disposicion: Una de DISPOSICIONES.
+    :param semilla: Semilla de las disposiciones aleatorias.
+    :return: Diccionario {nodo: (x, y)}.
+    """
+    import networkx as nx
+
+    if disposicion == "auto":
+        disposicion = "spring" if grafo.number_of_nodes() <= LIMITE_SPRING else "espectral"
+
+    if disposicion == "spring":
+        return nx.spring_layout(grafo, seed=semilla)
+    if disposicion == "espectral":
+        # Autovectores del laplaciano disperso: escala con la cantidad de aristas
+        return nx.spectral_layout(grafo)
+    if disposicion == "kamada_kawai":
+        return nx.kamada_kawai_layout(grafo)
+    if disposicion == "circular":
+        return nx.circular_layout(grafo)
+    raise ValueError(f"Disposición {disposicion} no soportada. Use una de: {', '.join(DISPOSICIONES)}.")
+
+
+def _posiciones_iniciales(grafo, claves, guardadas, semilla):
+    """
+    Posiciones de partida a partir de una disposición parecida: los nodos ya guardados
+    conservan su posición y los nuevos se ubican en el promedio de sus vecinos conocidos.
+    """
+    rng = np.random.default_rng(semilla)
+    inicial = {nodo: np.asarray(guardadas[claves[nodo]]) for nodo in grafo if claves[nodo] in guardadas}
+    for nodo in grafo:
+        if nodo in inicial:
+            continue
+        conocidos = [inicial[vecino] for vecino in grafo[nodo] if vecino in inicial]
+        centro = np.mean(conocidos, axis=0) if conocidos else np.zeros(2)
+        inicial[nodo] = centro + rng.uniform(-0.05, 0.05, 2)
+    return inicial
+
+
+@perfil.etapa("disposicion")
+def disposicion_con_cache(grafo, claves, ancla, disposicion="auto", semilla=42):
+    """
+    Igual que `calcular_disposicion`, pero reutiliza las disposiciones guardadas en
+    `cache_disposicion`: si el mismo grafo ya se dibujó (en cualquier formato de
+    salida) no se recalcula, y si hay uno parecido se parte de sus posiciones.
+
+    :param grafo: Grafo de networkx (con el score combinado como atributo "weight").
+    :param claves: Diccionario {nodo: clave canónica} (ver `TablaInteracciones.claves`).
+    :param ancla: Proteína principal; solo se comparan disposiciones con la misma ancla y parámetros.
+    :return: Diccionario {nodo: (x, y)}.
+    """
+    if disposicion == "auto":
+        disposicion = "spring" if grafo.number_of_nodes() <= LIMITE_SPRING else "espectral"
+    cache = cache_disposicion.obtener_cache()
+    if cache is None:
+        return calcular_disposicion(grafo, disposicion, semilla)
+
+    ancla = str(ancla)
+    aristas = ((claves[a], claves[b], peso) for a, b, peso in grafo.edges(data="weight", default=0))
+    parametros = {"disposicion": disposicion, "semilla": semilla}
+    huella = cache_disposicion.huella(claves.values(), aristas, parametros)
+    guardadas = cache.leer(huella)
+    if guardadas is not None:
+        return {nodo: guardadas[claves[nodo]] for nodo in grafo}
+
+    import networkx as nx
+
+    parecida = cache.parecida(ancla, claves.values(), parametros) if disposicion in ("spring", "kamada_kawai") else None
+    if parecida is None:
+        pos = calcular_disposicion(grafo, disposicion, semilla)
+    elif disposicion == "spring":
+        inicial = _posiciones_iniciales(grafo, claves, parecida, semilla)
+        pos = nx.spring_layout(grafo, pos=inicial, iterations=ITERACIONES_PARECIDA, seed=semilla)
+    else:
+        pos = nx.kamada_kawai_layout(grafo, pos=_posiciones_iniciales(grafo, claves, parecida, semilla))
+
+    cache.guardar(huella, ancla, {claves[nodo]: pos[nodo] for nodo in grafo}, parametros)
+    return pos
+
+
+def colores_y_anchos(scores):
+    """Asigna a cada arista el color de su rango de score y un ancho proporcional al score."""
+    scores = np.asarray(scores, dtype=np.float32)
+    return COLORES[np.digitize(scores, LIMITES_SCORE)], scores * 2
+
+
+def visualizar_interacciones(interacciones_data, proteina_principal, formato="grafo", salida="U", ruta_archivo=None,
+                             disposicion="auto", mostrar=True):
     """
     Visualiza las interacciones de la proteína en diferentes formatos.
 
-    :param interacciones_data: Lista con las interacciones.
+    :param interacciones_data: Lista o TablaInteracciones con las interacciones.
     :param proteina_principal: Nombre o identificador de la proteína principal.
     :param formato: "grafo" para graficar, "json" para exportar a formato JSON.
     :param salida: Carácter para indicar el formato de salida: "U" (UniProt), "E" (Ensembl), "P" (PDB), etc.
     :param ruta_archivo: Nombre del archivo para guardar la imagen del grafo (sin extensión).
+    :param disposicion: Algoritmo de disposición de los nodos (ver DISPOSICIONES).
+    :param mostrar: Si es False no se abre la ventana interactiva (modo sin pantalla); el
+                    grafo solo se guarda en `ruta_archivo`. Sin pantalla nunca se abre.
+    :return: Ruta del PNG guardado en formato "grafo", o None si no se guardó.
     """
     salida = salida or "U"
+    if mostrar and sin_pantalla():
+        print("No hay pantalla disponible: el grafo se guarda sin abrir la ventana.")
+        mostrar = False
 
     if not interacciones_data:
         print("No se encontraron interacciones.")
@@ -23,49 +174,51 @@ def visualizar_interacciones(interacciones_data, proteina_principal, formato="gr
     tipo_salida = formatos.get(salida.upper(), "Otro formato")
 
     if formato == "grafo":
-        G = nx.Graph()
-
-        edge_colors = []
-        edge_widths = []
-        node_color = "lightgray"
-
-        for interaccion in interacciones_data:
-            proteina_1 = interaccion["proteina_1"]
-            proteina_2 = interaccion["proteina_2"]
-            combined_score = interaccion["scores"]["combined_score"]
-
-            G.add_edge(proteina_1, proteina_2, weight=combined_score)
+        import networkx as nx
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
 
-            if combined_score >= 0.8:
-                edge_colors.append("red")
-            elif 0.6 <= combined_score < 0.8:
-                edge_colors.append("orange")
-            elif 0.4 <= combined_score < 0.6:
-                edge_colors.append("yellow")
-            else:
-                edge_colors.append("gray")
+        tabla = interacciones_data
+        if not isinstance(tabla, tabla_interacciones.TablaInteracciones):
+            tabla = tabla_interacciones.TablaInteracciones.desde_lista(interacciones_data)
+        combined_score = tabla.columna("combined_score")
 
-            edge_widths.append(combined_score * 2)
+        ruta_completa = None
 
-        plt.figure(figsize=(12, 10))
-        pos = nx.spring_layout(G, seed=42)
-
-        nx.draw_networkx_nodes(G, pos, node_size=700, node_color=node_color, alpha=0.9)
-        nx.draw_networkx_labels(G, pos, font_size=10, font_family="Arial", font_color="black")
-        nx.draw_networkx_edges(G, pos, width=edge_widths, edge_color=edge_colors, alpha=0.8)
-
-        plt.title(f"Interacciones de la proteína principal: {proteina_principal} ({tipo_salida})", fontsize=14)
-        plt.gcf().canvas.manager.set_window_title(f"Grafo de {proteina_principal} ({tipo_salida})")
-
-        legend_labels = {
-            "red": "Very high score (>= 0.8)",
-            "orange": "High score (0.6-0.8)",
-            "yellow": "Medium score (0.4-0.6)",
-            "gray": "Low score (< 0.4)",
-        }
-        for color, label in legend_labels.items():
-            plt.plot([], [], color=color, marker='o', linestyle='None', markersize=10, label=label)
-        plt.legend(loc="best", fontsize=10)
+        # El grafo se arma sobre los códigos enteros de los nodos; las etiquetas se agregan al dibujar
+        G = nx.Graph()
+        G.add_weighted_edges_from(zip(tabla.origen.tolist(), tabla.destino.tolist(), combined_score.tolist()))
+        pos = disposicion_con_cache(G, {nodo: str(tabla.claves[nodo]) for nodo in G}, proteina_principal, disposicion)
+
+        posiciones = np.zeros((len(tabla.nodos), 2))
+        nodos = np.fromiter(pos.keys(), dtype=np.int64, count=len(pos))
+        posiciones[nodos] = np.array(list(pos.values()))
+        edge_colors, edge_widths = colores_y_anchos(combined_score)
+        grande = len(nodos) > LIMITE_ETIQUETAS
+
+        # Sin ventana se usa una Figure independiente de pyplot (segura para usar desde varios hilos)
+        plt = _pyplot() if mostrar else None
+        fig = plt.figure(figsize=(12, 10)) if mostrar else Figure(figsize=(12, 10))
+        ax = fig.add_subplot()
+        ax.set_axis_off()
+
+        # Todas las aristas en una sola colección y todos los nodos en un solo scatter
+        segmentos = np.stack([posiciones[tabla.origen], posiciones[tabla.destino]], axis=1)
+        ax.add_collection(LineCollection(segmentos, colors=edge_colors, linewidths=edge_widths, alpha=0.8, zorder=1))
+        ax.scatter(posiciones[nodos, 0], posiciones[nodos, 1], s=20 if grande else 700, c="lightgray", alpha=0.9, zorder=2)
+        if not grande:
+            for nodo in nodos.tolist():
+                ax.text(posiciones[nodo, 0], posiciones[nodo, 1], str(tabla.nodos[nodo]), fontsize=10,
+                        ha="center", va="center", color="black", zorder=3)
+        ax.autoscale_view()
+
+        ax.set_title(f"Interacciones de la proteína principal: {proteina_principal} ({tipo_salida})", fontsize=14)
+        if mostrar:
+            fig.canvas.manager.set_window_title(f"Grafo de {proteina_principal} ({tipo_salida})")
+
+        for color, label in zip(COLORES[::-1], ETIQUETAS_COLORES[::-1]):
+            ax.plot([], [], color=color, marker='o', linestyle='None', markersize=10, label=label)
+        ax.legend(loc="best", fontsize=10)
 
         if ruta_archivo:
             # Asegurar que la carpeta "resultados" exista
@@ -80,14 +233,20 @@ def visualizar_interacciones(interacciones_data, proteina_principal, formato="gr
             ruta_completa = os.path.join('resultados', os.path.basename(ruta_archivo))
 
             try:
-                plt.savefig(ruta_completa, format='png', dpi=300)
+                with perfil.etapa("png"):
+                    fig.savefig(ruta_completa, format='png', dpi=DPI_GRAFOS_GRANDES if grande else DPI)
                 print(f"Grafo guardado correctamente en: {ruta_completa}")
             except Exception as e:
                 print(f"Error al guardar el grafo: {e}")
+                ruta_completa = None
 
-        plt.show()
+        if mostrar:
+            plt.show()
+        return ruta_completa
 
     elif formato == "json":
+        if isinstance(interacciones_data, tabla_interacciones.TablaInteracciones):
+            interacciones_data = interacciones_data.a_lista()
         interacciones_json = json.dumps(interacciones_data, indent=4)
         print("Interacciones en formato JSON:")
         print(interacciones_json)
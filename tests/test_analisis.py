@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import networkx as nx
+
+import src.analisis as analisis
+import src.guardar_interacciones as guardar_interacciones
+import src.tabla_interacciones as tabla_interacciones
+
+
+def tabla_desde_grafo(grafo):
+    aristas = list(grafo.edges(data="weight", default=1.0))
+    return tabla_interacciones.TablaInteracciones(
+        [f"P{nodo}" for nodo in grafo.nodes], [u for u, _, _ in aristas], [v for _, v, _ in aristas],
+        {"combined_score": [peso for _, _, peso in aristas]})
+
+
+class TestAnalisis(unittest.TestCase):
+
+    def test_coincide_con_networkx(self):
+        grafo = nx.karate_club_graph()
+        for i, (u, v) in enumerate(grafo.edges):
+            grafo[u][v]["weight"] = 0.15 + (i % 7) / 10
+        metricas = analisis.analizar(tabla_desde_grafo(grafo), muestras=None)
+        posicion = {nodo: i for i, nodo in enumerate(metricas.nodos)}
+
+        intermediacion = nx.betweenness_centrality(grafo)
+        pagerank = nx.pagerank(grafo, tol=1e-10)
+        for nodo in grafo.nodes:
+            i = posicion[f"P{nodo}"]
+            self.assertAlmostEqual(metricas.columnas["intermediacion"][i], intermediacion[nodo], places=9)
+            self.assertAlmostEqual(metricas.columnas["pagerank"][i], pagerank[nodo], places=6)
+            self.assertEqual(metricas.columnas["grado"][i], grafo.degree[nodo])
+        self.assertEqual(metricas.aristas, grafo.number_of_edges())
+        self.assertEqual(metricas.hubs()[:2], ["P33", "P0"])
+
+        particion = {}
+        for nodo, comunidad in zip(grafo.nodes, metricas.columnas["comunidad"][[posicion[f"P{n}"] for n in grafo.nodes]]):
+            particion.setdefault(comunidad, set()).add(nodo)
+        self.assertAlmostEqual(metricas.modularidad, nx.algorithms.community.modularity(grafo, particion.values()))
+
+    def test_comunidades_y_guardado(self):
+        # Dos cliques unidas por una arista débil, con repetidas y un lazo que se descartan
+        grafo = nx.barbell_graph(5, 0)
+        tabla = tabla_desde_grafo(grafo)
+        tabla = tabla_interacciones.TablaInteracciones(
+            tabla.nodos, list(tabla.origen) + [1, 2], list(tabla.destino) + [0, 2],
+            {"combined_score": list(tabla.columna()) + [1.0, 1.0]})
+        metricas = analisis.analizar(tabla)
+        self.assertEqual(metricas.aristas, grafo.number_of_edges())
+        self.assertEqual(metricas.num_comunidades(), 2)
+        comunidad = dict(zip(metricas.nodos, metricas.columnas["comunidad"].tolist()))
+        self.assertEqual(len({comunidad[f"P{nodo}"] for nodo in range(5)}), 1)
+        self.assertNotEqual(comunidad["P0"], comunidad["P9"])
+
+        directorio_original = os.getcwd()
+        with tempfile.TemporaryDirectory() as directorio, patch("builtins.print"):
+            os.chdir(directorio)
+            try:
+                ruta = guardar_interacciones.guardar_metricas(metricas, "barbell_uniprot_metricas.json")
+                with open(ruta, encoding="utf-8") as f:
+                    contenido = json.load(f)
+            finally:
+                os.chdir(directorio_original)
+        self.assertEqual(contenido["resumen"]["comunidades"], 2)
+        self.assertEqual(len(contenido["nodos"]), 10)
+        self.assertEqual(set(contenido["nodos"][0]), {"proteina", *analisis.METRICAS})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import src.asincrono as asincrono
+
+DATA = [{"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP02", "score": 0.9}]
+
+
+def cargar_falso(tipo, valor, especie=None):
+    return {"id": valor, "tipo": tipo, "estado": "error", "mensaje": "", "especie": None, "taxon": 9606,
+            "id_iter": None if valor == "malo" else valor, "interacciones": {}}
+
+
+def redes_falsas(id_iters, formatos, especie=9606):
+    return {id_iter: {"proteina": id_iter, "interacciones": DATA, "xrefs": {}, "mapeo_local": {}} for id_iter in id_iters}
+
+
+@patch("builtins.print")
+@patch("src.pipeline.cargar_proteina", side_effect=cargar_falso)
+@patch("src.obtener_interacciones.obtener_redes", side_effect=redes_falsas)
+class TestAsincrono(unittest.IsolatedAsyncioTestCase):
+
+    async def test_procesar_varias_devuelve_objetos(self, mock_redes, mock_cargar, mock_print):
+        directorio_original = os.getcwd()
+        with tempfile.TemporaryDirectory() as directorio:
+            os.chdir(directorio)
+            try:
+                resultados = await asincrono.procesar_varias([("uniprot", "P04637"), ("uniprot", "malo")],
+                                                             ["ensembl"], prefijo_guardar="lote")
+            finally:
+                os.chdir(directorio_original)
+
+        # Una sola consulta agrupada para las proteínas cargadas
+        mock_redes.assert_called_once_with(["P04637"], ["ensembl"], especie=9606)
+        correcto, fallido = resultados
+        self.assertTrue(correcto.ok)
+        self.assertEqual(correcto.a_dict()["interacciones"], {"ensembl": 1})
+        self.assertEqual(list(correcto.tablas["ensembl"].proteina_2), ["ENSP02"])
+        self.assertEqual(correcto.archivos, [os.path.join("resultados", "lote_P04637_ensembl.json")])
+        self.assertFalse(fallido.ok)
+
+    async def test_mapear_respeta_el_limite_de_su_etapa(self, mock_redes, mock_cargar, mock_print):
+        activos, maximo = [0], [0]
+        lock = threading.Lock()
+
+        def derivar(red, formato, agregacion):
+            with lock:
+                activos[0] += 1
+                maximo[0] = max(maximo[0], activos[0])
+            time.sleep(0.02)
+            with lock:
+                activos[0] -= 1
+
+        red = redes_falsas(["P04637"], [])["P04637"]
+        with patch.dict(asincrono.LIMITES, {"mapeo": 2}), \
+                patch("src.obtener_interacciones.derivar_tabla", side_effect=derivar):
+            await asyncio.gather(*(asincrono.mapear(red, ["ensembl"]) for _ in range(6)))
+
+        self.assertEqual(maximo[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
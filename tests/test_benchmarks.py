@@ -0,0 +1,53 @@
+import unittest
+
+import src.cargar_secuencia as cargar_secuencia
+import src.estructura as estructura
+import src.obtener_interacciones as obtener_interacciones
+from benchmarks import arranque, datos, suite
+
+
+class TestDatosSimulados(unittest.TestCase):
+
+    def test_red_sin_repetidos(self):
+        for num_aristas in (10, 500):
+            red = datos.red_string(num_aristas)
+            pares = {frozenset((item["stringId_A"], item["stringId_B"])) for item in red}
+            self.assertEqual(len(red), num_aristas)
+            self.assertEqual(len(pares), num_aristas)
+            self.assertTrue(all(len(par) == 2 for par in pares))
+
+    def test_cabecera_pdb(self):
+        leida = estructura.parsear_pdb(datos.cabecera_pdb(1000).splitlines())
+        self.assertEqual(leida.pdb_id, datos.PDB_ID)
+        self.assertEqual(leida.organismo, "HOMO SAPIENS")
+        self.assertGreaterEqual(len(leida.secuencia), 1000)
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_todos_los_casos_sin_red(self):
+        servidores = (obtener_interacciones.STRING_SERVER, cargar_secuencia.RCSB_SERVER)
+
+        resultados = suite.ejecutar(tamanos=[10], repeticiones=1)
+
+        self.assertEqual([r["caso"] for r in resultados], list(suite.CASOS))
+        self.assertTrue(all(r["mediana"] > 0 and r["memoria_pico"] > 0 for r in resultados))
+        mapeo = next(r for r in resultados if r["caso"] == "mapeo_ids")
+        # Una solicitud a STRING y una de xrefs por nodo
+        self.assertEqual(mapeo["solicitudes"], 1 + len({id_ for item in datos.red_string(10)
+                                                        for id_ in (item["stringId_A"], item["stringId_B"])}))
+        self.assertEqual((obtener_interacciones.STRING_SERVER, cargar_secuencia.RCSB_SERVER), servidores)
+
+
+
+class TestArranque(unittest.TestCase):
+
+    def test_no_importa_dependencias_pesadas(self):
+        resultado = arranque.medir(repeticiones=1)
+
+        self.assertIn("src.pipeline", resultado["modulos"])
+        self.assertEqual(resultado["prohibidos"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import src.cache_http as cache_http
+
+
+class TestCacheHTTP(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "http.sqlite")
+
+    def tearDown(self):
+        cache_http.configurar(activa=True, solo_cache=False, ruta=cache_http.RUTA_CACHE)
+        self.directorio.cleanup()
+
+    def respuesta(self, url, contenido=b"{}"):
+        return cache_http.Respuesta(url, 200, {"Content-Type": "application/json"}, contenido)
+
+    def test_clave_normalizada(self):
+        cache = cache_http.CacheHTTP(self.ruta)
+        cache.guardar("https://String-DB.org/api/json/network?species=9606&identifiers=P1", self.respuesta("x", b"[1]"))
+
+        respuesta = cache.leer("https://string-db.org/api/json/network?identifiers=P1&species=9606#frag")
+
+        self.assertEqual(respuesta.json(), [1])
+        self.assertTrue(respuesta.desde_cache)
+        self.assertEqual(cache.estadisticas()["aciertos"], 1)
+
+    def test_ttl_por_fuente(self):
+        cache = cache_http.CacheHTTP(self.ruta, ttl_por_fuente={"ensembl": 0})
+        cache.guardar("https://rest.ensembl.org/xrefs/id/ENSP1", self.respuesta("x"))
+        cache.guardar("https://string-db.org/api/json/network", self.respuesta("x"))
+
+        self.assertIsNone(cache.leer("https://rest.ensembl.org/xrefs/id/ENSP1"))
+        self.assertIsNotNone(cache.leer("https://string-db.org/api/json/network"))
+        self.assertEqual((cache.estadisticas()["aciertos"], cache.estadisticas()["fallos"]), (1, 1))
+
+    def test_desalojo_lru(self):
+        cache = cache_http.CacheHTTP(self.ruta, max_bytes=250)
+        for i in range(3):
+            cache.guardar(f"https://string-db.org/{i}", self.respuesta("x", b"a" * 100))
+            # Acceder a la primera entrada la mantiene viva
+            cache.leer("https://string-db.org/0")
+
+        self.assertIsNotNone(cache.leer("https://string-db.org/0"))
+        self.assertIsNone(cache.leer("https://string-db.org/1"))
+        self.assertLessEqual(cache.estadisticas()["bytes"], 250)
+
+    @patch("src.sesion_http.get")
+    def test_solo_cache_no_accede_a_la_red(self, mock_get):
+        cache_http.configurar(ruta=self.ruta, solo_cache=True)
+
+        with self.assertRaises(cache_http.SinConexionError):
+            cache_http.get("https://rest.ensembl.org/xrefs/id/ENSP1")
+        mock_get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
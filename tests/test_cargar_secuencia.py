@@ -0,0 +1,39 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+import src.cargar_secuencia as cargar_secuencia
+
+FASTA = (">sp|P04637|P53_HUMAN Cellular tumor antigen p53 OS=Homo sapiens OX=9606 GN=TP53 PE=1 SV=4\n"
+         "MEEPQSDPSVEPPLSQETFSDLWKLLPENNVLSPLPSQAMDDLMLSPDDIEQWFTEDPGP\n"
+         "DEAPRMPEAAPPVAPAPAAPTPAAPAPAPSWPLSSSVPSQKTYQGSYGFRLGFLHSGTAK\n")
+
+
+class TestCargarSecuencia(unittest.TestCase):
+
+    def test_leer_fasta(self):
+        descripcion, secuencia = cargar_secuencia.leer_fasta(FASTA)
+        self.assertTrue(descripcion.startswith("sp|P04637|P53_HUMAN"))
+        self.assertEqual(len(secuencia), 120)
+        for invalido in ("", "MEEPQ\n", FASTA + FASTA):
+            with self.assertRaises(ValueError):
+                cargar_secuencia.leer_fasta(invalido)
+
+    @patch("src.cache_http.get", return_value=MagicMock(status_code=200, text=FASTA))
+    def test_organismo_y_taxon_desde_uniprot(self, mock_get):
+        secuencia, organismo, taxon = cargar_secuencia.cargar_fasta_desde_uniprot("P04637")
+        self.assertTrue(secuencia.startswith("MEEPQSDPSV"))
+        self.assertEqual((organismo, taxon), ("Homo sapiens", 9606))
+
+    @patch("builtins.print")
+    @patch("src.cache_http.iterar_lineas", side_effect=requests.exceptions.ConnectionError("sin conexión"))
+    def test_pdb_sin_conexion(self, mock_iterar, mock_print):
+        self.assertIsNone(cargar_secuencia.cargar_estructura_desde_pdb("1TUP"))
+        self.assertEqual(cargar_secuencia.load_sequence_from_pdb("1TUP"), (None, None))
+        # Un error de red no se reintenta con el mmCIF
+        self.assertEqual(mock_iterar.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
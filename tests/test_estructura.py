@@ -0,0 +1,97 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+import src.estructura as estructura
+
+PDB = """HEADER    TRANSCRIPTION                           15-JAN-98   1A1U              
+DBREF  1A1U A  324   357  UNP    P04637   P53_HUMAN      324    357             
+DBREF  1A1U C  324   357  UNP    P04637   P53_HUMAN      324    357             
+SEQRES   1 A    4  GLU TYR PHE THR                                              
+SEQRES   1 C    3  MSE XYZ LEU                                                  
+SOURCE   2 ORGANISM_SCIENTIFIC: HOMO SAPIENS;                                   
+ATOM      1  N   GLU A 326      31.000  25.000  12.000  1.00 20.00           N  
+SEQRES   1 B    2  ALA ALA                                                      
+"""
+
+MMCIF = """data_7XYZ
+#
+_entry.id   7XYZ
+#
+loop_
+_entity_poly.entity_id
+_entity_poly.type
+_entity_poly.pdbx_seq_one_letter_code_can
+_entity_poly.pdbx_strand_id
+1 'polypeptide(L)'
+;MKTAYIAK
+QRQISFVK
+;
+A,B
+2 'polypeptide(L)' GSHM C
+#
+_entity_src_gen.entity_id                  1
+_entity_src_gen.pdbx_gene_src_scientific_name 'Mus musculus'
+#
+loop_
+_struct_ref.id
+_struct_ref.db_name
+_struct_ref.db_code
+_struct_ref.pdbx_db_accession
+1 UNP TP53_MOUSE P02340
+#
+loop_
+_struct_ref_seq.align_id
+_struct_ref_seq.ref_id
+_struct_ref_seq.pdbx_strand_id
+_struct_ref_seq.pdbx_db_accession
+1 1 A P02340
+2 1 B P02340
+#
+loop_
+_atom_site.group_PDB
+_atom_site.id
+ATOM 1
+"""
+
+
+class TestEstructura(unittest.TestCase):
+
+    def test_parsear_pdb_por_cadena(self):
+        datos = estructura.parsear_pdb(PDB.splitlines())
+
+        self.assertEqual(datos.pdb_id, "1A1U")
+        self.assertEqual(datos.organismo, "HOMO SAPIENS")
+        # Las líneas posteriores a ATOM no se leen
+        self.assertEqual(datos.cadenas, {"A": "EYFT", "C": "MXL"})
+        self.assertEqual(datos.accesiones(), {"A": "P04637", "C": "P04637"})
+
+    def test_registros_truncados(self):
+        lineas = PDB.splitlines()
+        # Archivos con los espacios finales recortados o registros cortados a mitad
+        lineas[3:3] = ["SEQRES   2", "DBREF  1A1U"]
+        datos = estructura.parsear_pdb(lineas)
+
+        self.assertEqual(datos.cadenas, {"A": "EYFT", "C": "MXL"})
+        self.assertEqual(datos.accesiones(), {"A": "P04637", "C": "P04637"})
+
+    def test_parsear_mmcif(self):
+        datos = estructura.parsear_mmcif(MMCIF.splitlines())
+
+        self.assertEqual(datos.pdb_id, "7XYZ")
+        self.assertEqual(datos.organismo, "MUS MUSCULUS")
+        self.assertEqual(datos.cadenas, {"A": "MKTAYIAKQRQISFVK", "B": "MKTAYIAKQRQISFVK", "C": "GSHM"})
+        self.assertEqual(datos.dbref, [("A", "UNP", "P02340", "TP53_MOUSE"), ("B", "UNP", "P02340", "TP53_MOUSE")])
+
+    def test_leer_archivo_comprimido(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "7xyz.cif.gz")
+            with gzip.open(ruta, "wt") as f:
+                f.write(MMCIF)
+
+            self.assertEqual(estructura.leer_archivo(ruta).secuencia, "MKTAYIAKQRQISFVK" * 2 + "GSHM")
+
+
+if __name__ == "__main__":
+    unittest.main()
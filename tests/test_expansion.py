@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+
+import src.expansion as expansion
+
+# Cadena A - B - C - D con una rama B - E de score bajo
+GRAFO = {
+    ("A", "B"): 0.9,
+    ("B", "C"): 0.8,
+    ("C", "D"): 0.7,
+    ("B", "E"): 0.5,
+}
+
+
+def vecinos_falsos(string_ids, limite=10, score_minimo=None, tamano_lote=100, especie=9606, refrescar_desde=None):
+    vecinos = {}
+    for string_id in string_ids:
+        vecinos[string_id] = []
+        for (a, b), score in GRAFO.items():
+            if string_id in (a, b):
+                otro = b if string_id == a else a
+                vecinos[string_id].append({"stringId_A": string_id, "stringId_B": otro, "score": score})
+    return vecinos
+
+
+@patch("src.obtener_interacciones.resolver_string_ids", lambda ids, tamano_lote=100, especie=9606, refrescar_desde=None: {id_: id_ for id_ in ids})
+@patch("src.obtener_interacciones.obtener_vecinos", side_effect=vecinos_falsos)
+class TestExpansion(unittest.TestCase):
+
+    def test_una_ronda_por_salto(self, mock_vecinos):
+        red = expansion.expandir("A", saltos=2, formatos=[])
+
+        self.assertEqual(red["distancias"], {"A": 0, "B": 1, "C": 2, "E": 2})
+        # Dos saltos más la ronda que cierra las aristas de la última frontera
+        self.assertEqual(mock_vecinos.call_count, 3)
+        self.assertEqual(sorted(mock_vecinos.call_args_list[1].args[0]), ["B"])
+        pares = {tuple(sorted((item["stringId_A"], item["stringId_B"]))) for item in red["interacciones"]}
+        self.assertEqual(pares, {("A", "B"), ("B", "C"), ("B", "E")})
+        self.assertFalse(red["truncada"])
+
+    def test_limites_de_nodos_y_por_salto(self, mock_vecinos):
+        red = expansion.expandir("A", saltos=3, max_nodos_por_salto=1, formatos=[])
+        self.assertEqual(red["distancias"], {"A": 0, "B": 1, "C": 2, "D": 3})
+
+        red = expansion.expandir("A", saltos=3, max_nodos=3, formatos=[])
+        self.assertEqual(set(red["distancias"]), {"A", "B", "C"})
+        self.assertTrue(red["truncada"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import src.guardar_interacciones as guardar_interacciones
+import src.tabla_interacciones as tabla_interacciones
+
+INTERACCIONES = [
+    {"proteina_1": "A", "proteina_2": "B", "scores": {"combined_score": 0.9}},
+    {"proteina_1": "A", "proteina_2": "C", "scores": {"combined_score": 0.5}},
+]
+
+
+@patch("builtins.print")
+class TestGuardarInteracciones(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio_original = os.getcwd()
+        self.directorio = tempfile.TemporaryDirectory()
+        os.chdir(self.directorio.name)
+
+    def tearDown(self):
+        os.chdir(self.directorio_original)
+        self.directorio.cleanup()
+
+    def test_json_igual_al_anterior_y_sin_modificar_la_entrada(self, mock_print):
+        ruta = guardar_interacciones.guardar_interacciones_json(INTERACCIONES, "red.json", {"A": "P1"})
+
+        with open(ruta, encoding="utf-8") as f:
+            contenido = f.read()
+        esperado = [dict(INTERACCIONES[0], proteina_1="P1"), dict(INTERACCIONES[1], proteina_1="P1")]
+        self.assertEqual(contenido, json.dumps(esperado, indent=4, ensure_ascii=False))
+        self.assertEqual(INTERACCIONES[0]["proteina_1"], "A")
+
+    def test_ndjson_gz_desde_tabla_y_nombre_sin_colision(self, mock_print):
+        tabla = tabla_interacciones.TablaInteracciones.desde_lista(INTERACCIONES)
+
+        primera = guardar_interacciones.guardar_interacciones(tabla, "red", "ndjson.gz")
+        segunda = guardar_interacciones.guardar_interacciones(tabla, "red", "ndjson.gz")
+
+        self.assertEqual(primera, os.path.join("resultados", "red.ndjson.gz"))
+        self.assertNotEqual(primera, segunda)
+        self.assertTrue(segunda.endswith(".ndjson.gz"))
+        with gzip.open(segunda, "rt", encoding="utf-8") as f:
+            registros = [json.loads(linea) for linea in f]
+        self.assertEqual([(r["proteina_1"], r["proteina_2"]) for r in registros], [("A", "B"), ("A", "C")])
+        # No quedan archivos temporales
+        self.assertEqual(sorted(os.listdir("resultados")), sorted(os.path.basename(r) for r in (primera, segunda)))
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requiere pyarrow")
+    def test_parquet(self, mock_print):
+        import pyarrow.parquet as pq
+
+        ruta = guardar_interacciones.guardar_interacciones(INTERACCIONES, "red", "parquet")
+
+        tabla = pq.read_table(ruta)
+        self.assertEqual(tabla.column("proteina_2").to_pylist(), ["B", "C"])
+        self.assertEqual(tabla.column_names[2:], list(tabla_interacciones.CAMPOS_SCORE))
+        self.assertEqual(json.loads(tabla.schema.metadata[b"interacppy.canales"])["textmining"], "tscore")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import src.indice_ids as indice_ids
+import src.obtener_interacciones as obtener_interacciones
+
+ALIASES = """#string_protein_id\talias\tsource
+9606.ENSP00000269305\tP04637\tUniProt_AC
+9606.ENSP00000269305\tQ53GA5\tBLAST_UniProt_AC
+9606.ENSP00000344818\tP0CG48\tEnsembl_UniProt_AC
+"""
+
+IDMAPPING = """P04637\tEnsembl_PRO\tENSP00000269305.4
+P04637\tPDB\t1A1U:A
+P0CG48\tPDB\t2ZCC
+"""
+
+SIFTS = """# 2024/01/01 - 00:00 | PDB: 01.24 | UniProt: 2024.01
+PDB,CHAIN,SP_PRIMARY,RES_BEG,RES_END,PDB_BEG,PDB_END,SP_BEG,SP_END
+1tup,A,P04637,1,196,94,289,94,289
+"""
+
+
+class TestIndiceIds(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        rutas = {}
+        for nombre, contenido in (("aliases.txt.gz", ALIASES), ("idmapping.dat.gz", IDMAPPING), ("sifts.csv", SIFTS)):
+            rutas[nombre] = os.path.join(self.directorio.name, nombre)
+            abrir = gzip.open if nombre.endswith(".gz") else open
+            with abrir(rutas[nombre], "wt") as f:
+                f.write(contenido)
+        self.ruta = os.path.join(self.directorio.name, "indice.sqlite")
+        with patch("builtins.print"):
+            indice_ids.construir(self.ruta, [rutas["aliases.txt.gz"]], [rutas["idmapping.dat.gz"]], [rutas["sifts.csv"]])
+        indice_ids.configurar(ruta=self.ruta)
+
+    def tearDown(self):
+        indice_ids.configurar(ruta=indice_ids.RUTA_INDICE)
+        self.directorio.cleanup()
+
+    def test_busqueda_por_prioridad(self):
+        resultado = indice_ids.buscar("uniprot", ["9606.ENSP00000269305", "9606.ENSP00000344818", "9606.ENSP0"])
+
+        self.assertEqual(resultado, {"9606.ENSP00000269305": "P04637", "9606.ENSP00000344818": "P0CG48"})
+
+    def test_pdb_derivado_y_sifts(self):
+        self.assertIn(indice_ids.buscar("pdb", ["9606.ENSP00000269305"])["9606.ENSP00000269305"], ("1A1U", "1TUP"))
+        self.assertEqual(indice_ids.buscar("pdb_uniprot", ["1tup"]), {"1tup": "P04637"})
+
+    @patch("src.cache_http.get")
+    def test_convertidores_solo_consultan_faltantes(self, mock_get):
+        mock_get.side_effect = AssertionError("no debería acceder a la red")
+
+        mapeo = obtener_interacciones.convertir_a_uniprot(["9606.ENSP00000269305", "9606.ENSP00000344818"])
+
+        self.assertEqual(mapeo, {"9606.ENSP00000269305": "P04637", "9606.ENSP00000344818": "P0CG48"})
+
+
+if __name__ == "__main__":
+    unittest.main()
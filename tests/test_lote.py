@@ -0,0 +1,77 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import src.lote as lote
+
+
+def cargar_ok(tipo, valor, especie=None):
+    return {"id": valor, "tipo": tipo, "estado": "error", "mensaje": "", "especie": None, "taxon": 9606, "id_iter": valor, "interacciones": {}}
+
+
+def generar_ok(estado, red, salidas, **kwargs):
+    return dict(estado, estado="ok", interacciones={"uniprot": len(red["interacciones"])})
+
+
+class TestLote(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directorio.name)
+        with open("lote.txt", "w") as f:
+            f.write("id\n1A2B\nP04637\n# comentario\n\n2XYZ,pdb\n")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directorio.cleanup()
+
+    def test_leer_ids_detecta_tipos(self):
+        self.assertEqual(list(lote.leer_ids("lote.txt")), [("pdb", "1A2B"), ("uniprot", "P04637"), ("pdb", "2XYZ")])
+
+    @patch("builtins.print")
+    @patch("src.pipeline.generar_salidas", side_effect=generar_ok)
+    @patch("src.obtener_interacciones.obtener_redes")
+    @patch("src.pipeline.cargar_proteina", side_effect=cargar_ok)
+    def test_retoma_desde_el_checkpoint(self, mock_cargar, mock_redes, mock_generar, mock_print):
+        mock_redes.side_effect = lambda ids, salidas, **kwargs: {id_: {"interacciones": [{}]} for id_ in ids}
+        with open(lote.ruta_progreso("lote.txt"), "w") as f:
+            f.write('{"id": "1A2B", "tipo": "pdb", "estado": "ok", "interacciones": {}}\n')
+            f.write('{"id": "P04637", "tipo": "uniprot", "estado": "error", "interacciones": {}}\n')
+            f.write('{"id": "2XY')  # línea truncada por una interrupción
+
+        estados = lote.procesar_lote("lote.txt", ["uniprot"], paralelismo=2)
+
+        procesados = sorted(llamada.args[1] for llamada in mock_cargar.call_args_list)
+        self.assertEqual(procesados, ["2XYZ", "P04637"])
+        # Las redes de todo el bloque se piden en una sola llamada agrupada
+        mock_redes.assert_called_once()
+        self.assertTrue(all(estado["estado"] == "ok" for estado in estados.values()))
+        self.assertTrue(os.path.exists(os.path.join("resultados", "lote_resumen.csv")))
+        self.assertEqual(lote.leer_progreso(lote.ruta_progreso("lote.txt"))["2XYZ"]["estado"], "ok")
+
+    @patch("builtins.print")
+    @patch("src.pipeline.generar_salidas", side_effect=generar_ok)
+    @patch("src.pipeline.descargar_red")
+    @patch("src.pipeline.cargar_proteina", side_effect=cargar_ok)
+    def test_expansiones_en_paralelo(self, mock_cargar, mock_descargar, mock_generar, mock_print):
+        # Cada expansión espera a las otras dos: solo termina si las tres corren a la vez
+        barrera = threading.Barrier(3, timeout=2)
+
+        def descargar(id_iter, salidas, saltos, score_minimo, taxon, refrescar_desde):
+            barrera.wait()
+            return {"interacciones": [{}] * len(id_iter)}
+
+        mock_descargar.side_effect = descargar
+
+        estados = lote.procesar_lote("lote.txt", ["uniprot"], paralelismo=3, saltos=2)
+
+        self.assertEqual(mock_descargar.call_count, 3)
+        self.assertEqual({id_: estado["interacciones"]["uniprot"] for id_, estado in estados.items()},
+                         {"1A2B": 4, "P04637": 6, "2XYZ": 4})
+
+
+if __name__ == "__main__":
+    unittest.main()
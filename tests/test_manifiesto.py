@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import src.cache_http as cache_http
+import src.manifiesto as manifiesto
+import src.memo as memo
+import src.pipeline as pipeline
+
+DATA = [{"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP02", "score": 0.9}]
+
+
+def red(data):
+    return {"proteina": "P04637", "interacciones": data, "xrefs": {}, "mapeo_local": {}}
+
+
+def estado():
+    return {"id": "P04637", "tipo": "uniprot", "estado": "error", "mensaje": "", "especie": "Homo sapiens",
+            "taxon": 9606, "id_iter": "P04637", "interacciones": {}}
+
+
+@patch("builtins.print")
+@patch("src.obtener_interacciones.versiones_fuentes", return_value={"string": "12.0"})
+class TestManifiesto(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio_original = os.getcwd()
+        self.directorio = tempfile.TemporaryDirectory()
+        os.chdir(self.directorio.name)
+
+    def tearDown(self):
+        os.chdir(self.directorio_original)
+        self.directorio.cleanup()
+
+    def generar(self, data, registro):
+        return pipeline.generar_salidas(estado(), red(data), ["ensembl"], ruta_guardar="P04637", mostrar_interacciones=False,
+                                        registro=registro, actualizar=True)
+
+    def test_solo_reescribe_lo_que_cambio(self, mock_versiones, mock_print):
+        registro = manifiesto.Manifiesto()
+        self.generar(DATA, registro)
+        archivo = registro.salida("P04637", "ensembl")["archivo"]
+        escrito = registro.salida("P04637", "ensembl")["escrito"]
+
+        # Misma red: el archivo no se vuelve a escribir
+        self.generar(DATA, registro)
+        self.assertEqual(registro.salida("P04637", "ensembl")["escrito"], escrito)
+
+        # Red distinta: se reemplaza en su lugar, sin crear otro archivo
+        self.generar(DATA + [{"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP03", "score": 0.5}], registro)
+        self.assertEqual(registro.salida("P04637", "ensembl")["archivo"], archivo)
+        self.assertEqual(registro.salida("P04637", "ensembl")["interacciones"], 2)
+        self.assertEqual(os.listdir("resultados"), ["P04637_ensembl.json"])
+
+        # El manifiesto guardado se vuelve a leer igual
+        registro.guardar()
+        self.assertEqual(manifiesto.Manifiesto().entradas, registro.entradas)
+
+    def test_vigente_por_ttl_version_y_archivos(self, mock_versiones, mock_print):
+        registro = manifiesto.Manifiesto()
+        self.generar(DATA, registro)
+
+        self.assertTrue(registro.vigente("P04637", ["ensembl"], "json"))
+        self.assertEqual(registro.estado("P04637")["interacciones"], {"ensembl": 1})
+        self.assertFalse(registro.vigente("P04637", ["ensembl"], "json", ahora=time.time() + 2 * manifiesto.TTL))
+        self.assertFalse(registro.vigente("P04637", ["ensembl", "uniprot"], "json"))
+        self.assertFalse(registro.vigente("P04637", ["ensembl"], "ndjson"))
+
+        # Nueva versión de STRING (las versiones se consultan una vez por manifiesto)
+        registro.guardar()
+        self.assertTrue(manifiesto.Manifiesto().vigente("P04637", ["ensembl"], "json"))
+        mock_versiones.return_value = {"string": "12.5"}
+        self.assertFalse(manifiesto.Manifiesto().vigente("P04637", ["ensembl"], "json"))
+        # Versión actual desconocida (sin conexión o la consulta falló): se toma como cambiada
+        mock_versiones.return_value = {}
+        self.assertFalse(manifiesto.Manifiesto().vigente("P04637", ["ensembl"], "json"))
+
+        # Archivo borrado a mano
+        os.unlink(os.path.join("resultados", "P04637_ensembl.json"))
+        self.assertFalse(registro.vigente("P04637", ["ensembl"], "json"))
+
+    def test_guardar_sin_actualizar_no_consulta_versiones(self, mock_versiones, mock_print):
+        registro = manifiesto.Manifiesto()
+        pipeline.generar_salidas(estado(), red(DATA), ["ensembl"], ruta_guardar="P04637", mostrar_interacciones=False,
+                                 registro=registro)
+        registro.guardar()
+
+        mock_versiones.assert_not_called()
+        self.assertIsNone(registro.entrada("P04637")["fuentes"])
+        # Con versiones desconocidas, la primera actualización vuelve a descargar la entrada
+        self.assertFalse(manifiesto.Manifiesto().vigente("P04637", ["ensembl"], "json"))
+        mock_versiones.assert_called_once()
+
+    def test_consulta_de_versiones_sin_bloquear_entradas(self, mock_versiones, mock_print):
+        registro = manifiesto.Manifiesto()
+        empezo, liberar = threading.Event(), threading.Event()
+
+        def consultar():
+            empezo.set()
+            liberar.wait(5)
+            return {"string": "12.0"}
+
+        mock_versiones.side_effect = consultar
+        hilo = threading.Thread(target=registro.versiones)
+        hilo.start()
+        empezo.wait(5)
+        try:
+            # Mientras las versiones se consultan, las demás operaciones no esperan
+            registro.registrar_salida("P04637", "ensembl", "P04637_ensembl.json", "json", "abc", 1)
+            self.assertEqual(registro.salida("P04637", "ensembl")["huella"], "abc")
+        finally:
+            liberar.set()
+            hilo.join()
+        self.assertEqual(registro.versiones(), {"string": "12.0"})
+        mock_versiones.assert_called_once()
+
+    def test_actualizar_no_usa_las_caches(self, mock_versiones, mock_print):
+        cache_http.configurar(ruta=os.path.join(self.directorio.name, "http.sqlite"))
+        self.addCleanup(cache_http.configurar, ruta=cache_http.RUTA_CACHE)
+        memo.vaciar()
+        respuestas = {"data": DATA}
+
+        def get(url, headers=None, **kwargs):
+            return SimpleNamespace(url=url, status_code=200, headers={}, content=json.dumps(respuestas["data"]).encode())
+
+        def procesar():
+            with patch("src.pipeline.cargar_proteina", return_value=estado()):
+                return pipeline.procesar_proteina("uniprot", "P04637", ["ensembl"], ruta_guardar="P04637",
+                                                  mostrar_interacciones=False, actualizar=True)
+
+        with patch("src.sesion_http.get", side_effect=get) as mock_get:
+            procesar()
+            # STRING publica una versión nueva con otra red: la respuesta en caché ya no sirve
+            respuestas["data"] = DATA + [{"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP03", "score": 0.5}]
+            mock_versiones.return_value = {"string": "12.5"}
+            estado_final = procesar()
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(estado_final["interacciones"], {"ensembl": 2})
+        with open(os.path.join("resultados", "P04637_ensembl.json"), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 2)
+        self.assertEqual(manifiesto.Manifiesto().entrada("P04637")["fuentes"], {"string": "12.5"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+
+import src.memo as memo
+
+
+class TestMemo(unittest.TestCase):
+
+    def tearDown(self):
+        memo.configurar(activa=True)
+
+    def test_consultas_simultaneas_compartidas(self):
+        cache = memo.MemoLRU(10)
+        llamadas = []
+        liberar = threading.Event()
+
+        def consultar(clave):
+            llamadas.append(clave)
+            liberar.wait(5)
+            return clave.upper()
+
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener("tp53", consultar, "tp53")))
+                 for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        while cache.estadisticas()["compartidas"] < 7:
+            time.sleep(0.01)
+        liberar.set()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(llamadas, ["tp53"])
+        self.assertEqual(resultados, ["TP53"] * 8)
+        self.assertEqual(cache.obtener("tp53", consultar, "tp53"), "TP53")
+        self.assertEqual(cache.estadisticas(), {"aciertos": 1, "compartidas": 7, "fallos": 1, "entradas": 1})
+
+    def test_lru_acotado_y_errores_sin_guardar(self):
+        cache = memo.MemoLRU(2)
+        for clave in ("a", "b", "a", "c"):
+            cache.obtener(clave, str.upper, clave)
+        self.assertEqual(list(cache._valores), ["a", "c"])
+
+        def fallar():
+            raise ValueError("sin conexión")
+
+        with self.assertRaises(ValueError):
+            cache.obtener("d", fallar)
+        self.assertEqual(cache.obtener("d", lambda: "D"), "D")
+
+    def test_refrescar_desde(self):
+        cache = memo.MemoLRU(10)
+        versiones = iter(["v1", "v2", "v3"])
+        consultar = lambda: next(versiones)
+        self.assertEqual(cache.obtener("a", consultar), "v1")
+
+        # Lo guardado antes de `refrescar_desde` se vuelve a pedir; lo posterior se reutiliza
+        time.sleep(0.001)
+        desde = time.time()
+        self.assertEqual(cache.obtener("a", consultar, refrescar_desde=desde), "v2")
+        self.assertEqual(cache.obtener("a", consultar, refrescar_desde=desde), "v2")
+        self.assertEqual(cache.obtener("a", consultar), "v2")
+
+    def test_ttl(self):
+        ttl = {"segundos": 60}
+        cache = memo.MemoLRU(10, ttl=lambda: ttl["segundos"])
+        llamadas = []
+        for _ in range(2):
+            cache.obtener("a", llamadas.append, "a")
+        self.assertEqual(len(llamadas), 1)
+
+        # El TTL se lee en cada consulta: al acortarlo, el resultado guardado vence
+        ttl["segundos"] = 0
+        time.sleep(0.001)
+        cache.obtener("a", llamadas.append, "a")
+        self.assertEqual(len(llamadas), 2)
+
+    def test_desactivada_no_guarda(self):
+        cache = memo.MemoLRU(10)
+        memo.configurar(activa=False)
+        llamadas = []
+        for _ in range(3):
+            cache.obtener("a", llamadas.append, "a")
+        self.assertEqual(len(llamadas), 3)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
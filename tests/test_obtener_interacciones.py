@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+import src.indice_ids as indice_ids
+import src.memo as memo
+import src.obtener_interacciones as obtener_interacciones
+
+
+def setUpModule():
+    # Sin índice local: todos los mapeos pasan por la API (simulada)
+    indice_ids.configurar(ruta="/nonexistent/indice_ids.sqlite")
+
+
+def tearDownModule():
+    indice_ids.configurar(ruta=indice_ids.RUTA_INDICE)
+
+
+def respuesta(status_code=200, datos=None, cabeceras=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = cabeceras or {}
+    response.json.return_value = datos
+    return response
+
+
+class TestConvertirIds(unittest.TestCase):
+
+    def setUp(self):
+        # Cada prueba simula otras respuestas para los mismos IDs
+        memo.vaciar()
+
+    @patch("src.cache_http.get")
+    def test_convertir_a_uniprot_mantiene_contrato(self, mock_get):
+        mock_get.side_effect = lambda url, headers=None, refrescar_desde=None: respuesta(datos=[
+            {"dbname": "PDB", "primary_id": "1ABC"},
+            {"dbname": "Uniprot/SWISSPROT", "primary_id": "UP_" + url.rsplit("/", 1)[-1]},
+        ])
+        ids = ["9606.ENSP1", "9606.ENSP2", "9606.ENSP3"]
+
+        mapeo = obtener_interacciones.convertir_a_uniprot(ids, max_concurrencia=2)
+
+        self.assertEqual(mapeo, {id_: "UP_" + id_.split(".")[-1] for id_ in ids})
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("src.obtener_interacciones.time.sleep")
+    @patch("src.cache_http.get")
+    def test_reintenta_tras_429(self, mock_get, mock_sleep):
+        mock_get.side_effect = [
+            respuesta(429, cabeceras={"Retry-After": "0.01"}),
+            respuesta(datos=[{"dbname": "PDB", "primary_id": "2XYZ"}]),
+        ]
+
+        mapeo = obtener_interacciones.convertir_a_pdb(["9606.ENSP1"])
+
+        self.assertEqual(mapeo, {"9606.ENSP1": "2XYZ"})
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class TestObtenerRed(unittest.TestCase):
+
+    def setUp(self):
+        # Cada prueba simula otras respuestas para los mismos IDs
+        memo.vaciar()
+
+    @patch("builtins.print")
+    @patch("src.cache_http.get")
+    def test_todos_los_formatos_con_una_sola_descarga(self, mock_get, mock_print):
+        red_string = [
+            {"stringId_A": "9606.ENSP1", "stringId_B": "9606.ENSP2", "score": 0.9},
+            {"stringId_A": "9606.ENSP1", "stringId_B": "9606.ENSP3", "score": 0.5},
+        ]
+        xrefs = {
+            "ENSP1": [{"dbname": "PDB", "primary_id": "1AAA"}, {"dbname": "Uniprot/SWISSPROT", "primary_id": "P1"}],
+            "ENSP2": [{"dbname": "PDB", "primary_id": "2BBB"}, {"dbname": "Uniprot/SWISSPROT", "primary_id": "P2"}],
+            "ENSP3": [{"dbname": "Uniprot/SWISSPROT", "primary_id": "P3"}],
+        }
+
+        def get(url, headers=None, refrescar_desde=None):
+            if "string-db" in url:
+                return respuesta(datos=red_string)
+            return respuesta(datos=xrefs[url.rsplit("/", 1)[-1]])
+        mock_get.side_effect = get
+
+        red = obtener_interacciones.obtener_red("P1", ["uniprot", "ensembl", "pdb"])
+        uniprot = obtener_interacciones.derivar_interacciones(red, "uniprot")
+        ensembl = obtener_interacciones.derivar_interacciones(red, "ensembl")
+        pdb = obtener_interacciones.derivar_interacciones(red, "pdb")
+
+        # 1 solicitud a STRING + 1 por nodo a Ensembl, sin importar los formatos
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual([(i["proteina_1"], i["proteina_2"]) for i in uniprot], [("P1", "P2"), ("P1", "P3")])
+        self.assertEqual([(i["proteina_1"], i["proteina_2"]) for i in ensembl], [("ENSP1", "ENSP2"), ("ENSP1", "ENSP3")])
+        self.assertEqual([(i["proteina_1"], i["proteina_2"]) for i in pdb], [("1AAA", "2BBB")])
+
+
+class TestObtenerRedes(unittest.TestCase):
+
+    def setUp(self):
+        # Cada prueba simula otras respuestas para los mismos IDs
+        memo.vaciar()
+
+    @patch("builtins.print")
+    @patch("src.cache_http.get")
+    def test_reparte_aristas_por_proteina(self, mock_get, mock_print):
+        def arista(a, b, score):
+            return {"stringId_A": a, "stringId_B": b, "score": score}
+
+        def get(url, headers=None, refrescar_desde=None):
+            if "get_string_ids" in url:
+                return respuesta(datos=[{"queryIndex": 0, "stringId": "9606.A"}, {"queryIndex": 1, "stringId": "9606.D"}])
+            if "interaction_partners" in url:
+                return respuesta(datos=[arista("9606.A", "9606.B", 0.9), arista("9606.A", "9606.C", 0.8),
+                                        arista("9606.D", "9606.C", 0.7)])
+            if "network" in url:
+                # La arista B-A aparece repetida e invertida
+                return respuesta(datos=[arista("9606.A", "9606.B", 0.9), arista("9606.B", "9606.A", 0.9),
+                                        arista("9606.A", "9606.C", 0.8), arista("9606.C", "9606.D", 0.7),
+                                        arista("9606.B", "9606.C", 0.6)])
+            raise AssertionError(url)
+        mock_get.side_effect = get
+
+        redes = obtener_interacciones.obtener_redes(["P1", "P2", "P1"], ["ensembl"])
+
+        # get_string_ids + interaction_partners + un solo /network para ambas redes
+        self.assertEqual(mock_get.call_count, 3)
+        pares = lambda red: sorted((i["stringId_A"], i["stringId_B"]) for i in red["interacciones"])
+        self.assertEqual(pares(redes["P1"]), [("9606.A", "9606.B"), ("9606.A", "9606.C"), ("9606.B", "9606.C")])
+        self.assertEqual(pares(redes["P2"]), [("9606.C", "9606.D")])
+
+    @patch("builtins.print")
+    @patch("src.cache_http.get")
+    def test_agrupa_por_especie(self, mock_get, mock_print):
+        def get(url, headers=None, refrescar_desde=None):
+            especie = url.split("species=")[1].split("&")[0]
+            if "get_string_ids" in url:
+                return respuesta(datos=[{"queryIndex": 0, "stringId": f"{especie}.A"}])
+            if "interaction_partners" in url:
+                return respuesta(datos=[{"stringId_A": f"{especie}.A", "stringId_B": f"{especie}.B", "score": 0.9}])
+            return respuesta(datos=[{"stringId_A": f"{especie}.A", "stringId_B": f"{especie}.B", "score": 0.9}])
+        mock_get.side_effect = get
+
+        redes = obtener_interacciones.obtener_redes_por_especie({"P1": 9606, "Q1": 10090, "P2": 9606}, ["ensembl"])
+
+        # Tres solicitudes por especie, cada una con los IDs de una sola especie
+        urls = [llamada.args[0] for llamada in mock_get.call_args_list]
+        self.assertEqual(len(urls), 6)
+        self.assertIn("identifiers=P1%0dP2&species=9606", urls[0])
+        self.assertIn("identifiers=Q1&species=10090", urls[3])
+        self.assertEqual(redes["Q1"]["interacciones"][0]["stringId_A"], "10090.A")
+        self.assertIsNone(redes["P2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import src.perfil as perfil
+import src.sesion_http as sesion_http
+
+
+class TestPerfil(unittest.TestCase):
+
+    def tearDown(self):
+        perfil.desactivar()
+
+    def test_desactivado_no_registra(self):
+        perfil.activar()
+        perfil.desactivar()
+        with perfil.etapa("string_network"):
+            pass
+        self.assertEqual(perfil.resumen()["etapas"], {})
+
+    def test_etapas_y_histograma(self):
+        perfil.activar()
+
+        @perfil.etapa("disposicion")
+        def calcular():
+            return 1
+
+        hilos = [threading.Thread(target=calcular) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        sesion_http.registrar_solicitud("string-db.org", 0.0, 0.005, 100, False)
+        sesion_http.registrar_solicitud("string-db.org", 0.0, 0.3, 200, True)
+        sesion_http.registrar_solicitud("string-db.org", 0.0, 7.0, 0, True)
+
+        datos = perfil.resumen()
+        self.assertEqual(datos["etapas"]["disposicion"]["llamadas"], 4)
+        host = datos["hosts"]["string-db.org"]
+        self.assertEqual((host["solicitudes"], host["errores"], host["bytes"]), (3, 2, 300))
+        self.assertEqual(host["histograma"], [1, 0, 0, 0, 1, 0, 0, 0, 1])
+        # --perfil y --metricas-http leen las mismas métricas
+        metricas = sesion_http.metricas()["string-db.org"]
+        self.assertEqual((metricas["solicitudes"], metricas["histograma"]), (3, host["histograma"]))
+
+    def test_traza_chrome(self):
+        perfil.activar()
+        with perfil.etapa("carga_pdb"):
+            with perfil.etapa("png"):
+                pass
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = perfil.escribir_traza(os.path.join(directorio, "traza.json"))
+            with open(ruta, encoding="utf-8") as f:
+                eventos = json.load(f)["traceEvents"]
+
+        self.assertEqual([evento["name"] for evento in eventos], ["png", "carga_pdb"])
+        externo, interno = eventos[1], eventos[0]
+        self.assertTrue(all(evento["ph"] == "X" for evento in eventos))
+        self.assertLessEqual(externo["ts"], interno["ts"])
+        self.assertGreaterEqual(externo["ts"] + externo["dur"] + 0.2, interno["ts"] + interno["dur"])
+
+
+if __name__ == "__main__":
+    unittest.main()
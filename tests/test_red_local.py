@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import src.indice_ids as indice_ids
+import src.memo as memo
+import src.obtener_interacciones as obtener_interacciones
+import src.red_local as red_local
+
+LINKS = """protein1 protein2 neighborhood fusion cooccurence coexpression experimental database textmining combined_score
+9606.ENSP0000000A 9606.ENSP0000000B 0 0 0 62 900 900 500 999
+9606.ENSP0000000B 9606.ENSP0000000A 0 0 0 62 900 900 500 999
+9606.ENSP0000000A 9606.ENSP0000000C 0 0 0 0 0 0 450 450
+9606.ENSP0000000C 9606.ENSP0000000A 0 0 0 0 0 0 450 450
+9606.ENSP0000000B 9606.ENSP0000000C 0 0 0 0 500 0 0 700
+9606.ENSP0000000C 9606.ENSP0000000B 0 0 0 0 500 0 0 700
+9606.ENSP0000000A 9606.ENSP0000000D 0 0 0 0 0 0 150 150
+9606.ENSP0000000D 9606.ENSP0000000A 0 0 0 0 0 0 150 150
+"""
+
+
+class TestRedLocal(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        ruta_links = os.path.join(self.directorio.name, "links.txt")
+        with open(ruta_links, "w") as f:
+            f.write(LINKS)
+        self.almacen = os.path.join(self.directorio.name, "red")
+        self.assertEqual(red_local.importar(ruta_links, self.almacen), (4, 8))
+        red_local.configurar(self.almacen)
+        indice_ids.configurar(ruta=os.path.join(self.directorio.name, "no_existe.sqlite"))
+        memo.vaciar()
+
+    def tearDown(self):
+        red_local.configurar(None)
+        indice_ids.configurar(ruta=indice_ids.RUTA_INDICE)
+        self.directorio.cleanup()
+
+    def test_red_con_scores_de_la_api(self):
+        red = red_local.obtener_red_local()
+
+        data = red.red(red.resolver(["ENSP0000000A"])["ENSP0000000A"])
+
+        pares = {(item["stringId_A"], item["stringId_B"]): item for item in data}
+        # La arista con D queda por debajo del score mínimo
+        self.assertEqual(set(pares), {("9606.ENSP0000000A", "9606.ENSP0000000B"),
+                                      ("9606.ENSP0000000A", "9606.ENSP0000000C"),
+                                      ("9606.ENSP0000000B", "9606.ENSP0000000C")})
+        item = pares[("9606.ENSP0000000A", "9606.ENSP0000000B")]
+        self.assertEqual((item["score"], item["escore"], item["tscore"]), (0.999, 0.9, 0.5))
+
+    @patch("src.cache_http.get")
+    def test_obtener_redes_no_consulta_string(self, mock_get):
+        mock_get.side_effect = AssertionError("no debería acceder a la red")
+
+        redes = obtener_interacciones.obtener_redes(["9606.ENSP0000000B"], [])
+
+        self.assertEqual(len(redes["9606.ENSP0000000B"]["interacciones"]), 3)
+
+
+
+class TestImportarFull(unittest.TestCase):
+
+    def test_columna_experiments_de_los_archivos_full(self):
+        cabecera = ("protein1 protein2 neighborhood neighborhood_transferred fusion cooccurence homology coexpression "
+                    "coexpression_transferred experiments experiments_transferred database database_transferred "
+                    "textmining textmining_transferred combined_score\n")
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta_links = os.path.join(directorio, "links.full.txt")
+            with open(ruta_links, "w") as f:
+                f.write(cabecera)
+                f.write("9606.ENSP0000000A 9606.ENSP0000000B 0 0 0 0 0 62 0 900 300 0 0 500 0 999\n")
+                f.write("9606.ENSP0000000B 9606.ENSP0000000A 0 0 0 0 0 62 0 900 300 0 0 500 0 999\n")
+            red_local.importar(ruta_links, os.path.join(directorio, "red"))
+            red = red_local.RedLocal(os.path.join(directorio, "red"))
+
+            self.assertIn("experimental", red.meta["canales"])
+            item = red.red(red.resolver(["ENSP0000000A"])["ENSP0000000A"])[0]
+            self.assertEqual((item["escore"], item["tscore"], item["score"]), (0.9, 0.5, 0.999))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import src.servicio as servicio
+
+
+def estado(tipo, valor, salidas, **kwargs):
+    return {"id": valor, "tipo": tipo, "estado": "ok", "mensaje": "", "especie": "Homo sapiens", "taxon": 9606,
+            "id_iter": valor, "interacciones": {salida: 3 for salida in salidas}}
+
+
+@patch("src.manifiesto.Manifiesto.guardar")
+class TestServicio(unittest.TestCase):
+
+    def test_prioridad_y_cancelacion(self, mock_guardar):
+        empezo, liberar = threading.Event(), threading.Event()
+        orden = []
+
+        def procesar(tipo, valor, salidas, **kwargs):
+            # La primera proteína ocupa el único hilo hasta que se encolan las demás
+            if valor == "P00001":
+                empezo.set()
+                liberar.wait(5)
+            orden.append(valor)
+            return estado(tipo, valor, salidas)
+
+        with patch("src.pipeline.procesar_proteina", side_effect=procesar):
+            s = servicio.Servicio(trabajadores=1).iniciar()
+            try:
+                primero = s.enviar(*servicio.validar_opciones({"ids": ["P00001"]}))
+                empezo.wait(5)
+                lento = s.enviar(*servicio.validar_opciones({"ids": ["P00002", "P00003"], "prioridad": 20}))
+                urgente = s.enviar(*servicio.validar_opciones({"ids": ["P00004"], "prioridad": 0}))
+                cancelado = s.enviar(*servicio.validar_opciones({"ids": ["P00005"], "prioridad": 30}))
+                cancelado.cancelar()
+                liberar.set()
+                for trabajo in (primero, lento, urgente, cancelado):
+                    trabajo.esperar_resultados(trabajo.total(), timeout=5)
+            finally:
+                s.detener()
+
+        self.assertEqual(orden, ["P00001", "P00004", "P00002", "P00003"])
+        self.assertEqual(lento.resumen()["estado"], "terminado")
+        self.assertEqual(cancelado.resumen()["estado"], "cancelado")
+
+    def test_versiones_por_trabajo_al_actualizar(self, mock_guardar):
+        with patch("src.pipeline.procesar_proteina", side_effect=estado) as mock_procesar, \
+                patch("src.obtener_interacciones.versiones_fuentes",
+                      side_effect=[{"string": "12.0"}, {"string": "12.5"}]) as mock_versiones:
+            s = servicio.Servicio(trabajadores=1).iniciar()
+            try:
+                trabajos = []
+                for opciones in ({"guardar": "red", "actualizar": True}, {"guardar": "red"},
+                                 {"guardar": "red", "actualizar": True}):
+                    trabajo = s.enviar(*servicio.validar_opciones(dict(opciones, ids=["P04637", "P00001"])))
+                    trabajo.esperar_resultados(trabajo.total(), timeout=5)
+                    trabajos.append(trabajo)
+            finally:
+                s.detener()
+
+        # Una consulta por trabajo de actualización, no una por proteína ni por vida del servicio
+        self.assertEqual(mock_versiones.call_count, 2)
+        self.assertEqual(s.registro.versiones(), {"string": "12.5"})
+        # Las respuestas en memoria y en disco anteriores a un trabajo de actualización no se usan
+        refrescos = [llamada.kwargs["refrescar_desde"] for llamada in mock_procesar.call_args_list]
+        self.assertEqual(refrescos, [trabajos[0].iniciado] * 2 + [None] * 2 + [trabajos[2].iniciado] * 2)
+
+    def test_opciones_con_tipos_invalidos(self, mock_guardar):
+        for opciones in ({"salidas": [[1]]}, {"salidas": "otra"}, {"saltos": "2"}, {"saltos": True},
+                         {"prioridad": 1.5}, {"visualizar": "no"}, {"interacciones": 1}, {"agregacion": ["max"]},
+                         {"canal": {}}, {"especie": ["Homo sapiens"]}, {"ttl_dias": "30"}):
+            with self.subTest(opciones=opciones), self.assertRaises(ValueError):
+                servicio.validar_opciones(dict(opciones, ids=["P04637"]))
+        with self.assertRaises(ValueError):
+            servicio.validar_opciones({"ids": 5})
+
+        _, opciones = servicio.validar_opciones({"ids": "P04637", "salidas": "pdb", "especie": 10090, "visualizar": True})
+        self.assertEqual((opciones["salidas"], opciones["especie"], opciones["visualizar"]), (["pdb"], 10090, True))
+
+    def test_api_http_con_resultados_ndjson(self, mock_guardar):
+        with patch("src.pipeline.procesar_proteina", side_effect=estado):
+            s = servicio.Servicio(trabajadores=2).iniciar()
+            servidor = servicio.crear_servidor(s, puerto=0)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{servidor.server_address[1]}"
+            try:
+                for cuerpo in (b'{"ids": ["P04637"], "saltos": 0}', b'{"ids": ["P04637"], "salidas": [[1]]}', b'{"ids": '):
+                    with self.assertRaises(urllib.error.HTTPError) as error:
+                        urllib.request.urlopen(urllib.request.Request(f"{base}/trabajos", data=cuerpo))
+                    self.assertEqual(error.exception.code, 400)
+
+                cuerpo = json.dumps({"ids": ["P04637", "1TUP"], "salidas": ["uniprot", "pdb"]}).encode()
+                with urllib.request.urlopen(urllib.request.Request(f"{base}/trabajos", data=cuerpo)) as respuesta:
+                    self.assertEqual(respuesta.status, 202)
+                    trabajo = json.load(respuesta)
+                with urllib.request.urlopen(f"{base}/trabajos/{trabajo['id']}/resultados") as respuesta:
+                    self.assertEqual(respuesta.headers["Content-Type"], "application/x-ndjson; charset=utf-8")
+                    lineas = [json.loads(linea) for linea in respuesta.read().decode().splitlines()]
+                with urllib.request.urlopen(f"{base}/trabajos/{trabajo['id']}") as respuesta:
+                    resumen = json.load(respuesta)
+            finally:
+                servidor.shutdown()
+                servidor.server_close()
+                s.detener()
+
+        self.assertEqual(sorted((linea["id"], linea["tipo"]) for linea in lineas), [("1TUP", "pdb"), ("P04637", "uniprot")])
+        self.assertEqual(lineas[0]["interacciones"], {"uniprot": 3, "pdb": 3})
+        self.assertEqual((resumen["estado"], resumen["hechos"]), ("terminado", 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+
+import src.obtener_interacciones as obtener_interacciones
+import src.tabla_interacciones as tabla_interacciones
+
+DATA = [
+    {"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP02", "score": 0.9, "escore": 0.8, "tscore": 0.1},
+    {"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP03", "score": 0.5},
+    {"stringId_A": "9606.ENSP02", "stringId_B": "9606.ENSP03", "score": 0.7, "dscore": 0.6},
+]
+
+
+class TestTablaInteracciones(unittest.TestCase):
+
+    def setUp(self):
+        self.red = {"proteina": "P1", "interacciones": DATA, "xrefs": {}, "mapeo_local": {
+            "uniprot": {"9606.ENSP01": "P1", "9606.ENSP02": "P2", "9606.ENSP03": "P2"},
+            "pdb": {"9606.ENSP01": "1ABC", "9606.ENSP02": "2DEF"},
+        }}
+
+    @patch("builtins.print")
+    def test_scores_de_la_api_y_lista_compatible(self, mock_print):
+        interacciones = obtener_interacciones.derivar_interacciones(self.red, "ensembl")
+
+        self.assertEqual(interacciones[0], {"proteina_1": "ENSP01", "proteina_2": "ENSP02", "scores": {
+            "combined_score": 0.9, "textmining": 0.1, "database": 0.0, "experimental": 0.8, "cooccurence": 0.0,
+            "neighborhood": 0.0}})
+        tabla = tabla_interacciones.TablaInteracciones.desde_lista(interacciones)
+        self.assertEqual(tabla.a_lista(), interacciones)
+
+    @patch("builtins.print")
+    def test_nodos_unificados_y_pdb_faltante(self, mock_print):
+        tabla = obtener_interacciones.derivar_tabla(self.red, "uniprot")
+        self.assertEqual(tabla.nodos, ["P1", "P2"])
+        # P1-P2 aparece dos veces (ENSP02 y ENSP03 son P2) y P2-P2 es un lazo
+        self.assertEqual((list(tabla.proteina_1), list(tabla.proteina_2)), (["P1"], ["P2"]))
+        self.assertAlmostEqual(float(tabla.columna()[0]), 0.9, places=6)
+
+        media = obtener_interacciones.derivar_tabla(self.red, "uniprot", agregacion="mean")
+        self.assertAlmostEqual(float(media.columna()[0]), 0.7, places=6)
+        self.assertAlmostEqual(float(media.columna("experimental")[0]), 0.4, places=6)
+
+        tabla = obtener_interacciones.derivar_tabla(self.red, "pdb")
+        self.assertEqual(len(tabla), 1)
+        self.assertEqual((tabla.proteina_1[0], tabla.proteina_2[0]), ("1ABC", "2DEF"))
+
+    @patch("builtins.print")
+    def test_nodos_sin_mapeo_no_se_unifican(self, mock_print):
+        # ENSP02 y ENSP03 no tienen UniProt: siguen siendo dos proteínas distintas
+        red = {"proteina": "P1", "xrefs": {}, "interacciones": [
+            {"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP02", "score": 0.9},
+            {"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP03", "score": 0.8},
+            {"stringId_A": "9606.ENSP02", "stringId_B": "9606.ENSP03", "score": 0.7},
+            {"stringId_A": "9606.ENSP01", "stringId_B": "9606.ENSP04", "score": 0.5},
+        ], "mapeo_local": {"uniprot": {"9606.ENSP01": "P1", "9606.ENSP04": "P4"}, "pdb": {}}}
+
+        tabla = obtener_interacciones.derivar_tabla(red, "uniprot")
+
+        self.assertEqual(len(tabla), 4)
+        self.assertEqual(list(zip(tabla.proteina_1, tabla.proteina_2)),
+                         [("P1", None), ("P1", None), (None, None), ("P1", "P4")])
+        self.assertEqual([round(float(x), 3) for x in tabla.columna()], [0.9, 0.8, 0.7, 0.5])
+
+    @patch("builtins.print")
+    def test_umbral_y_mejores(self, mock_print):
+        tabla = obtener_interacciones.derivar_tabla(self.red, "ensembl")
+
+        self.assertEqual(len(tabla.umbral(0.6)), 2)
+        mejores = tabla.mejores(2)
+        self.assertEqual([round(float(x), 3) for x in mejores.columna()], [0.9, 0.7])
+        self.assertEqual(len(tabla.mejores(10)), 3)
+
+    def test_canonica_conserva_orden_y_orientacion(self):
+        tabla = tabla_interacciones.TablaInteracciones(
+            ["A", "B", "C"], [1, 0, 2, 1, 2], [0, 2, 2, 0, 1],
+            {"combined_score": [0.2, 0.5, 0.9, 0.6, 0.4]})
+
+        canonica = tabla.canonica()
+
+        self.assertEqual(list(zip(canonica.proteina_1, canonica.proteina_2)), [("B", "A"), ("A", "C"), ("C", "B")])
+        self.assertEqual([round(float(x), 3) for x in canonica.columna()], [0.6, 0.5, 0.4])
+        self.assertIs(canonica.canonica(), canonica)
+        with self.assertRaises(ValueError):
+            tabla.canonica("suma")
+
+    def test_indice_aristas(self):
+        tabla = tabla_interacciones.TablaInteracciones(
+            ["A", "B", "C", "D"], [0, 0, 2], [1, 2, 1], {"combined_score": [0.9, 0.5, 0.7]})
+
+        indice = tabla.indice()
+
+        self.assertEqual(indice.vecinos("B"), {"A": tabla.columna()[0], "C": tabla.columna()[2]})
+        self.assertEqual((indice.grado("A"), indice.grado("D"), indice.grado("Z")), (2, 0, 0))
+        self.assertAlmostEqual(indice.score("C", "A"), 0.5, places=6)
+        self.assertIsNone(indice.score("A", "D"))
+        self.assertIn(("B", "C"), indice)
+        self.assertNotIn(("A", "Z"), indice)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+
+import src.pipeline as pipeline
+import src.taxonomia as taxonomia
+
+
+class TestTaxonomia(unittest.TestCase):
+
+    def test_nombres_de_pdb_y_uniprot(self):
+        self.assertEqual(taxonomia.taxon("HOMO SAPIENS"), 9606)
+        self.assertEqual(taxonomia.taxon("Mus musculus (Mouse)"), 10090)
+        self.assertEqual(taxonomia.taxon("zebrafish"), 7955)
+        self.assertEqual(taxonomia.taxon("10116"), 10116)
+        self.assertIsNone(taxonomia.taxon("ORGANISMO INVENTADO"))
+        self.assertIsNone(taxonomia.taxon(None))
+
+    def test_cepas_y_especie_de_string(self):
+        # Una cepa listada se resuelve a sí misma; una no listada, a su especie
+        self.assertEqual(taxonomia.taxon("ESCHERICHIA COLI K-12"), 83333)
+        self.assertEqual(taxonomia.taxon("ESCHERICHIA COLI O157:H7"), 562)
+        # STRING publica E. coli con la cepa MG1655
+        self.assertEqual(taxonomia.resolver("ESCHERICHIA COLI O157:H7"), 511145)
+        self.assertEqual(taxonomia.resolver("SACCHAROMYCES CEREVISIAE S288C"), 4932)
+        self.assertEqual(taxonomia.resolver("DESCONOCIDO", por_defecto=10090), 10090)
+        self.assertIsNone(taxonomia.resolver("DESCONOCIDO", por_defecto=None))
+        self.assertEqual(taxonomia.nombre(9606), "Homo sapiens")
+
+    @patch("builtins.print")
+    def test_especie_de_la_proteina(self, mock_print):
+        # La especie forzada tiene prioridad sobre el taxón, y el taxón sobre el nombre detectado
+        self.assertEqual(pipeline.resolver_taxon("Homo sapiens", 83333, forzada="MUS MUSCULUS"), 10090)
+        self.assertEqual(pipeline.resolver_taxon("Homo sapiens", 83333), 511145)
+        self.assertEqual(pipeline.resolver_taxon("ESCHERICHIA COLI O157:H7"), 511145)
+        self.assertEqual(pipeline.resolver_taxon(None), taxonomia.ESPECIE_POR_DEFECTO)
+        mock_print.assert_not_called()
+        self.assertEqual(pipeline.resolver_taxon("DESCONOCIDO"), taxonomia.ESPECIE_POR_DEFECTO)
+        mock_print.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import networkx as nx
+
+import src.cache_disposicion as cache_disposicion
+import src.visualizar_interacciones as visualizar_interacciones
+
+INTERACCIONES = [
+    {"proteina_1": "P1", "proteina_2": "P2", "scores": {"combined_score": 0.9}},
+    {"proteina_1": "P1", "proteina_2": "P3", "scores": {"combined_score": 0.5}},
+    {"proteina_1": "P2", "proteina_2": "P3", "scores": {"combined_score": 0.3}},
+]
+
+
+class TestVisualizarInteracciones(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio_cache = tempfile.TemporaryDirectory()
+        cache_disposicion.configurar(ruta=os.path.join(self.directorio_cache.name, "disposiciones.sqlite"))
+
+    def tearDown(self):
+        cache_disposicion.configurar(ruta=cache_disposicion.RUTA_CACHE)
+        self.directorio_cache.cleanup()
+
+    def test_colores_por_rango(self):
+        colores, anchos = visualizar_interacciones.colores_y_anchos([0.3, 0.4, 0.6, 0.8, 0.95])
+
+        self.assertEqual(list(colores), ["gray", "yellow", "orange", "red", "red"])
+        self.assertAlmostEqual(float(anchos[-1]), 1.9, places=5)
+
+    @patch("builtins.print")
+    @patch("matplotlib.pyplot.show")
+    def test_sin_ventana_guarda_png(self, mock_show, mock_print):
+        directorio_original = os.getcwd()
+        with tempfile.TemporaryDirectory() as directorio:
+            os.chdir(directorio)
+            try:
+                visualizar_interacciones.visualizar_interacciones(INTERACCIONES, "P1", ruta_archivo="grafo",
+                                                                  disposicion="circular", mostrar=False)
+                self.assertTrue(os.path.exists(os.path.join("resultados", "grafo.png")))
+            finally:
+                os.chdir(directorio_original)
+        mock_show.assert_not_called()
+
+
+    def test_cache_compartida_entre_formatos_y_arranque_parecido(self):
+        # La misma red con nodos numerados distinto (como en otro formato de salida) tiene la misma huella
+        uniprot = nx.Graph([(0, 1, {"weight": 0.9}), (0, 2, {"weight": 0.5}), (1, 2, {"weight": 0.7})])
+        ensembl = nx.Graph([(5, 6, {"weight": 0.9}), (5, 7, {"weight": 0.5}), (6, 7, {"weight": 0.7})])
+        claves_uniprot = {0: "9606.A", 1: "9606.B", 2: "9606.C"}
+        claves_ensembl = {5: "9606.A", 6: "9606.B", 7: "9606.C"}
+
+        with patch.object(visualizar_interacciones, "calcular_disposicion", wraps=visualizar_interacciones.calcular_disposicion) as calcular:
+            pos_uniprot = visualizar_interacciones.disposicion_con_cache(uniprot, claves_uniprot, "P1", "spring")
+            pos_ensembl = visualizar_interacciones.disposicion_con_cache(ensembl, claves_ensembl, "P1", "spring")
+            self.assertEqual(calcular.call_count, 1)
+            self.assertAlmostEqual(pos_ensembl[6][0], pos_uniprot[1][0], places=5)
+
+            # Un nodo más: no es la misma huella, pero se parte de la disposición guardada
+            uniprot.add_edge(2, 3, weight=0.8)
+            visualizar_interacciones.disposicion_con_cache(uniprot, {**claves_uniprot, 3: "9606.D"}, "P1", "spring")
+            self.assertEqual(calcular.call_count, 1)
+
+        estadisticas = cache_disposicion.obtener_cache().estadisticas()
+        self.assertEqual((estadisticas["aciertos"], estadisticas["parecidas"], estadisticas["entradas"]), (1, 1, 2))
+
+    def test_parecida_solo_con_la_misma_disposicion(self):
+        grafo = nx.Graph([(0, 1, {"weight": 0.9}), (0, 2, {"weight": 0.5}), (1, 2, {"weight": 0.7})])
+        claves = {0: "9606.A", 1: "9606.B", 2: "9606.C"}
+
+        with patch.object(visualizar_interacciones, "calcular_disposicion", wraps=visualizar_interacciones.calcular_disposicion) as calcular:
+            visualizar_interacciones.disposicion_con_cache(grafo, claves, "P1", "circular")
+            # Una disposición circular guardada no sirve de punto de partida para spring
+            grafo.add_edge(2, 3, weight=0.8)
+            visualizar_interacciones.disposicion_con_cache(grafo, {**claves, 3: "9606.D"}, "P1", "spring")
+            self.assertEqual(calcular.call_count, 2)
+
+        self.assertEqual(cache_disposicion.obtener_cache().estadisticas()["parecidas"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()